@@ -44,6 +44,7 @@ def create_app(config_class):
     from app.routes.token_routes import ns as tokens
     from app.routes.import_routes import ns as imports
     from app.routes.train_routes import ns as training
+    from app.routes.job_routes import ns as jobs
 
     api.add_namespace(projects, path="/projects")
     api.add_namespace(mentions, path="/mentions")
@@ -57,11 +58,26 @@ def create_app(config_class):
     api.add_namespace(tokens, path="/tokens")
     api.add_namespace(imports, path="/imports")
     api.add_namespace(training, path="/training")
+    api.add_namespace(jobs, path="/jobs")
+
+    if app.config.get("DEBUG_ENDPOINTS"):
+        from app.routes.debug_routes import ns as debug
+
+        api.add_namespace(debug, path="/_debug")
+
+    if app.config.get("SQL_PROFILING"):
+        from app.profiler import sql_profiler
+        from app.routes.debug_routes import profiler_ns as profiler
+
+        sql_profiler.init_app(app)
+        api.add_namespace(profiler, path="/_debug")
 
     if not config_class.TESTING:
         from app.db import db
+        from app.services.job_service import job_service
 
         db.init_app(app)
         Migrate(app, db)
+        job_service.init_app(app)
 
     return app
@@ -0,0 +1,188 @@
+import collections
+import logging
+import threading
+import time
+
+_caches = {}
+
+
+class LruCache:
+    """
+    Thread-safe, size-bounded process-wide cache with least recently used eviction.
+    Counts hits, misses and evictions.
+    """
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.__lock = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        _caches[name] = self
+
+    def get(self, key, default=None):
+        """
+        Fetch a cached value and mark it as most recently used.
+
+        :param key: Cache key
+        :param default: Value returned if key is not cached
+        :return: Cached value or default
+        """
+        with self.__lock:
+            if key not in self.__entries:
+                self.__misses += 1
+                return default
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+
+    def put(self, key, value):
+        """
+        Cache a value, evicting the least recently used entry if the cache is full.
+
+        :param key: Cache key
+        :param value: Value to cache
+        """
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def invalidate(self, key):
+        """
+        Remove a key from the cache, if present.
+
+        :param key: Cache key
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all entries and reset the metrics.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+    def stats(self):
+        """
+        :return: Size and hit, miss and eviction counts of the cache
+        """
+        with self.__lock:
+            return {
+                "name": self.name,
+                "size": len(self.__entries),
+                "maxsize": self.maxsize,
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+            }
+
+
+class TtlCache:
+    """
+    Thread-safe process-wide cache of values expiring after ttl seconds,
+    refreshed with stale-while-revalidate.
+
+    Expired values younger than ttl + stale_ttl seconds are still returned,
+    while a background thread reloads them. Older or missing values are loaded
+    synchronously. Failed background reloads keep the stale value.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.__lock = threading.Lock()
+        self.__entries = {}
+        self.__refreshing = set()
+        self.__hits = 0
+        self.__stale_hits = 0
+        self.__misses = 0
+        _caches[name] = self
+
+    def get(self, key, loader):
+        """
+        Fetch a value, loading it if it is missing or expired.
+
+        :param key: Cache key
+        :param loader: Function loading the value, also called from a background thread
+        :return: Cached or loaded value
+        """
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            age = now - entry[1] if entry is not None else None
+            if age is not None and age < self.ttl:
+                self.__hits += 1
+                return entry[0]
+            if age is not None and age < self.ttl + self.stale_ttl:
+                self.__stale_hits += 1
+                if key not in self.__refreshing:
+                    self.__refreshing.add(key)
+                    threading.Thread(
+                        target=self.__refresh, args=(key, loader), daemon=True
+                    ).start()
+                return entry[0]
+            self.__misses += 1
+
+        value = loader()
+        with self.__lock:
+            self.__entries[key] = (value, time.monotonic())
+        return value
+
+    def __refresh(self, key, loader):
+        try:
+            value = loader()
+            with self.__lock:
+                self.__entries[key] = (value, time.monotonic())
+        except Exception as e:
+            logging.warning(f"Refreshing {self.name} cache entry {key} failed: {e}")
+        finally:
+            with self.__lock:
+                self.__refreshing.discard(key)
+
+    def clear(self):
+        """
+        Remove all entries and reset the metrics.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__stale_hits = 0
+            self.__misses = 0
+
+    def stats(self):
+        """
+        :return: Size and hit, stale hit and miss counts of the cache
+        """
+        with self.__lock:
+            return {
+                "name": self.name,
+                "size": len(self.__entries),
+                "hits": self.__hits,
+                "stale_hits": self.__stale_hits,
+                "misses": self.__misses,
+            }
+
+
+def get_cache_stats():
+    """
+    :return: Metrics of all process-wide caches
+    """
+    return [cache.stats() for cache in _caches.values()]
+
+
+def clear_caches():
+    """
+    Clears all process-wide caches.
+    """
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,322 @@
+import collections
+import gzip
+import json as jsonlib
+import logging
+import threading
+import time
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from werkzeug.exceptions import GatewayTimeout, ServiceUnavailable
+
+from app.config import Config
+
+_clients = {}
+
+# Statuses of overloaded or restarting services, worth another attempt
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class CircuitBreaker:
+    """
+    Fails fast after a number of consecutive failures of a service.
+
+    After reset_timeout seconds one trial call is let through (half-open).
+    The circuit closes again on its success and reopens on its failure.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_running = False
+
+    def allow_request(self, reset_timeout):
+        with self.__lock:
+            if self.__opened_at is None:
+                return True
+            if self.__trial_running:
+                return False
+            if time.monotonic() - self.__opened_at >= reset_timeout:
+                self.__trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__trial_running = False
+
+    def record_failure(self, failure_threshold):
+        with self.__lock:
+            self.__failures += 1
+            self.__trial_running = False
+            if self.__opened_at is not None or self.__failures >= failure_threshold:
+                self.__opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self.__lock:
+            if self.__opened_at is None:
+                return "closed"
+            return "half-open" if self.__trial_running else "open"
+
+
+class LatencyMetrics:
+    """
+    Thread-safe call count, error count and latency distribution per endpoint.
+    """
+
+    def __init__(self, samples=500):
+        self.__lock = threading.Lock()
+        self.__samples = samples
+        self.__endpoints = {}
+
+    def record(self, endpoint, duration, error):
+        with self.__lock:
+            metrics = self.__endpoints.setdefault(
+                endpoint,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "latencies": collections.deque(maxlen=self.__samples),
+                },
+            )
+            metrics["calls"] += 1
+            metrics["errors"] += int(error)
+            metrics["total_ms"] += duration * 1000
+            metrics["latencies"].append(duration * 1000)
+
+    def stats(self):
+        with self.__lock:
+            return {
+                endpoint: {
+                    "calls": metrics["calls"],
+                    "errors": metrics["errors"],
+                    "mean_ms": round(metrics["total_ms"] / metrics["calls"], 2),
+                    "p50_ms": self.__percentile(metrics["latencies"], 0.5),
+                    "p95_ms": self.__percentile(metrics["latencies"], 0.95),
+                    "max_ms": round(max(metrics["latencies"]), 2),
+                }
+                for endpoint, metrics in self.__endpoints.items()
+            }
+
+    def clear(self):
+        with self.__lock:
+            self.__endpoints.clear()
+
+    @staticmethod
+    def __percentile(latencies, fraction):
+        ordered = sorted(latencies)
+        return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 2)
+
+
+class ServiceClient:
+    """
+    HTTP client for a backend microservice.
+
+    All calls share one requests session, so connections to the service are kept alive
+    and pooled. Calls get connect and read timeouts, idempotent calls are retried with
+    exponential backoff on connect errors and 502, 503 and 504 answers, and a circuit
+    breaker fails fast while the service is down.
+    JSON bodies can be sent gzip-compressed. Latency is recorded per endpoint.
+
+    Settings are read from the app config (HTTP_*), the base URL from url_config_key.
+    """
+
+    def __init__(self, name: str, url_config_key: str):
+        self.name = name
+        self.url_config_key = url_config_key
+        self.circuit_breaker = CircuitBreaker()
+        self.metrics = LatencyMetrics()
+        self.__session = None
+        self.__session_lock = threading.Lock()
+        _clients[name] = self
+
+    def get(self, path, params=None, idempotent=True):
+        """
+        Sends a GET request to the service.
+
+        :param path: Path relative to the service base URL
+        :param params: Query parameters
+        :param idempotent: Whether the request may be retried
+        :return: requests.Response
+        :raises ServiceUnavailable: If the service is unreachable or the circuit is open
+        :raises GatewayTimeout: If the service did not answer in time
+        """
+        return self.request("GET", path, params=params, idempotent=idempotent)
+
+    def post(self, path, json=None, params=None, idempotent=True):
+        """
+        Sends a POST request with a JSON body to the service.
+        Recommendation and calculation endpoints do not change state and may be retried,
+        pass idempotent=False for all other endpoints.
+
+        :param path: Path relative to the service base URL
+        :param json: JSON serializable request body
+        :param params: Query parameters
+        :param idempotent: Whether the request may be retried
+        :return: requests.Response
+        :raises ServiceUnavailable: If the service is unreachable or the circuit is open
+        :raises GatewayTimeout: If the service did not answer in time
+        """
+        return self.request(
+            "POST", path, json=json, params=params, idempotent=idempotent
+        )
+
+    def post_stream(self, path, chunks, content_type, params=None, gzipped=True):
+        """
+        Sends a POST request whose body is streamed with chunked transfer encoding,
+        so the body is never held in memory as a whole.
+        The chunks can only be consumed once, so the request is never retried.
+
+        :param path: Path relative to the service base URL
+        :param chunks: Iterable of encoded body chunks
+        :param content_type: Content type of the body
+        :param params: Query parameters
+        :param gzipped: Whether the chunks are gzip-compressed
+        :return: requests.Response
+        :raises ServiceUnavailable: If the service is unreachable or the circuit is open
+        :raises GatewayTimeout: If the service did not answer in time
+        """
+        headers = {"Content-Type": content_type}
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        return self.request(
+            "POST",
+            path,
+            params=params,
+            idempotent=False,
+            data=chunks,
+            headers=headers,
+        )
+
+    def request(
+        self,
+        method,
+        path,
+        json=None,
+        params=None,
+        idempotent=True,
+        data=None,
+        headers=None,
+    ):
+        url = current_app.config.get(self.url_config_key) + path
+        headers = {"accept": "application/json", **(headers or {})}
+        if json is not None:
+            data = jsonlib.dumps(json).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+            if self.__setting("HTTP_GZIP_REQUESTS") and len(data) >= self.__setting(
+                "HTTP_GZIP_MIN_BYTES"
+            ):
+                data = gzip.compress(data)
+                headers["Content-Encoding"] = "gzip"
+
+        timeout = (
+            self.__setting("HTTP_CONNECT_TIMEOUT"),
+            self.__setting("HTTP_READ_TIMEOUT"),
+        )
+        attempts = 1 + (self.__setting("HTTP_RETRIES") if idempotent else 0)
+        endpoint = f"{method} {path}"
+
+        if not self.circuit_breaker.allow_request(
+            self.__setting("HTTP_CIRCUIT_RESET_TIMEOUT")
+        ):
+            raise ServiceUnavailable(
+                f"The {self.name} service is currently unavailable"
+            )
+
+        for attempt in range(attempts):
+            if attempt > 0:
+                time.sleep(self.__setting("HTTP_RETRY_BACKOFF") * 2 ** (attempt - 1))
+            start = time.perf_counter()
+            try:
+                response = self.__get_session().request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    timeout=timeout,
+                )
+            except requests.RequestException as e:
+                self.metrics.record(endpoint, time.perf_counter() - start, True)
+                logging.warning(
+                    f"{self.name} {endpoint} failed (attempt {attempt + 1}): {e}"
+                )
+                # A read timeout means the service may still be working on the request,
+                # sending it again would repeat the work, so only connect errors retry
+                if attempt + 1 < attempts and isinstance(e, requests.ConnectionError):
+                    continue
+                self.circuit_breaker.record_failure(
+                    self.__setting("HTTP_CIRCUIT_FAILURE_THRESHOLD")
+                )
+                if isinstance(e, requests.Timeout):
+                    raise GatewayTimeout(f"The {self.name} service timed out")
+                raise ServiceUnavailable(f"The {self.name} service is unreachable")
+
+            failed = response.status_code >= 500
+            self.metrics.record(endpoint, time.perf_counter() - start, failed)
+            if response.status_code in RETRY_STATUSES and attempt + 1 < attempts:
+                logging.warning(
+                    f"{self.name} {endpoint} returned {response.status_code} "
+                    f"(attempt {attempt + 1})"
+                )
+                continue
+            if failed:
+                self.circuit_breaker.record_failure(
+                    self.__setting("HTTP_CIRCUIT_FAILURE_THRESHOLD")
+                )
+            else:
+                self.circuit_breaker.record_success()
+            return response
+
+    def stats(self):
+        """
+        :return: Circuit state and per-endpoint latency metrics of the client
+        """
+        return {
+            "name": self.name,
+            "circuit": self.circuit_breaker.state,
+            "endpoints": self.metrics.stats(),
+        }
+
+    def close(self):
+        """
+        Closes pooled connections. A new session is created on the next call.
+        """
+        with self.__session_lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+
+    def __get_session(self):
+        with self.__session_lock:
+            if self.__session is None:
+                pool_size = self.__setting("HTTP_POOL_SIZE")
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=pool_size, max_retries=0
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.__session = session
+            return self.__session
+
+    @staticmethod
+    def __setting(key):
+        return current_app.config.get(key, getattr(Config, key))
+
+
+def get_client_stats():
+    """
+    :return: Metrics of all service clients
+    """
+    return [client.stats() for client in _clients.values()]
+
+
+pipeline_client = ServiceClient("pipeline", "PIPELINE_URL")
+difference_calc_client = ServiceClient("difference_calc", "DIFFERENCE_CALC_URL")
@@ -0,0 +1,58 @@
+class CompiledSchema:
+    """
+    Lookup tables of a schema, built once and used for many mentions and relations.
+    Replaces linear scans over the components of a schema_output_dto by dict lookups.
+    """
+
+    def __init__(self, schema):
+        """
+        :param schema: schema_output_dto
+        """
+        self.schema = schema
+        self.schema_mention_ids_by_tag = {
+            schema_mention["tag"]: schema_mention["id"]
+            for schema_mention in schema["schema_mentions"]
+        }
+        self.schema_relation_ids_by_tag = {
+            schema_relation["tag"]: schema_relation["id"]
+            for schema_relation in schema["schema_relations"]
+        }
+        # Undirected constraints are also stored with head and tail swapped.
+        # The first constraint in schema order matching a key wins.
+        self.__constraints = {}
+        for constraint in schema["schema_constraints"]:
+            relation_id = constraint["schema_relation"]["id"]
+            head_id = constraint["schema_mention_head"]["id"]
+            tail_id = constraint["schema_mention_tail"]["id"]
+            self.__constraints.setdefault((relation_id, head_id, tail_id), constraint)
+            if constraint["is_directed"] == False:
+                self.__constraints.setdefault(
+                    (relation_id, tail_id, head_id), constraint
+                )
+
+    def constraint(
+        self, schema_relation_id, head_schema_mention_id, tail_schema_mention_id
+    ):
+        """
+        Finds the constraint allowing a relation between mentions.
+
+        :param schema_relation_id: Schema relation ID of the relation
+        :param head_schema_mention_id: Schema mention ID of head mention
+        :param tail_schema_mention_id: Schema mention ID of tail mention
+        :return: Constraint of schema_output_dto, None if the relation is not allowed
+        """
+        return self.__constraints.get(
+            (schema_relation_id, head_schema_mention_id, tail_schema_mention_id)
+        )
+
+    def constraint_by_tags(self, relation_tag, head_tag, tail_tag):
+        """
+        Finds the constraint allowing a relation between mentions by tags.
+
+        :return: Constraint of schema_output_dto, None if the relation is not allowed
+        """
+        return self.constraint(
+            self.schema_relation_ids_by_tag.get(relation_tag),
+            self.schema_mention_ids_by_tag.get(head_tag),
+            self.schema_mention_ids_by_tag.get(tail_tag),
+        )
@@ -14,6 +14,64 @@ class Config:
     )
     DEBUG = os.getenv("DEBUG", True)
 
+    # Opt-in cache and client metrics at /api/_debug/caches and /api/_debug/clients
+    DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true"
+
+    # Opt-in SQL statement profiling, exposed as response headers and /api/_debug/profile
+    SQL_PROFILING = os.getenv("SQL_PROFILING", "false").lower() == "true"
+    SQL_PROFILING_BUFFER_SIZE = int(os.getenv("SQL_PROFILING_BUFFER_SIZE", 100))
+    SQL_PROFILING_SLOWEST = int(os.getenv("SQL_PROFILING_SLOWEST", 5))
+    SQL_PROFILING_DUPLICATE_THRESHOLD = int(
+        os.getenv("SQL_PROFILING_DUPLICATE_THRESHOLD", 5)
+    )
+
+    # Clients of the pipeline and difference calculation services
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+    # Recommendations of large language models may take minutes
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 300))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", 0.5))
+    HTTP_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("HTTP_CIRCUIT_FAILURE_THRESHOLD", 5))
+    HTTP_CIRCUIT_RESET_TIMEOUT = float(os.getenv("HTTP_CIRCUIT_RESET_TIMEOUT", 30))
+    HTTP_GZIP_REQUESTS = os.getenv("HTTP_GZIP_REQUESTS", "false").lower() == "true"
+    HTTP_GZIP_MIN_BYTES = int(os.getenv("HTTP_GZIP_MIN_BYTES", 1024))
+
+    # Seconds the model catalogue of the pipeline is fresh, and served stale while refreshing
+    MODEL_CATALOGUE_TTL = float(os.getenv("MODEL_CATALOGUE_TTL", 300))
+    MODEL_CATALOGUE_STALE_TTL = float(os.getenv("MODEL_CATALOGUE_STALE_TTL", 3600))
+
+    # Documents whose tokens are cached in compact form
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 256))
+
+    # Document edits whose F1 score is cached for their latest annotation revision
+    F1_SCORE_CACHE_SIZE = int(os.getenv("F1_SCORE_CACHE_SIZE", 1024))
+
+    # Background job workers per process and seconds between attempts of a job
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+    JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", 5))
+    # Seconds between sweeps renewing the heartbeat of the jobs of a process and
+    # recovering jobs orphaned by a stopped process (0 disables them), and seconds
+    # without heartbeat after which a job is orphaned. Must exceed the interval.
+    JOB_SWEEP_INTERVAL = float(os.getenv("JOB_SWEEP_INTERVAL", 30))
+    JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", 120))
+
+    # Documents per transaction and concurrent pipeline calls when pre-annotating projects
+    PRE_ANNOTATION_BATCH_SIZE = int(os.getenv("PRE_ANNOTATION_BATCH_SIZE", 25))
+    PRE_ANNOTATION_CONCURRENCY = int(os.getenv("PRE_ANNOTATION_CONCURRENCY", 4))
+
+    # Documents per transaction when importing documents in the background
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 100))
+
+    # Opt-in: training data is streamed to the pipeline as gzip-compressed NDJSON,
+    # loaded in batches of document edits. Only enable for pipelines accepting it.
+    TRAIN_STREAM_EXPORT = os.getenv("TRAIN_STREAM_EXPORT", "false").lower() == "true"
+    TRAIN_EXPORT_BATCH_SIZE = int(os.getenv("TRAIN_EXPORT_BATCH_SIZE", 50))
+    # Training jobs queued or running at once per schema, and seconds between polls
+    # of the pipeline while it trains asynchronously
+    TRAIN_JOBS_PER_SCHEMA = int(os.getenv("TRAIN_JOBS_PER_SCHEMA", 1))
+    TRAIN_POLL_INTERVAL = float(os.getenv("TRAIN_POLL_INTERVAL", 10))
+
     SQLALCHEMY_DATABASE_URI = (
         f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
     )
@@ -33,3 +91,4 @@ class TestingConfig:
     DEBUG = os.getenv("DEBUG", True)
     PIPELINE_URL = os.getenv("PIPELINE_URL", "http://annotation_pipeline:8080/pipeline")
     TESTING = True
+    DEBUG_ENDPOINTS = True
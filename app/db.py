@@ -1,4 +1,6 @@
-from flask import Flask, g
+import logging
+
+from flask import Flask, g, request
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
@@ -25,6 +27,12 @@ def add_transaction_wrapper(app: Flask):
     @app.after_request
     def commit_or_rollback_transaction(response):
         """Commit the transaction or rollback in case of an error after the request."""
+        read_cache_stats = g.db_session.info.get("read_cache_stats")
+        if read_cache_stats:
+            logging.debug(
+                f"{request.method} {request.endpoint}: read cache "
+                f"{read_cache_stats['hits']} hits, {read_cache_stats['misses']} misses"
+            )
         try:
             if response.status_code < 400:  # Commit only for successful responses
                 g.db_session.commit()
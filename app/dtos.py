@@ -118,6 +118,7 @@ document_list_dto = api.model(
     "DocumentOutput",
     {
         "documents": fields.List(fields.Nested(document_output_dto)),
+        "next_cursor": fields.Integer,
     },
 )
 
@@ -321,6 +322,30 @@ document_edit_input_dto = api.model(
     },
 )
 
+project_pre_annotation_input_dto = api.model(
+    "ProjectPreAnnotationInput",
+    {
+        "model_mention_id": fields.Integer(required=False),
+        "model_settings_mention": fields.List(
+            fields.Nested(recommendation_model_settings_dto)
+        ),
+        "model_entities_id": fields.Integer(required=False),
+        "model_settings_entities": fields.List(
+            fields.Nested(recommendation_model_settings_dto)
+        ),
+        "model_relation_id": fields.Integer(required=False),
+        "model_settings_relation": fields.List(
+            fields.Nested(recommendation_model_settings_dto)
+        ),
+        "batch_size": fields.Integer(
+            required=False, min=1, description="Documents stored per transaction"
+        ),
+        "concurrency": fields.Integer(
+            required=False, min=1, description="Concurrent pipeline requests"
+        ),
+    },
+)
+
 document_overtake_dto = api.model(
     "DocumentOvertake",
     {
@@ -345,6 +370,9 @@ document_edit_output_dto = api.model(
         "entity_model_id": fields.Integer,
         "relation_model_id": fields.Integer,
         "state": fields.Nested(document_edit_state_dto),
+        "job_id": fields.Integer(
+            description="Job generating the mention recommendations"
+        ),
     },
 )
 
@@ -899,3 +927,58 @@ f1_score_dto = api.model(
 document_import_dto = api.model(
     "DocumentImportList", {"documents": fields.List(fields.Raw())}
 )
+
+job_output_dto = api.model(
+    "JobOutput",
+    {
+        "id": fields.Integer,
+        "type": fields.String,
+        "status": fields.String(
+            enum=["QUEUED", "RUNNING", "SUCCEEDED", "FAILED", "CANCELLED"]
+        ),
+        "progress": fields.Integer(description="Progress in percent"),
+        "attempts": fields.Integer,
+        "result": fields.Raw,
+        "error": fields.String,
+        "created_at": fields.DateTime,
+        "started_at": fields.DateTime,
+        "finished_at": fields.DateTime,
+    },
+)
+
+job_output_list_dto = api.model(
+    "JobOutputList",
+    {
+        "jobs": fields.List(fields.Nested(job_output_dto)),
+    },
+)
+
+recommendation_review_input_dto = api.model(
+    "RecommendationReviewInput",
+    {
+        "document_edit_id": fields.Integer(required=True),
+        "action": fields.String(required=True, enum=["accept", "reject"]),
+        "ids": fields.List(
+            fields.Integer,
+            description="Recommendations to review. Without ids and tag, all remaining recommendations are reviewed",
+        ),
+        "tag": fields.String(
+            description="Review all remaining recommendations of this tag"
+        ),
+    },
+)
+
+recommendation_review_output_dto = api.model(
+    "RecommendationReviewOutput",
+    {
+        "action": fields.String(enum=["accept", "reject"]),
+        "count": fields.Integer(description="Number of reviewed recommendations"),
+        "recommendation_ids": fields.List(
+            fields.Integer, description="Reviewed recommendations"
+        ),
+        "ids": fields.List(
+            fields.Integer,
+            description="Created items of accepted recommendations, in the order of recommendation_ids",
+        ),
+    },
+)
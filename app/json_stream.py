@@ -0,0 +1,152 @@
+import codecs
+import json
+import zlib
+
+WHITESPACE = " \t\n\r"
+
+
+class JsonArrayReader:
+    """
+    Reads the items of a JSON array one by one from a binary stream.
+    Only the item currently parsed is held in memory, so arbitrarily large
+    arrays can be read with bounded memory.
+    """
+
+    def __init__(self, stream, chunk_size=64 * 1024):
+        """
+        :param stream: Binary file-like object containing UTF-8 encoded JSON
+        :param chunk_size: Bytes read from the stream at once
+        """
+        self.__stream = stream
+        self.__chunk_size = chunk_size
+        self.__decoder = json.JSONDecoder()
+        self.__utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.__buffer = ""
+        self.__position = 0
+        self.__eof = False
+
+    def items(self, key=None):
+        """
+        Yields the items of the array.
+
+        :param key: If given, the document is an object and the array is the value of key.
+            Other values of the object are skipped.
+        :raises ValueError: If the stream is no valid JSON or the array is missing
+        """
+        if key is None:
+            yield from self.__array_items()
+            self.__expect_end()
+            return
+
+        self.__expect("{")
+        found = False
+        if self.__peek() == "}":
+            self.__position += 1
+        else:
+            while True:
+                name = self.__value()
+                self.__expect(":")
+                if name == key:
+                    found = True
+                    yield from self.__array_items()
+                else:
+                    self.__value()
+                if self.__peek() == ",":
+                    self.__position += 1
+                    continue
+                self.__expect("}")
+                break
+        if not found:
+            raise ValueError(f'Missing "{key}"')
+        self.__expect_end()
+
+    def __array_items(self):
+        self.__expect("[")
+        if self.__peek() == "]":
+            self.__position += 1
+            return
+        while True:
+            yield self.__value()
+            if self.__peek() == ",":
+                self.__position += 1
+                continue
+            self.__expect("]")
+            return
+
+    def __value(self):
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.__buffer) or self.__eof:
+                    self.__position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise ValueError("Invalid JSON") from None
+            self.__fill()
+
+    def __peek(self):
+        """
+        Skips whitespace and returns the next character, None at the end of the stream.
+        """
+        while True:
+            while (
+                self.__position < len(self.__buffer)
+                and self.__buffer[self.__position] in WHITESPACE
+            ):
+                self.__position += 1
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+            if self.__eof:
+                return None
+            self.__fill()
+
+    def __expect(self, character):
+        if self.__peek() != character:
+            raise ValueError(f'Invalid JSON, expected "{character}"')
+        self.__position += 1
+
+    def __expect_end(self):
+        if self.__peek() is not None:
+            raise ValueError("Invalid JSON, unexpected data after the end")
+
+    def __fill(self):
+        # Read at least as much as is buffered, so a large item is parsed
+        # a logarithmic number of times
+        buffered = len(self.__buffer) - self.__position
+        chunk = self.__stream.read(max(self.__chunk_size, buffered))
+        self.__eof = not chunk
+        self.__buffer = self.__buffer[self.__position :] + self.__utf8.decode(
+            chunk, final=self.__eof
+        )
+        self.__position = 0
+
+
+def gzip_ndjson(records, chunk_size=64 * 1024):
+    """
+    Encodes records as gzip-compressed newline-delimited JSON, one record per line.
+    Records are consumed lazily and compressed output is yielded in chunks of about
+    chunk_size bytes, so an upload of arbitrarily many records needs bounded memory.
+
+    :param records: Iterable of JSON serializable records
+    :param chunk_size: Compressed bytes yielded at once
+    :return: Generator of bytes
+    """
+    # wbits 31 writes a gzip header and trailer
+    compressor = zlib.compressobj(wbits=31)
+    pending = []
+    pending_size = 0
+    for record in records:
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        compressed = compressor.compress(line)
+        if compressed:
+            pending.append(compressed)
+            pending_size += len(compressed)
+        if pending_size >= chunk_size:
+            yield b"".join(pending)
+            pending = []
+            pending_size = 0
+    pending.append(compressor.flush())
+    yield b"".join(pending)
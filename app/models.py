@@ -1,4 +1,4 @@
-from sqlalchemy import text
+from sqlalchemy import func, text
 
 from app.db import db
 
@@ -23,6 +23,7 @@ class Team(db.Model):
 
 class UserTeam(db.Model):
     __tablename__ = "UserTeam"
+    __table_args__ = (db.Index("ix_UserTeam_user_id_team_id", "user_id", "team_id"),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey("User.id"), nullable=False)
     team_id = db.Column(db.Integer, db.ForeignKey("Team.id"), nullable=False)
@@ -40,10 +41,13 @@ class Schema(db.Model):
     active = db.Column(
         db.Boolean, nullable=False, default=True, server_default=text("true")
     )
+    # Incremented whenever components or models of the schema change
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
 
 class SchemaMention(db.Model):
     __tablename__ = "SchemaMention"
+    __table_args__ = (db.Index("ix_SchemaMention_schema_id", "schema_id"),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     schema_id = db.Column(db.Integer, db.ForeignKey("Schema.id"), nullable=False)
     tag = db.Column(db.String, nullable=False)
@@ -54,6 +58,7 @@ class SchemaMention(db.Model):
 
 class SchemaRelation(db.Model):
     __tablename__ = "SchemaRelation"
+    __table_args__ = (db.Index("ix_SchemaRelation_schema_id", "schema_id"),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     schema_id = db.Column(db.Integer, db.ForeignKey("Schema.id"), nullable=False)
     tag = db.Column(db.String, nullable=False)
@@ -62,6 +67,9 @@ class SchemaRelation(db.Model):
 
 class SchemaConstraint(db.Model):
     __tablename__ = "SchemaConstraint"
+    __table_args__ = (
+        db.Index("ix_SchemaConstraint_schema_relation_id", "schema_relation_id"),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     schema_relation_id = db.Column(
         db.Integer, db.ForeignKey("SchemaRelation.id"), nullable=False
@@ -85,6 +93,13 @@ class Project(db.Model):
 
 class Document(db.Model):
     __tablename__ = "Document"
+    __table_args__ = (
+        db.Index(
+            "ix_Document_project_id_active",
+            "project_id",
+            postgresql_where=text("active = true"),
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(), unique=False, nullable=False)
     content = db.Column(db.String(), nullable=False)
@@ -141,6 +156,16 @@ class RecommendationModel(db.Model):
 
 class DocumentEdit(db.Model):
     __tablename__ = "DocumentEdit"
+    __table_args__ = (
+        db.Index(
+            "ix_DocumentEdit_document_id_user_id_active",
+            "document_id",
+            "user_id",
+            postgresql_where=text("active = true"),
+        ),
+        db.Index("ix_DocumentEdit_user_id", "user_id"),
+        db.Index("ix_DocumentEdit_schema_id", "schema_id"),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     state_id = db.Column(
         db.Integer, db.ForeignKey("DocumentEditState.id"), nullable=False
@@ -154,10 +179,17 @@ class DocumentEdit(db.Model):
     mention_model_id = db.Column(db.Integer, db.ForeignKey("RecommendationModel.id"))
     entity_model_id = db.Column(db.Integer, db.ForeignKey("RecommendationModel.id"))
     relation_model_id = db.Column(db.Integer, db.ForeignKey("RecommendationModel.id"))
+    # Incremented by every transaction changing mentions, relations or entities
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
 
 class Token(db.Model):
     __tablename__ = "Token"
+    __table_args__ = (
+        db.Index(
+            "ix_Token_document_id_document_index", "document_id", "document_index"
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     text = db.Column(db.String(), nullable=False)
     document_index = db.Column(db.Integer, nullable=False)
@@ -168,6 +200,14 @@ class Token(db.Model):
 
 class Mention(db.Model):
     __tablename__ = "Mention"
+    __table_args__ = (
+        db.Index(
+            "ix_Mention_document_edit_id_document_recommendation_id",
+            "document_edit_id",
+            "document_recommendation_id",
+        ),
+        db.Index("ix_Mention_entity_id", "entity_id"),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     schema_mention_id = db.Column(
         db.Integer, db.ForeignKey("SchemaMention.id"), nullable=False
@@ -184,13 +224,31 @@ class Mention(db.Model):
 
 class TokenMention(db.Model):
     __tablename__ = "TokenMention"
+    __table_args__ = (
+        db.Index("ix_TokenMention_mention_id", "mention_id"),
+        db.Index("ix_TokenMention_token_id", "token_id"),
+        # A token is part of at most one mention per annotation
+        db.Index(
+            "ix_TokenMention_document_edit_id_token_id",
+            "document_edit_id",
+            "token_id",
+            unique=True,
+            postgresql_where=text("document_edit_id IS NOT NULL"),
+            sqlite_where=text("document_edit_id IS NOT NULL"),
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     token_id = db.Column(db.Integer, db.ForeignKey("Token.id"), nullable=False)
     mention_id = db.Column(db.Integer, db.ForeignKey("Mention.id"), nullable=False)
+    # Copy of Mention.document_edit_id, only set if the mention is no recommendation
+    document_edit_id = db.Column(
+        db.Integer, db.ForeignKey("DocumentEdit.id"), nullable=True
+    )
 
 
 class Entity(db.Model):
     __tablename__ = "Entity"
+    __table_args__ = (db.Index("ix_Entity_document_edit_id", "document_edit_id"),)
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     isShownRecommendation = db.Column(db.Boolean, nullable=False, default=False)
     document_edit_id = db.Column(
@@ -203,6 +261,19 @@ class Entity(db.Model):
 
 class Relation(db.Model):
     __tablename__ = "Relation"
+    __table_args__ = (
+        db.Index(
+            "ix_Relation_document_edit_id_document_recommendation_id",
+            "document_edit_id",
+            "document_recommendation_id",
+        ),
+        db.Index(
+            "ix_Relation_mention_head_id_mention_tail_id",
+            "mention_head_id",
+            "mention_tail_id",
+        ),
+        db.Index("ix_Relation_mention_tail_id", "mention_tail_id"),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     isShownRecommendation = db.Column(db.Boolean, nullable=False, default=False)
     schema_relation_id = db.Column(
@@ -248,3 +319,34 @@ class DocumentEditModelSettings(db.Model):
     )
     key = db.Column(db.String(), unique=False, nullable=False)
     value = db.Column(db.String(), unique=False, nullable=False)
+
+
+class Job(db.Model):
+    """
+    Background job, executed by the job workers after the creating transaction committed.
+    """
+
+    __tablename__ = "Job"
+    __table_args__ = (
+        db.Index("ix_Job_user_id", "user_id"),
+        db.Index("ix_Job_concurrency_key_status", "concurrency_key", "status"),
+        db.Index("ix_Job_status_heartbeat_at", "status", "heartbeat_at"),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    type = db.Column(db.String(), nullable=False)
+    status = db.Column(db.String(), nullable=False)
+    # Jobs sharing a key, e.g. trainings of one schema, can be limited in number
+    concurrency_key = db.Column(db.String(), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("User.id"), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.String(), nullable=True)
+    # Progress in percent
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Renewed in UTC by the process running the job, a stale one marks an orphaned job
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
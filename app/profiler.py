@@ -0,0 +1,137 @@
+import collections
+import heapq
+import logging
+import threading
+import time
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+
+from app.db import engine
+from app.repositories.base_repository import READ_CACHE_STATS
+
+
+class SqlProfiler:
+    """
+    Opt-in per-request SQL instrumentation built on engine events.
+
+    Counts the statements of every request, sums their execution time, keeps the
+    slowest statements and detects statements executed repeatedly (N+1 queries).
+    The summary is added as response headers and kept in a ring buffer of the
+    most recent requests.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__profiles = collections.deque(maxlen=100)
+        self.__slowest = 5
+        self.__duplicate_threshold = 5
+        self.__engines = set()
+
+    def init_app(self, app: Flask, bind=engine):
+        self.__profiles = collections.deque(
+            maxlen=app.config.get("SQL_PROFILING_BUFFER_SIZE", 100)
+        )
+        self.__slowest = app.config.get("SQL_PROFILING_SLOWEST", 5)
+        self.__duplicate_threshold = app.config.get(
+            "SQL_PROFILING_DUPLICATE_THRESHOLD", 5
+        )
+        self.__listen(bind)
+        app.before_request(self.__start_profile)
+        app.after_request(self.__finish_profile)
+
+    def get_profiles(self):
+        """
+        Returns the profiles of the most recent requests, newest first.
+        """
+        with self.__lock:
+            return list(reversed(self.__profiles))
+
+    def __listen(self, bind):
+        if bind in self.__engines:
+            return
+        event.listen(bind, "before_cursor_execute", self.__before_execute)
+        event.listen(bind, "after_cursor_execute", self.__after_execute)
+        event.listen(bind, "handle_error", self.__handle_error)
+        self.__engines.add(bind)
+
+    def __before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+    def __after_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = time.perf_counter() - conn.info["sql_profiler_start"].pop()
+        if has_request_context() and "sql_profile" in g:
+            g.sql_profile.append((statement, duration))
+
+    def __handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if exception_context.execution_context is not None and connection is not None:
+            starts = connection.info.get("sql_profiler_start")
+            if starts:
+                starts.pop()
+
+    def __start_profile(self):
+        g.sql_profile = []
+        g.sql_profile_start = time.perf_counter()
+
+    def __finish_profile(self, response):
+        if "sql_profile" not in g:
+            return response
+        statements = g.sql_profile
+        total_time = sum(duration for _, duration in statements)
+        counts = collections.Counter(statement for statement, _ in statements)
+        duplicates = {
+            statement: count for statement, count in counts.items() if count > 1
+        }
+        db_session = g.get("db_session")
+        read_cache_stats = (
+            db_session.info.get(READ_CACHE_STATS, {}) if db_session else {}
+        )
+
+        profile = {
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "request_ms": round((time.perf_counter() - g.sql_profile_start) * 1000, 2),
+            "statements": len(statements),
+            "db_ms": round(total_time * 1000, 2),
+            "read_cache_hits": read_cache_stats.get("hits", 0),
+            "slowest": [
+                {"statement": statement, "ms": round(duration * 1000, 2)}
+                for statement, duration in heapq.nlargest(
+                    self.__slowest, statements, key=lambda item: item[1]
+                )
+            ],
+            "duplicates": [
+                {"statement": statement, "count": count}
+                for statement, count in sorted(
+                    duplicates.items(), key=lambda item: item[1], reverse=True
+                )
+            ],
+        }
+        with self.__lock:
+            self.__profiles.append(profile)
+
+        for statement, count in duplicates.items():
+            if count >= self.__duplicate_threshold:
+                logging.warning(
+                    f"Possible N+1 query in {request.method} {request.endpoint}: "
+                    f"statement executed {count} times: {statement}"
+                )
+
+        response.headers["X-SQL-Statements"] = str(profile["statements"])
+        response.headers["X-SQL-Time-Ms"] = str(profile["db_ms"])
+        response.headers["X-SQL-Duplicates"] = str(
+            sum(count - 1 for count in duplicates.values())
+        )
+        response.headers["X-Read-Cache-Hits"] = str(profile["read_cache_hits"])
+        return response
+
+
+sql_profiler = SqlProfiler()
@@ -1,4 +1,116 @@
+import functools
+import itertools
+
 from flask import g
+from sqlalchemy import Integer, case, column, event, insert, select, update, values
+
+from app.db import SessionFactory
+from app.models import DocumentEdit, Entity, Mention, Relation, TokenMention
+
+READ_CACHE = "read_cache"
+READ_CACHE_STATS = "read_cache_stats"
+REVISED_DOCUMENT_EDITS = "revised_document_edits"
+
+# Models of annotations, whose changes increment the revision of their document edit
+ANNOTATION_MODELS = (Mention, Relation, Entity, TokenMention)
+ANNOTATION_TABLES = {model.__table__ for model in ANNOTATION_MODELS}
+
+
+def request_cached(method):
+    """
+    Caches the result of a repository read for the lifetime of the request session.
+    The cache key is the query method and its (hashable) positional and keyword
+    arguments. Any write executed through the session invalidates the whole cache.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.cached_read(
+            (method.__qualname__, args, tuple(sorted(kwargs.items()))),
+            lambda: method(self, *args, **kwargs),
+        )
+
+    return wrapper
+
+
+@event.listens_for(SessionFactory, "after_flush")
+def _invalidate_after_flush(session, flush_context):
+    session.info.pop(READ_CACHE, None)
+
+
+@event.listens_for(SessionFactory, "do_orm_execute")
+def _invalidate_after_write(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info.pop(READ_CACHE, None)
+
+
+@event.listens_for(SessionFactory, "before_flush")
+def _track_revised_objects(session, flush_context, instances):
+    for db_object in itertools.chain(session.new, session.dirty, session.deleted):
+        if (
+            isinstance(db_object, ANNOTATION_MODELS)
+            and db_object.document_edit_id is not None
+        ):
+            session.info.setdefault(REVISED_DOCUMENT_EDITS, set()).add(
+                db_object.document_edit_id
+            )
+
+
+@event.listens_for(SessionFactory, "do_orm_execute")
+def _track_revised_rows(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    table = orm_execute_state.statement.table
+    if table not in ANNOTATION_TABLES:
+        return
+    if orm_execute_state.is_insert:
+        rows = orm_execute_state.parameters
+        document_edit_ids = {
+            row.get("document_edit_id")
+            for row in (rows if isinstance(rows, list) else [rows or {}])
+        }
+    else:
+        # Rows are only known by the filter of the statement, so their
+        # document edits are selected before they are changed
+        document_edit_ids = set(
+            orm_execute_state.session.scalars(
+                select(table.c.document_edit_id)
+                .where(orm_execute_state.statement.whereclause)
+                .distinct()
+            )
+        )
+    document_edit_ids.discard(None)
+    if document_edit_ids:
+        orm_execute_state.session.info.setdefault(REVISED_DOCUMENT_EDITS, set()).update(
+            document_edit_ids
+        )
+
+
+@event.listens_for(SessionFactory, "before_commit")
+def _increment_revisions(session):
+    # Changes still pending are flushed by commit only after this hook
+    session.flush()
+    document_edit_ids = session.info.pop(REVISED_DOCUMENT_EDITS, None)
+    if document_edit_ids:
+        session.execute(
+            update(DocumentEdit)
+            .where(DocumentEdit.id.in_(sorted(document_edit_ids)))
+            .values(revision=DocumentEdit.revision + 1),
+            execution_options={"synchronize_session": False},
+        )
+
+
+@event.listens_for(SessionFactory, "after_rollback")
+def _discard_revisions(session):
+    session.info.pop(REVISED_DOCUMENT_EDITS, None)
 
 
 class BaseRepository:
@@ -21,6 +133,91 @@ class BaseRepository:
 
         return db_object
 
+    def bulk_insert(self, classname, rows, return_ids=True):
+        """
+        Stores multiple rows of one table in the database
+        - Rows are sent as batched multi-row INSERT statements with RETURNING
+        - No ORM objects are created, flushed or refreshed per row
+        - The rows are not committed, as this is done by the transaction wrapper
+        :param classname: Model class of the table
+        :param rows: List of dicts mapping column names to values
+        :param return_ids: If false, ids are not returned, so the rows are sent
+            as one executemany without RETURNING
+        :return: List of generated ids, in the same order as rows
+        """
+        if not rows:
+            return []
+        if not return_ids:
+            self.get_session().execute(insert(classname), rows)
+            return []
+        return list(
+            self.get_session().scalars(
+                insert(classname).returning(classname.id, sort_by_parameter_order=True),
+                rows,
+            )
+        )
+
+    def bulk_update(self, classname, column_name, values_by_id):
+        """
+        Sets one column of multiple rows to individual values with a single UPDATE
+        - PostgreSQL joins the new values as a list: UPDATE ... FROM (VALUES ...)
+        - Other databases do not name the columns of a VALUES list, they use a CASE expression
+        - Loaded objects of the rows are expired, so they do not keep the old value
+        :param classname: Model class of the table
+        :param column_name: Name of the column to set
+        :param values_by_id: Dict mapping ids to the new values
+        """
+        if not values_by_id:
+            return
+        session = self.get_session()
+        model_column = getattr(classname, column_name)
+        if session.get_bind().dialect.name == "postgresql":
+            assignments = values(
+                column("id", Integer),
+                column("value", model_column.type),
+                name="assignments",
+            ).data(list(values_by_id.items()))
+            statement = (
+                update(classname)
+                .where(classname.id == assignments.c.id)
+                .values({model_column: assignments.c.value})
+            )
+        else:
+            statement = (
+                update(classname)
+                .where(classname.id.in_(list(values_by_id)))
+                .values({model_column: case(values_by_id, value=classname.id)})
+            )
+        session.execute(statement, execution_options={"synchronize_session": False})
+        for key, db_object in list(session.identity_map.items()):
+            if isinstance(db_object, classname) and key[1][0] in values_by_id:
+                session.expire(db_object, [column_name])
+
+    def cached_read(self, key, loader):
+        """
+        Returns the result of a read, cached for the current request session
+        - Pending changes are flushed first, like autoflush does for a real query
+        - The cache is dropped on every flush and every INSERT, UPDATE or DELETE
+        :param key: Hashable key of query shape and parameters
+        :param loader: Function executing the query
+        :return: Query result
+        """
+        session = self.get_session()
+        session.flush()
+        try:
+            hash(key)
+        except TypeError:
+            return loader()
+        cache = session.info.setdefault(READ_CACHE, {})
+        stats = session.info.setdefault(READ_CACHE_STATS, {"hits": 0, "misses": 0})
+        if key in cache:
+            stats["hits"] += 1
+            return cache[key]
+        stats["misses"] += 1
+        result = loader()
+        cache[key] = result
+        return result
+
     def get_object_by_id(self, classname, object_id):
         return self.get_session().query(classname).filter_by(id=object_id).first()
 
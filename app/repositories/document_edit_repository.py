@@ -1,3 +1,5 @@
+from sqlalchemy import func
+
 from app.models import (
     DocumentEdit,
     DocumentEditModelSettings,
@@ -5,9 +7,14 @@ from app.models import (
     ModelStep,
     Document,
     DocumentEditState,
+    Project,
     User,
 )
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import (
+    REVISED_DOCUMENT_EDITS,
+    BaseRepository,
+    request_cached,
+)
 
 
 class DocumentEditRepository(BaseRepository):
@@ -43,6 +50,31 @@ class DocumentEditRepository(BaseRepository):
             .first()
         )
 
+    def get_documents_without_document_edit(self, project_id, user_id):
+        """
+        Fetch active documents of a project the user has not annotated yet,
+        with the schema of the project.
+        """
+        has_document_edit = (
+            self.get_session()
+            .query(DocumentEdit.id)
+            .filter(DocumentEdit.document_id == Document.id)
+            .filter(DocumentEdit.user_id == user_id)
+            .filter(DocumentEdit.active == True)
+            .exists()
+        )
+        return (
+            self.get_session()
+            .query(Document.id, Document.content, Project.schema_id)
+            .join(Project, Project.id == Document.project_id)
+            .filter(Document.project_id == project_id)
+            .filter(Document.active == True)
+            .filter(~has_document_edit)
+            .order_by(Document.id)
+            .all()
+        )
+
+    @request_cached
     def get_document_edit_with_document_by_id(self, document_edit_id):
         return (
             self.get_session()
@@ -93,6 +125,7 @@ class DocumentEditRepository(BaseRepository):
             DocumentEdit.document_id.in_(document_ids), DocumentEdit.active == True
         ).update({DocumentEdit.active: False}, synchronize_session=False)
 
+    @request_cached
     def get_document_edit_by_id(self, document_edit_id):
         return (
             self.get_session()
@@ -106,6 +139,7 @@ class DocumentEditRepository(BaseRepository):
                 DocumentEdit.mention_model_id,
                 DocumentEdit.entity_model_id,
                 DocumentEdit.relation_model_id,
+                DocumentEdit.revision,
             )
             .filter(DocumentEdit.id == document_edit_id)
             .filter(DocumentEdit.active == True)
@@ -128,6 +162,7 @@ class DocumentEditRepository(BaseRepository):
         for setting in settings:
             super().store_object(setting)
 
+    @request_cached
     def get_document_edit_model(self, document_edit_id):
         return (
             self.get_session()
@@ -183,6 +218,23 @@ class DocumentEditRepository(BaseRepository):
         self.store_object(document_edit)
         return document_edit
 
+    def transition_state(self, document_edit_id, current_state_id, state_id):
+        """
+        Moves a document edit to another state, if it is still in the expected state.
+        Concurrent transitions of the same document edit can not both succeed.
+
+        :return: True if the state was changed
+        """
+        updated = (
+            self.get_session()
+            .query(DocumentEdit)
+            .filter(DocumentEdit.id == document_edit_id)
+            .filter(DocumentEdit.state_id == current_state_id)
+            .filter(DocumentEdit.active == True)
+            .update({DocumentEdit.state_id: state_id}, synchronize_session=False)
+        )
+        return updated == 1
+
     def get_document_edits_by_schema(self, schema_id):
         return (
             self.get_session()
@@ -213,3 +265,25 @@ class DocumentEditRepository(BaseRepository):
             .filter(DocumentEdit.schema_id == schema_id)
             .filter(DocumentEdit.id.in_(document_edit_ids))
         ).all()
+
+    def is_revised_in_session(self, document_edit_id):
+        """
+        Whether the current transaction changed annotations of a document edit.
+        Its revision is only incremented when the transaction commits.
+        """
+        self.get_session().flush()
+        return document_edit_id in self.get_session().info.get(
+            REVISED_DOCUMENT_EDITS, ()
+        )
+
+    def count_document_edits_in_schema(self, schema_id, document_edit_ids):
+        """
+        Counts how many of the given document edits belong to a schema.
+        """
+        return (
+            self.get_session()
+            .query(func.count(DocumentEdit.id))
+            .filter(DocumentEdit.schema_id == schema_id)
+            .filter(DocumentEdit.id.in_(document_edit_ids))
+            .scalar()
+        )
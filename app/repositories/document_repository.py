@@ -16,12 +16,23 @@ from sqlalchemy import and_
 class DocumentRepository(BaseRepository):
     DOCUMENT_STATE_ID_FINISHED = 3
 
-    def get_documents_by_user(self, user_id):
-        return (
+    def get_documents_by_user(
+        self, user_id, project_id=None, after_id=None, limit=None, with_content=True
+    ):
+        """
+        Fetch the documents a user has access to, ordered by ID.
+
+        :param user_id: User ID to query documents for.
+        :param project_id: Only fetch documents of this project, if given.
+        :param after_id: Only fetch documents with a greater ID (keyset cursor), if given.
+        :param limit: Maximum number of documents to fetch, if given.
+        :param with_content: Whether to load the document content.
+        :return: List of document rows
+        """
+        query = (
             self.get_session()
             .query(
                 Document.id,
-                Document.content,
                 Document.name,
                 Document.project_id,
                 Project.name.label("project_name"),
@@ -46,15 +57,27 @@ class DocumentRepository(BaseRepository):
             .join(DocumentState, DocumentState.id == Document.state_id)
             .join(Schema, Schema.id == Project.schema_id)
             .join(User, User.id == Document.creator_id)
+            # Only the active edit, so every document is one row of the page
             .outerjoin(
                 DocumentEdit,
                 and_(
                     Document.id == DocumentEdit.document_id,
                     DocumentEdit.user_id == user_id,
+                    DocumentEdit.active == True,
                 ),
             )
             .outerjoin(DocumentEditState, DocumentEditState.id == DocumentEdit.state_id)
-        ).all()
+        )
+        if with_content:
+            query = query.add_columns(Document.content)
+        if project_id is not None:
+            query = query.filter(Document.project_id == project_id)
+        if after_id is not None:
+            query = query.filter(Document.id > after_id)
+        query = query.order_by(Document.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
     def create_document(self, name, content, project_id, user_id):
         """
@@ -188,6 +211,27 @@ class DocumentRepository(BaseRepository):
             .all()
         )
 
+    def get_all_document_edits_with_user_by_documents(self, document_ids):
+        if not document_ids:
+            return []
+        return (
+            self.get_session()
+            .query(
+                DocumentEdit.document_id,
+                DocumentEdit.id.label("edit_id"),
+                User.id.label("user_id"),
+                User.email.label("user_email"),
+                User.username.label("user_username"),
+                DocumentEditState.id.label("state_id"),
+                DocumentEditState.type.label("state_type"),
+            )
+            .join(User, User.id == DocumentEdit.user_id)
+            .join(DocumentEditState, DocumentEditState.id == DocumentEdit.state_id)
+            .filter(DocumentEdit.document_id.in_(document_ids))
+            .filter(DocumentEdit.active == True)
+            .all()
+        )
+
     def update_document_state(self, document_id, new_state_id):
         """
         Update the state of a document in the database.
@@ -38,6 +38,30 @@ class EntityRepository(BaseRepository):
             Entity(document_edit_id=document_edit_id, isShownRecommendation=True)
         )
 
+    def create_entities(
+        self,
+        document_edit_id,
+        count,
+        document_recommendation_id=None,
+        is_shown_recommendation=False,
+    ):
+        """
+        Stores multiple empty entities of a document edit with batched multi-row inserts.
+
+        :return: List of entity IDs
+        """
+        return super().bulk_insert(
+            Entity,
+            [
+                {
+                    "document_edit_id": document_edit_id,
+                    "document_recommendation_id": document_recommendation_id,
+                    "isShownRecommendation": is_shown_recommendation,
+                }
+            ]
+            * count,
+        )
+
     def delete_entity_by_id(self, entity_id):
         entity = self.get_entity_by_id(entity_id)
         if entity:
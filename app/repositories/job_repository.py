@@ -0,0 +1,245 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, or_, text
+from sqlalchemy.orm import Session
+
+from app.db import SessionFactory
+from app.models import Job
+from app.repositories.base_repository import BaseRepository
+
+AFTER_COMMIT_CALLBACKS = "after_commit_callbacks"
+
+
+@event.listens_for(SessionFactory, "after_commit")
+def _run_after_commit_callbacks(session):
+    for callback in session.info.pop(AFTER_COMMIT_CALLBACKS, []):
+        callback()
+
+
+@event.listens_for(SessionFactory, "after_rollback")
+def _discard_after_commit_callbacks(session):
+    session.info.pop(AFTER_COMMIT_CALLBACKS, None)
+
+
+def _utcnow():
+    # Heartbeats are compared in Python, independent of the database time zone
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobRepository(BaseRepository):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+    ACTIVE = (QUEUED, RUNNING)
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+    def create_job(
+        self, job_type, payload, user_id, max_attempts, concurrency_key=None
+    ):
+        job = Job(
+            type=job_type,
+            status=self.QUEUED,
+            concurrency_key=concurrency_key,
+            payload=payload,
+            user_id=user_id,
+            progress=0,
+            attempts=0,
+            max_attempts=max_attempts,
+            heartbeat_at=_utcnow(),
+        )
+        return self.store_object(job)
+
+    def get_job_by_id(self, job_id):
+        """
+        Fetch a job, always reading its current state from the database.
+        """
+        return (
+            self.get_session()
+            .query(Job)
+            .filter(Job.id == job_id)
+            .execution_options(populate_existing=True)
+            .first()
+        )
+
+    def start_attempt(self, job_id):
+        """
+        Marks a queued job as running and counts the attempt.
+
+        :return: The job, None if it does not exist or is not queued.
+        """
+        job = (
+            self.get_session()
+            .query(Job)
+            .filter(Job.id == job_id, Job.status == self.QUEUED)
+            .with_for_update()
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = self.RUNNING
+        job.attempts += 1
+        job.started_at = func.now()
+        job.heartbeat_at = _utcnow()
+        self.get_session().flush()
+        return job
+
+    def lock_concurrency_key(self, concurrency_key):
+        """
+        Serializes transactions creating jobs with the same concurrency key until
+        they end. Only PostgreSQL supports this, SQLite serializes all writes anyway.
+        """
+        if self.get_session().get_bind().dialect.name == "postgresql":
+            self.get_session().execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                {"key": concurrency_key},
+            )
+
+    def count_active_jobs(self, concurrency_key):
+        return (
+            self.get_session()
+            .query(func.count(Job.id))
+            .filter(Job.concurrency_key == concurrency_key)
+            .filter(Job.status.in_(self.ACTIVE))
+            .scalar()
+        )
+
+    def get_jobs_by_concurrency_key(self, concurrency_key, limit):
+        """
+        Fetch the most recent jobs with a concurrency key.
+        """
+        return (
+            self.get_session()
+            .query(Job)
+            .filter(Job.concurrency_key == concurrency_key)
+            .order_by(Job.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def finish_job(self, job_id, result):
+        """
+        Records the result of a running job.
+
+        :return: False if the job was cancelled meanwhile
+        """
+        return (
+            self.get_session()
+            .query(Job)
+            .filter(Job.id == job_id, Job.status == self.RUNNING)
+            .update(
+                {
+                    Job.status: self.SUCCEEDED,
+                    Job.result: result,
+                    Job.progress: 100,
+                    Job.error: None,
+                    Job.finished_at: func.now(),
+                },
+                synchronize_session=False,
+            )
+            > 0
+        )
+
+    def fail_attempt(self, job_id, error, final, status=RUNNING):
+        """
+        Records a failed attempt of a job in the given status, running by default.
+        The job is queued again unless the failure is final.
+        Cancelled jobs stay cancelled.
+        """
+        values = {Job.status: self.QUEUED, Job.error: error}
+        if final:
+            values = {
+                Job.status: self.FAILED,
+                Job.error: error,
+                Job.finished_at: func.now(),
+            }
+        self.get_session().query(Job).filter(
+            Job.id == job_id, Job.status == status
+        ).update(values, synchronize_session=False)
+
+    def touch_jobs(self, job_ids):
+        """
+        Renews the heartbeat of queued and running jobs.
+        """
+        self.get_session().query(Job).filter(
+            Job.id.in_(job_ids), Job.status.in_(self.ACTIVE)
+        ).update({Job.heartbeat_at: _utcnow()}, synchronize_session=False)
+
+    def get_stale_jobs(self, stale_after):
+        """
+        Fetch queued and running jobs whose heartbeat is older than stale_after seconds.
+        """
+        return (
+            self.get_session()
+            .query(Job)
+            .filter(Job.status.in_(self.ACTIVE), self.__is_stale(stale_after))
+            .order_by(Job.id)
+            .all()
+        )
+
+    def claim_stale_job(self, job_id, status, stale_after):
+        """
+        Renews the heartbeat of a stale job, so only one process recovers it.
+
+        :return: False if the job left the status or was renewed meanwhile
+        """
+        return (
+            self.get_session()
+            .query(Job)
+            .filter(
+                Job.id == job_id, Job.status == status, self.__is_stale(stale_after)
+            )
+            .update({Job.heartbeat_at: _utcnow()}, synchronize_session=False)
+            > 0
+        )
+
+    @staticmethod
+    def __is_stale(stale_after):
+        return or_(
+            Job.heartbeat_at.is_(None),
+            Job.heartbeat_at < _utcnow() - timedelta(seconds=stale_after),
+        )
+
+    def cancel_job(self, job_id, status):
+        """
+        Cancels a job if it is in the given status, queued or running.
+        Running jobs notice the cancellation the next time they report progress.
+
+        :return: False if the job is not in the status
+        """
+        return (
+            self.get_session()
+            .query(Job)
+            .filter(Job.id == job_id, Job.status == status)
+            .update(
+                {Job.status: self.CANCELLED, Job.finished_at: func.now()},
+                synchronize_session=False,
+            )
+            > 0
+        )
+
+    def update_progress(self, job_id, progress):
+        """
+        Stores the progress of a running job in its own transaction,
+        so it is visible before the job's transaction commits.
+
+        :return: False if the job was cancelled
+        """
+        with Session(bind=self.get_session().get_bind()) as session, session.begin():
+            return (
+                session.query(Job)
+                .filter(Job.id == job_id, Job.status == self.RUNNING)
+                .update(
+                    {Job.progress: progress, Job.heartbeat_at: _utcnow()},
+                    synchronize_session=False,
+                )
+                > 0
+            )
+
+    def run_after_commit(self, callback):
+        """
+        Calls a function once the current transaction committed.
+        It is discarded if the transaction is rolled back.
+        """
+        self.get_session().info.setdefault(AFTER_COMMIT_CALLBACKS, []).append(callback)
@@ -1,9 +1,10 @@
 from app.models import Mention, TokenMention, SchemaMention, Token
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, request_cached
 
 
 class MentionRepository(BaseRepository):
 
+    @request_cached
     def get_mentions_with_tokens_by_document_edit(self, document_edit_id):
         results = (
             self.get_session()
@@ -38,39 +39,18 @@ class MentionRepository(BaseRepository):
         )
         return results
 
-    def get_actual_mentions_with_tokens_by_document_edit(self, document_edit_id):
-        results = (
-            self.get_session()
-            .query(
-                Mention.id.label("mention_id"),
-                Mention.document_edit_id,
-                Mention.document_recommendation_id,
-                SchemaMention.tag,
-                Mention.entity_id,
-                Token.id.label("token_id"),
-                Token.text,
-                Token.document_index,
-                Token.sentence_index,
-                Token.pos_tag,
-            )
-            .join(SchemaMention, SchemaMention.id == Mention.schema_mention_id)
-            .outerjoin(TokenMention, Mention.id == TokenMention.mention_id)
-            .outerjoin(Token, TokenMention.token_id == Token.id)  # Join tokens
-            .filter(
-                (Mention.document_edit_id == document_edit_id)
-                & (Mention.document_recommendation_id.is_(None))
-            )
-            .all()
-        )
-        return results
-
-    def get_predicted_mentions_with_tokens_by_document_edit(self, document_edit_id):
-        results = (
+    def get_all_mentions_with_tokens_by_document_edit(self, document_edit_id):
+        """
+        Fetch all mentions of a document edit with their tokens, one row per token,
+        including all recommendations.
+        """
+        return (
             self.get_session()
             .query(
                 Mention.id.label("mention_id"),
                 Mention.document_edit_id,
                 Mention.document_recommendation_id,
+                Mention.isShownRecommendation,
                 SchemaMention.tag,
                 Mention.entity_id,
                 Token.id.label("token_id"),
@@ -82,14 +62,11 @@ class MentionRepository(BaseRepository):
             .join(SchemaMention, SchemaMention.id == Mention.schema_mention_id)
             .outerjoin(TokenMention, Mention.id == TokenMention.mention_id)
             .outerjoin(Token, TokenMention.token_id == Token.id)  # Join tokens
-            .filter(
-                (Mention.document_edit_id == document_edit_id)
-                & (Mention.document_recommendation_id.is_not(None))
-            )
+            .filter(Mention.document_edit_id == document_edit_id)
             .all()
         )
-        return results
 
+    @request_cached
     def get_mention_with_schema_by_id(self, mention_id):
         return (
             self.get_session()
@@ -127,6 +104,28 @@ class MentionRepository(BaseRepository):
         )
         return self.store_object(mention)
 
+    def create_mentions(self, mentions):
+        """
+        Stores multiple mentions with batched multi-row inserts.
+
+        :param mentions: List of dicts with schema_mention_id, document_edit_id,
+            document_recommendation_id, is_shown_recommendation and entity_id
+        :return: List of mention IDs in the order of mentions
+        """
+        return super().bulk_insert(
+            Mention,
+            [
+                {
+                    "schema_mention_id": mention["schema_mention_id"],
+                    "document_edit_id": mention["document_edit_id"],
+                    "document_recommendation_id": mention["document_recommendation_id"],
+                    "isShownRecommendation": mention["is_shown_recommendation"],
+                    "entity_id": mention["entity_id"],
+                }
+                for mention in mentions
+            ],
+        )
+
     def get_mentions_by_document_recommendation(self, document_recommendation_id):
         return (
             self.get_session()
@@ -160,6 +159,14 @@ class MentionRepository(BaseRepository):
             {"entity_id": entity_id}
         )
 
+    def add_to_entities(self, entity_ids_by_mention_id):
+        """
+        Assigns mentions to entities with one UPDATE statement.
+
+        :param entity_ids_by_mention_id: Dict mapping mention IDs to entity IDs
+        """
+        super().bulk_update(Mention, "entity_id", entity_ids_by_mention_id)
+
     def get_mentions_by_entity_id(self, entity_id):
         if not isinstance(entity_id, int) or entity_id <= 0:
             raise ValueError("Invalid entity ID. It must be a positive integer.")
@@ -191,6 +198,39 @@ class MentionRepository(BaseRepository):
             mention.isShownRecommendation = value
         return mention
 
+    def update_is_shown_recommendations(self, mention_ids, value):
+        """
+        Sets isShownRecommendation of multiple mentions with one statement.
+        """
+        self.get_session().query(Mention).filter(Mention.id.in_(mention_ids)).update(
+            {Mention.isShownRecommendation: value}
+        )
+
+    def get_shown_recommendations(self, document_edit_id, mention_ids=None, tag=None):
+        """
+        Fetch unreviewed mention recommendations of a document edit.
+
+        :param mention_ids: Only fetch these mentions, if given
+        :param tag: Only fetch mentions of this schema mention tag, if given
+        :return: Rows with id, schema_mention_id and entity_id, sorted by id
+        """
+        query = (
+            self.get_session()
+            .query(Mention.id, Mention.schema_mention_id, Mention.entity_id)
+            .filter(
+                Mention.document_edit_id == document_edit_id,
+                Mention.document_recommendation_id.is_not(None),
+                Mention.isShownRecommendation.is_(True),
+            )
+        )
+        if mention_ids is not None:
+            query = query.filter(Mention.id.in_(mention_ids))
+        if tag is not None:
+            query = query.join(
+                SchemaMention, SchemaMention.id == Mention.schema_mention_id
+            ).filter(SchemaMention.tag == tag)
+        return query.order_by(Mention.id).all()
+
     def get_recommendations_by_document_edit(self, document_edit_id):
         return (
             self.get_session()
@@ -223,3 +263,25 @@ class MentionRepository(BaseRepository):
             .filter(Mention.document_recommendation_id.is_(None))
             .all()
         )
+
+    def get_mention_token_ids_by_edit_ids(self, document_edit_ids):
+        """
+        Fetch mentions of document edits with the IDs of their tokens,
+        one row per token, without joining the tokens themselves.
+        """
+        return (
+            self.get_session()
+            .query(
+                Mention.id,
+                Mention.document_edit_id,
+                Mention.entity_id,
+                SchemaMention.tag,
+                TokenMention.token_id,
+            )
+            .join(SchemaMention, SchemaMention.id == Mention.schema_mention_id)
+            .join(TokenMention, TokenMention.mention_id == Mention.id)
+            .filter(Mention.document_edit_id.in_(document_edit_ids))
+            .filter(Mention.document_recommendation_id.is_(None))
+            .order_by(Mention.id, TokenMention.token_id)
+            .all()
+        )
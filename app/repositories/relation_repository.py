@@ -1,5 +1,5 @@
 from app.models import Relation, SchemaRelation
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, request_cached
 
 
 class RelationRepository(BaseRepository):
@@ -27,6 +27,7 @@ class RelationRepository(BaseRepository):
         self.store_object(relation)
         return relation
 
+    @request_cached
     def get_relations_by_document_edit(self, document_edit_id):
         return (
             self.get_session()
@@ -54,28 +55,10 @@ class RelationRepository(BaseRepository):
             .all()
         )
 
-    def get_actual_relations_by_document_edit(self, document_edit_id):
-        return (
-            self.get_session()
-            .query(
-                Relation.id,
-                Relation.isDirected,
-                Relation.isShownRecommendation,
-                Relation.mention_head_id,
-                Relation.mention_tail_id,
-                Relation.document_recommendation_id,
-                Relation.document_edit_id,
-                SchemaRelation.tag,
-            )
-            .join(SchemaRelation, SchemaRelation.id == Relation.schema_relation_id)
-            .filter(
-                (Relation.document_edit_id == document_edit_id)
-                & (Relation.document_recommendation_id.is_(None))
-            )
-            .all()
-        )
-
-    def get_predicted_recommended_relations_by_document_edit(self, document_edit_id):
+    def get_all_relations_by_document_edit(self, document_edit_id):
+        """
+        Fetch all relations of a document edit, including all recommendations.
+        """
         return (
             self.get_session()
             .query(
@@ -89,10 +72,7 @@ class RelationRepository(BaseRepository):
                 SchemaRelation.tag,
             )
             .join(SchemaRelation, SchemaRelation.id == Relation.schema_relation_id)
-            .filter(
-                (Relation.document_edit_id == document_edit_id)
-                & (Relation.document_recommendation_id.is_not(None))
-            )
+            .filter(Relation.document_edit_id == document_edit_id)
             .all()
         )
 
@@ -118,6 +98,32 @@ class RelationRepository(BaseRepository):
             )
         )
 
+    def create_relations(self, relations):
+        """
+        Stores multiple relations with batched multi-row inserts.
+
+        :param relations: List of dicts with schema_relation_id, is_directed, mention_head_id,
+            mention_tail_id, document_edit_id, document_recommendation_id and is_shown_recommendation
+        :return: List of relation IDs in the order of relations
+        """
+        return super().bulk_insert(
+            Relation,
+            [
+                {
+                    "schema_relation_id": relation["schema_relation_id"],
+                    "isDirected": relation["is_directed"],
+                    "mention_head_id": relation["mention_head_id"],
+                    "mention_tail_id": relation["mention_tail_id"],
+                    "document_edit_id": relation["document_edit_id"],
+                    "document_recommendation_id": relation[
+                        "document_recommendation_id"
+                    ],
+                    "isShownRecommendation": relation["is_shown_recommendation"],
+                }
+                for relation in relations
+            ],
+        )
+
     def delete_relation_by_id(self, relation_id):
         relation = self.get_session().query(Relation).filter_by(id=relation_id).first()
         if not relation:
@@ -214,6 +220,45 @@ class RelationRepository(BaseRepository):
             relation.isShownRecommendation = value
         return relation
 
+    def update_is_shown_recommendations(self, relation_ids, value):
+        """
+        Sets isShownRecommendation of multiple relations with one statement.
+        """
+        self.get_session().query(Relation).filter(Relation.id.in_(relation_ids)).update(
+            {Relation.isShownRecommendation: value}
+        )
+
+    def get_shown_recommendations(self, document_edit_id, relation_ids=None, tag=None):
+        """
+        Fetch unreviewed relation recommendations of a document edit.
+
+        :param relation_ids: Only fetch these relations, if given
+        :param tag: Only fetch relations of this schema relation tag, if given
+        :return: Rows with id, schema_relation_id, isDirected, mention_head_id and mention_tail_id, sorted by id
+        """
+        query = (
+            self.get_session()
+            .query(
+                Relation.id,
+                Relation.schema_relation_id,
+                Relation.isDirected,
+                Relation.mention_head_id,
+                Relation.mention_tail_id,
+            )
+            .filter(
+                Relation.document_edit_id == document_edit_id,
+                Relation.document_recommendation_id.is_not(None),
+                Relation.isShownRecommendation.is_(True),
+            )
+        )
+        if relation_ids is not None:
+            query = query.filter(Relation.id.in_(relation_ids))
+        if tag is not None:
+            query = query.join(
+                SchemaRelation, SchemaRelation.id == Relation.schema_relation_id
+            ).filter(SchemaRelation.tag == tag)
+        return query.order_by(Relation.id).all()
+
     def get_recommendations_by_document_edit(self, document_edit_id):
         return (
             self.get_session()
@@ -15,21 +15,16 @@ from app.models import (
     ModelStep,
     Document,
 )
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, request_cached
+
+MODIFIED_SCHEMAS = "modified_schemas"
 
 
 class SchemaRepository(BaseRepository):
+    @request_cached
     def get_schema_by_id(self, schema_id):
         return (
-            self.get_session()
-            .query(
-                Schema.id,
-                Schema.isFixed,
-                Schema.team_id,
-                Schema.name,
-                Team.name.label("team_name"),
-                ModellingLanguage.type.label("modelling_language"),
-            )
+            self.__schema_head_query()
             .join(Team, Schema.team_id == Team.id)
             .join(
                 ModellingLanguage, ModellingLanguage.id == Schema.modellingLanguage_id
@@ -38,16 +33,31 @@ class SchemaRepository(BaseRepository):
             .first()
         )
 
-    def get_schema_ids_by_user(self, user_id):
+    def get_schemas_by_user(self, user_id):
         return (
-            self.get_session()
-            .query(Schema.id)
+            self.__schema_head_query()
             .select_from(UserTeam)
             .join(Schema, Schema.team_id == UserTeam.team_id)
+            .join(Team, Schema.team_id == Team.id)
+            .join(
+                ModellingLanguage, ModellingLanguage.id == Schema.modellingLanguage_id
+            )
             .filter((UserTeam.user_id == user_id) & (Schema.active == True))
             .all()
         )
 
+    def __schema_head_query(self):
+        return self.get_session().query(
+            Schema.id,
+            Schema.isFixed,
+            Schema.team_id,
+            Schema.name,
+            Schema.version,
+            Team.name.label("team_name"),
+            ModellingLanguage.type.label("modelling_language"),
+        )
+
+    @request_cached
     def get_schema_mentions_by_schema(self, schema_id):
         return (
             self.get_session()
@@ -56,6 +66,7 @@ class SchemaRepository(BaseRepository):
             .all()
         )
 
+    @request_cached
     def get_schema_relations_by_schema(self, schema_id):
 
         schema_relations = (
@@ -70,17 +81,10 @@ class SchemaRepository(BaseRepository):
 
         return schema_relations
 
+    @request_cached
     def get_by_project(self, project_id):
         return (
-            self.get_session()
-            .query(
-                Schema.id,
-                Schema.isFixed,
-                Schema.team_id,
-                Schema.name,
-                Team.name.label("team_name"),
-                ModellingLanguage.type.label("modelling_language"),
-            )
+            self.__schema_head_query()
             .join(Team, Schema.team_id == Team.id)
             .join(
                 ModellingLanguage, ModellingLanguage.id == Schema.modellingLanguage_id
@@ -90,7 +94,22 @@ class SchemaRepository(BaseRepository):
             .first()
         )
 
+    @request_cached
     def get_schema_constraints_by_schema(self, schema_id):
+        return (
+            self.__schema_constraint_query()
+            .filter(SchemaRelation.schema_id == schema_id)
+            .all()
+        )
+
+    def get_schema_constraints_by_schemas(self, schema_ids):
+        return (
+            self.__schema_constraint_query()
+            .filter(SchemaRelation.schema_id.in_(schema_ids))
+            .all()
+        )
+
+    def __schema_constraint_query(self):
         mention_head = aliased(SchemaMention)
         mention_tail = aliased(SchemaMention)
         return (
@@ -98,6 +117,7 @@ class SchemaRepository(BaseRepository):
             .query(
                 SchemaConstraint.id,
                 SchemaConstraint.isDirected,
+                SchemaRelation.schema_id,
                 SchemaRelation.id.label("relation_id"),
                 SchemaRelation.tag.label("relation_tag"),
                 SchemaRelation.description.label("relation_description"),
@@ -123,10 +143,21 @@ class SchemaRepository(BaseRepository):
             .join(
                 SchemaRelation, SchemaRelation.id == SchemaConstraint.schema_relation_id
             )
-            .filter(
-                (SchemaRelation.schema_id == schema_id)
-                & (SchemaConstraint.schema_relation_id == SchemaRelation.id)
-            )
+        )
+
+    def get_schema_mentions_by_schemas(self, schema_ids):
+        return (
+            self.get_session()
+            .query(SchemaMention)
+            .filter(SchemaMention.schema_id.in_(schema_ids))
+            .all()
+        )
+
+    def get_schema_relations_by_schemas(self, schema_ids):
+        return (
+            self.get_session()
+            .query(SchemaRelation)
+            .filter(SchemaRelation.schema_id.in_(schema_ids))
             .all()
         )
 
@@ -194,6 +225,7 @@ class SchemaRepository(BaseRepository):
             .first()
         )
 
+    @request_cached
     def get_schema_by_document_edit(self, document_edit_id):
         return (
             self.get_session()
@@ -209,6 +241,7 @@ class SchemaRepository(BaseRepository):
             {"isFixed": True}
         )
 
+    @request_cached
     def get_schema_mention_by_id(self, schema_mention_id):
         return (
             self.get_session()
@@ -217,6 +250,7 @@ class SchemaRepository(BaseRepository):
             .first()
         )
 
+    @request_cached
     def get_schema_relation_by_id(self, schema_relation_id):
         return (
             self.get_session()
@@ -243,7 +277,22 @@ class SchemaRepository(BaseRepository):
         self.store_object(model)
         return model
 
+    @request_cached
     def get_models_by_schema(self, schema_id):
+        return (
+            self.__model_query()
+            .filter(RecommendationModel.schema_id == schema_id)
+            .all()
+        )
+
+    def get_models_by_schemas(self, schema_ids):
+        return (
+            self.__model_query()
+            .filter(RecommendationModel.schema_id.in_(schema_ids))
+            .all()
+        )
+
+    def __model_query(self):
         return (
             self.get_session()
             .query(
@@ -254,9 +303,7 @@ class SchemaRepository(BaseRepository):
                 RecommendationModel.model_step_id,
                 ModelStep.type.label("model_step_name"),
             )
-            .filter_by(schema_id=schema_id)
             .join(ModelStep, ModelStep.id == RecommendationModel.model_step_id)
-            .all()
         )
 
     def get_model_by_name(self, model_name):
@@ -270,6 +317,7 @@ class SchemaRepository(BaseRepository):
     def get_model_steps(self):
         return self.get_session().query(ModelStep.id, ModelStep.type).all()
 
+    @request_cached
     def get_schema_by_document(self, document_id):
         return (
             self.get_session()
@@ -312,3 +360,19 @@ class SchemaRepository(BaseRepository):
             {Schema.modellingLanguage_id: modelling_language_id, Schema.name: name}
         )
         self.get_session().flush()
+
+    def increment_schema_version(self, schema_id):
+        """
+        Increments the version of a schema after its components changed.
+        The schema is marked as modified in the current session until the transaction ends.
+        """
+        self.get_session().query(Schema).filter(Schema.id == schema_id).update(
+            {Schema.version: Schema.version + 1}, synchronize_session=False
+        )
+        self.get_session().info.setdefault(MODIFIED_SCHEMAS, set()).add(schema_id)
+
+    def is_schema_modified(self, schema_id):
+        """
+        Checks whether a schema was modified in the current, uncommitted session.
+        """
+        return schema_id in self.get_session().info.get(MODIFIED_SCHEMAS, ())
@@ -1,24 +1,64 @@
-from app.models import TokenMention
+from app.models import Mention, TokenMention
 from app.repositories.base_repository import BaseRepository
 
 
 class TokenMentionRepository(BaseRepository):
+    UNIQUE_TOKEN_INDEX = "ix_TokenMention_document_edit_id_token_id"
 
-    def create_token_mention(self, token_id, mention_id):
-        token_mention = TokenMention(token_id=token_id, mention_id=mention_id)
+    def create_token_mention(self, token_id, mention_id, document_edit_id=None):
+        token_mention = TokenMention(
+            token_id=token_id, mention_id=mention_id, document_edit_id=document_edit_id
+        )
         return self.store_object(token_mention)
 
-    def get_token_mention(self, token_ids, mention_ids):
+    def create_token_mentions(self, token_mentions, document_edit_id=None):
+        """
+        Stores multiple token mentions with one multi-row insert.
+
+        :param token_mentions: List of (token_id, mention_id) tuples
+        :param document_edit_id: DocumentEdit of the mentions, only set for mentions
+            which are no recommendations. A token can be part of one such mention per edit.
+        """
+        super().bulk_insert(
+            TokenMention,
+            [
+                {
+                    "token_id": token_id,
+                    "mention_id": mention_id,
+                    "document_edit_id": document_edit_id,
+                }
+                for token_id, mention_id in token_mentions
+            ],
+            return_ids=False,
+        )
+
+    def get_token_mentions_in_document_edit(self, document_edit_id, token_ids):
+        """
+        Fetch token mentions of the given tokens in mentions of a document edit,
+        which are no recommendations or unreviewed recommendations.
+        """
         return (
             self.get_session()
-            .query(TokenMention)
+            .query(TokenMention.id, TokenMention.token_id, TokenMention.mention_id)
+            .join(Mention, Mention.id == TokenMention.mention_id)
             .filter(
                 TokenMention.token_id.in_(token_ids),
-                TokenMention.mention_id.in_(mention_ids),
+                Mention.document_edit_id == document_edit_id,
+                Mention.document_recommendation_id.is_(None)
+                | Mention.isShownRecommendation.is_(True),
             )
             .all()
         )
 
+    def get_token_mentions_by_mention_ids(self, mention_ids):
+        return (
+            self.get_session()
+            .query(TokenMention.mention_id, TokenMention.token_id)
+            .filter(TokenMention.mention_id.in_(mention_ids))
+            .order_by(TokenMention.id)
+            .all()
+        )
+
     def get_token_mentions_by_mention_id(self, mention_id):
         return (
             self.get_session()
@@ -27,14 +67,24 @@ class TokenMentionRepository(BaseRepository):
             .all()
         )
 
-    def delete_token_mention_by_id(self, token_mention_id):
-        token_mention = (
-            self.get_session()
-            .query(TokenMention)
-            .filter_by(id=token_mention_id)
-            .first()
+    def delete_token_mentions_by_mention_id(self, mention_id):
+        """
+        Deletes all token mentions of a mention with one statement.
+        The rows are deleted immediately, so the tokens can be added again right away.
+        """
+        self.get_session().query(TokenMention).filter(
+            TokenMention.mention_id == mention_id
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def is_duplicate_token_error(cls, error):
+        """
+        Checks whether an IntegrityError was raised because a token was added to
+        a second mention of a document edit.
+        """
+        message = str(error.orig)
+        # PostgreSQL names the index, SQLite the columns
+        return (
+            cls.UNIQUE_TOKEN_INDEX in message
+            or "TokenMention.document_edit_id" in message
         )
-        if token_mention:
-            self.get_session().delete(token_mention)
-            return True
-        return False
@@ -1,5 +1,9 @@
+from sqlalchemy import func
+
 from app.models import Token, DocumentEdit, TokenMention
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, request_cached
+
+TOKENIZED_DOCUMENTS = "tokenized_documents"
 
 
 class TokenRepository(BaseRepository):
@@ -11,8 +15,33 @@ class TokenRepository(BaseRepository):
             sentence_index=sentence_index,
             document_id=document_id,
         )
+        self.__mark_tokenized(document_id)
         return super().store_object(token)
 
+    def create_tokens(self, tokens, document_id):
+        """
+        Stores all tokens of a document with batched multi-row inserts.
+
+        :param tokens: List of dicts with text, document_index, pos_tag and sentence_index
+        :param document_id: Document ID of the tokens
+        :return: List of token IDs in the order of tokens
+        """
+        self.__mark_tokenized(document_id)
+        return super().bulk_insert(
+            Token,
+            [
+                {
+                    "text": token["text"],
+                    "document_index": token["document_index"],
+                    "pos_tag": token["pos_tag"],
+                    "sentence_index": token["sentence_index"],
+                    "document_id": document_id,
+                }
+                for token in tokens
+            ],
+        )
+
+    @request_cached
     def get_tokens_by_document(self, document_id):
         return (
             self.get_session()
@@ -21,6 +50,7 @@ class TokenRepository(BaseRepository):
             .all()
         )
 
+    @request_cached
     def get_tokens_by_mention(self, mention_id):
         return (
             self.get_session()
@@ -30,20 +60,56 @@ class TokenRepository(BaseRepository):
             .all()
         )
 
-    def get_tokens_by_document_edit(self, document_edit_id):
+    def count_tokens_in_document(self, document_id, token_ids):
+        """
+        Counts how many of the given tokens belong to a document.
+        """
         return (
             self.get_session()
-            .query(Token)
+            .query(func.count(Token.id))
+            .filter(Token.document_id == document_id, Token.id.in_(token_ids))
+            .scalar()
+        )
+
+    def count_tokens_in_document_edit(self, document_edit_id, token_ids):
+        """
+        Counts how many of the given tokens belong to the document of a document edit.
+        """
+        return (
+            self.get_session()
+            .query(func.count(Token.id))
             .select_from(DocumentEdit)
             .join(Token, Token.document_id == DocumentEdit.document_id)
-            .filter(DocumentEdit.id == document_edit_id)
-            .all()
+            .filter(DocumentEdit.id == document_edit_id, Token.id.in_(token_ids))
+            .scalar()
         )
 
-    def get_tokens_by_document_ids(self, document_ids):
+    def get_token_columns_by_documents(self, document_ids):
+        """
+        Fetch the columns of the tokens of documents, without loading ORM objects.
+
+        :return: Rows sorted by document ID and document index
+        """
         return (
             self.get_session()
-            .query(Token)
+            .query(
+                Token.document_id,
+                Token.id,
+                Token.document_index,
+                Token.sentence_index,
+                Token.text,
+                Token.pos_tag,
+            )
             .filter(Token.document_id.in_(document_ids))
+            .order_by(Token.document_id, Token.document_index)
             .all()
         )
+
+    def is_tokenized_in_session(self, document_id):
+        """
+        Checks whether tokens of a document were stored in the current, uncommitted session.
+        """
+        return document_id in self.get_session().info.get(TOKENIZED_DOCUMENTS, ())
+
+    def __mark_tokenized(self, document_id):
+        self.get_session().info.setdefault(TOKENIZED_DOCUMENTS, set()).add(document_id)
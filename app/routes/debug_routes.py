@@ -0,0 +1,43 @@
+from flask_restx import Namespace
+
+from app.cache import get_cache_stats
+from app.clients.service_client import get_client_stats
+from app.profiler import sql_profiler
+from app.routes.base_routes import AuthorizedBaseRoute
+
+ns = Namespace("debug", description="Debugging information")
+profiler_ns = Namespace("profiler", description="SQL profiling information")
+
+
+@profiler_ns.route("/profile")
+@profiler_ns.response(403, "Authorization required")
+class ProfileResource(AuthorizedBaseRoute):
+
+    def get(self):
+        """
+        Fetch SQL profiles of the most recent requests, newest first.
+        Only available if SQL_PROFILING is enabled.
+        """
+        return {"profiles": sql_profiler.get_profiles()}
+
+
+@ns.route("/caches")
+@ns.response(403, "Authorization required")
+class CacheResource(AuthorizedBaseRoute):
+
+    def get(self):
+        """
+        Fetch size, hits, misses and evictions of the process-wide caches.
+        """
+        return {"caches": get_cache_stats()}
+
+
+@ns.route("/clients")
+@ns.response(403, "Authorization required")
+class ClientResource(AuthorizedBaseRoute):
+
+    def get(self):
+        """
+        Fetch circuit state and per-endpoint latency of the service clients.
+        """
+        return {"clients": get_client_stats()}
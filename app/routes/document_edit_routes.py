@@ -16,6 +16,8 @@ from app.dtos import (
     document_edit_state_input_dto,
     document_edit_schema_output_dto,
     f1_score_dto,
+    job_output_dto,
+    project_pre_annotation_input_dto,
 )
 
 ns = Namespace("annotations", description="Document-Annotation related operations")
@@ -60,6 +62,43 @@ class DocumentEditCreateResource(DocumentEditBaseRoute):
         return response
 
 
+@ns.route("/project/<int:project_id>")
+@ns.doc(params={"project_id": "A project ID"})
+@ns.response(403, "Authorization required")
+@ns.response(404, "Data not found")
+class DocumentEditProjectResource(DocumentEditBaseRoute):
+
+    @ns.marshal_with(job_output_dto)
+    @ns.expect(project_pre_annotation_input_dto, validate=True)
+    def post(self, project_id):
+        """
+        Pre-annotate a project: create annotations with mention recommendations
+        for all documents of the project the user has not annotated yet.
+
+        Runs as background job. Documents are sent to the pipeline concurrently
+        and stored in batches; the job result lists documents that failed and the
+        throughput in documents per minute.
+        """
+        data = request.get_json()
+
+        user_id = self.user_service.get_logged_in_user_id()
+        self.user_service.check_user_project_accessible(user_id, project_id)
+
+        response = self.service.pre_annotate_project(
+            user_id,
+            project_id,
+            data.get("model_mention_id"),
+            data.get("model_entities_id"),
+            data.get("model_relation_id"),
+            data.get("model_settings_mention"),
+            data.get("model_settings_entities"),
+            data.get("model_settings_relation"),
+            data.get("batch_size"),
+            data.get("concurrency"),
+        )
+        return response
+
+
 @ns.route("/overtake")
 @ns.response(403, "Authorization required")
 @ns.response(404, "Data not found")
@@ -125,6 +164,7 @@ class DocumentEditModelResource(DocumentEditBaseRoute):
 @ns.doc(params={"document_edit_id": "A Document Edit ID"})
 @ns.response(403, "Authorization required")
 @ns.response(404, "Data not found")
+@ns.response(409, "Step changed concurrently")
 class DocumentEditStateResource(DocumentEditBaseRoute):
 
     @ns.marshal_with(document_edit_output_dto)
@@ -136,6 +176,9 @@ class DocumentEditStateResource(DocumentEditBaseRoute):
 
         When proceeding to a suggestion step, new recommendations will be generated.
         If unreviewed recommendations exist, it is forbidden to leave the suggestion step.
+
+        Entity and relation recommendations are generated in the background: the
+        annotation is in state GENERATING until the returned job finished.
         """
         request_data = request.get_json()
 
@@ -186,6 +229,7 @@ class DocumentEditSchemaResource(DocumentEditBaseRoute):
         response = self.service.get_document_edits_by_schema(schema_id)
         return response
 
+
 @ns.route("/<int:document_edit_id>/f1score")
 @ns.doc(params={"document_edit_id": "A Document ID"})
 @ns.response(403, "Authorization required")
@@ -1,7 +1,8 @@
-import requests
-from flask_restx import Namespace
-from werkzeug.exceptions import NotFound, InternalServerError
-from flask import request, current_app
+from flask_restx import Namespace, marshal
+from werkzeug.exceptions import BadRequest, NotFound, InternalServerError
+from flask import request
+
+from app.clients.service_client import difference_calc_client
 from app.services.document_service import document_service, DocumentService
 from app.dtos import (
     document_output_dto,
@@ -16,26 +17,73 @@ from app.routes.base_routes import AuthorizedBaseRoute
 
 ns = Namespace("documents", description="Document related operations")
 
+DOCUMENT_PAGE_LIMIT_MAX = 1000
+
 
 class DocumentBaseRoute(AuthorizedBaseRoute):
     service: DocumentService = document_service
 
 
+document_list_params = {
+    "cursor": "Only return documents after this document ID (next_cursor of the previous page)",
+    "limit": f"Maximum number of documents to return (at most {DOCUMENT_PAGE_LIMIT_MAX}), all if not given",
+    "fields": "Comma separated document fields to return, e.g. 'id,name,state'. All if not given",
+}
+
+
+class DocumentListBaseRoute(DocumentBaseRoute):
+
+    def get_list_params(self):
+        """
+        Parses the pagination and projection query parameters of document lists.
+
+        :return: Tuple of cursor, limit and set of fields, each None if not given
+        :exception BadRequest: If a parameter is invalid.
+        """
+        cursor = request.args.get("cursor")
+        if cursor is not None:
+            self.verify_positive_integer(cursor)
+            cursor = int(cursor)
+
+        limit = request.args.get("limit")
+        if limit is not None:
+            self.verify_positive_integer(limit)
+            limit = min(int(limit), DOCUMENT_PAGE_LIMIT_MAX)
+
+        fields = request.args.get("fields")
+        if fields is not None:
+            fields = {field.strip() for field in fields.split(",") if field.strip()}
+            unknown_fields = fields - document_output_dto.keys()
+            if unknown_fields:
+                raise BadRequest(f"Unknown fields {', '.join(sorted(unknown_fields))}")
+            fields.add("id")
+        return cursor, limit, fields
+
+    @staticmethod
+    def marshal_document_list(response, fields):
+        mask = None
+        if fields is not None:
+            mask = f"documents{{{','.join(sorted(fields))}}},next_cursor"
+        return marshal(response, document_list_dto, mask=mask)
+
+
 @ns.route("")
 @ns.response(403, "Authorization required")
 @ns.response(404, "Data not found")
-class DocumentRoutes(DocumentBaseRoute):
+class DocumentRoutes(DocumentListBaseRoute):
 
-    @ns.marshal_with(document_list_dto)
+    @ns.doc(params=document_list_params)
+    @ns.response(200, "Success", document_list_dto)
     def get(self):
         """
-        Fetch all documents the user has access to.
+        Fetch all documents the user has access to, ordered by ID.
         Documents also contain list of users which have annotated this document.
         """
+        cursor, limit, fields = self.get_list_params()
         user_id = self.user_service.get_logged_in_user_id()
 
-        response = self.service.get_documents_by_user(user_id)
-        return response
+        response = self.service.get_documents_by_user(user_id, cursor, limit, fields)
+        return self.marshal_document_list(response, fields)
 
     @ns.doc(description="Upload a document to a specific project.")
     @ns.expect(document_create_dto)
@@ -71,19 +119,23 @@ class DocumentRoutes(DocumentBaseRoute):
 @ns.doc(params={"project_id": "A Project ID"})
 @ns.response(403, "Authorization required")
 @ns.response(404, "Data not found")
-class DocumentProjectRoutes(DocumentBaseRoute):
+class DocumentProjectRoutes(DocumentListBaseRoute):
 
-    @ns.marshal_with(document_list_dto)
+    @ns.doc(params=document_list_params)
+    @ns.response(200, "Success", document_list_dto)
     def get(self, project_id):
         """
-        Fetch all documents of a project the user has access to.
+        Fetch all documents of a project the user has access to, ordered by ID.
         Documents also contain list of users which have annotated this document.
         """
+        cursor, limit, fields = self.get_list_params()
         user_id = self.user_service.get_logged_in_user_id()
         self.user_service.check_user_project_accessible(user_id, project_id)
 
-        response = self.service.get_documents_by_project(user_id, project_id)
-        return response
+        response = self.service.get_documents_by_project(
+            user_id, project_id, cursor, limit, fields
+        )
+        return self.marshal_document_list(response, fields)
 
 
 @ns.route("/<int:document_id>")
@@ -128,15 +180,7 @@ class DocumentEditsSenderResource(DocumentBaseRoute):
             document_id
         )
 
-        external_endpoint = current_app.config.get("DIFFERENCE_CALC_URL") + "/heatmap"
-
-        headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(
-            external_endpoint, json=transformed_edits, headers=headers
-        )
+        response = difference_calc_client.post("/heatmap", json=transformed_edits)
 
         if response.status_code != 200:
             raise InternalServerError("Heatmap calculation failed: " + response.text)
@@ -179,14 +223,7 @@ class JaccardIndexResource(DocumentBaseRoute):
             document_id
         )
 
-        external_endpoint = (
-            current_app.config.get("DIFFERENCE_CALC_URL") + "/jaccard-index"
-        )
-        headers = {"accept": "application/json", "Content-Type": "application/json"}
-
-        response = requests.post(
-            external_endpoint, json=transformed_edits, headers=headers
-        )
+        response = difference_calc_client.post("/jaccard-index", json=transformed_edits)
         if response.status_code != 200:
             raise InternalServerError(
                 "Jaccard Index calculation failed: " + response.text
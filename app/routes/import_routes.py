@@ -2,7 +2,7 @@ from flask import request
 from flask_restx import Namespace
 from werkzeug.exceptions import BadRequest
 
-from app.dtos import document_import_dto
+from app.dtos import document_import_dto, job_output_dto
 from app.routes.base_routes import AuthorizedBaseRoute
 from app.services.import_service import import_service, ImportService
 
@@ -53,3 +53,51 @@ class Imports(ImportBaseRoute):
             )
         else:
             raise BadRequest(f"Invalid source {source}")
+
+
+@ns.route("/documents/stream")
+@ns.response(403, "Authorization required")
+class StreamingImports(ImportBaseRoute):
+
+    @ns.doc(
+        params={
+            "project_id": {
+                "description": "Target project of the documents. (Defines the target schema)",
+                "required": True,
+            },
+            "source": {
+                "description": "Data source type. Only option: 'pet'",
+                "required": True,
+                "enum": ["pet"],
+            },
+            "chunk_size": "Documents imported per transaction",
+        }
+    )
+    # Validating would parse the whole body before the upload is streamed to disk
+    @ns.expect(document_import_dto, validate=False)
+    @ns.marshal_with(job_output_dto)
+    def post(self):
+        """
+        Import large lists of documents in the background.
+        The documents are parsed one by one while importing, and committed in chunks.
+        Progress and the number of imported documents are reported by the job.
+        """
+        project_id = int(request.args.get("project_id"))
+        self.verify_positive_integer(project_id)
+
+        chunk_size = request.args.get("chunk_size")
+        if chunk_size is not None:
+            self.verify_positive_integer(chunk_size)
+            chunk_size = int(chunk_size)
+
+        user_id = self.user_service.get_logged_in_user_id()
+        self.user_service.check_user_project_accessible(user_id, project_id)
+
+        source = request.args.get("source")
+
+        if source == "pet":
+            return self.service.import_pet_stream(
+                request.stream, project_id, user_id, chunk_size
+            )
+        else:
+            raise BadRequest(f"Invalid source {source}")
@@ -0,0 +1,51 @@
+from flask import request
+from flask_restx import Namespace
+
+from app.dtos import job_output_dto
+from app.routes.base_routes import AuthorizedBaseRoute
+from app.services.job_service import job_service, JobService
+
+ns = Namespace("jobs", description="Background job related operations")
+
+MAX_WAIT_SECONDS = 30
+
+
+class JobBaseRoute(AuthorizedBaseRoute):
+    service: JobService = job_service
+
+
+@ns.route("/<int:job_id>")
+@ns.doc(
+    params={
+        "job_id": "A Job ID",
+        "wait": f"Seconds to wait for the job to finish (at most {MAX_WAIT_SECONDS})",
+    }
+)
+@ns.response(403, "Authorization required")
+@ns.response(404, "Data not found")
+@ns.response(409, "Job already finished")
+class JobResource(JobBaseRoute):
+
+    @ns.marshal_with(job_output_dto)
+    def get(self, job_id):
+        """
+        Fetch status and progress of a background job.
+        With wait, the response is delayed until the job succeeded or failed.
+        """
+        user_id = self.user_service.get_logged_in_user_id()
+
+        wait = request.args.get("wait", 0)
+        if wait:
+            self.verify_positive_integer(wait)
+
+        return self.service.get_job(job_id, user_id, min(int(wait), MAX_WAIT_SECONDS))
+
+    @ns.marshal_with(job_output_dto)
+    def delete(self, job_id):
+        """
+        Cancel a queued or running background job.
+        Running jobs stop the next time they report progress.
+        """
+        user_id = self.user_service.get_logged_in_user_id()
+
+        return self.service.cancel_job(job_id, user_id)
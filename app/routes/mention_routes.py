@@ -8,6 +8,8 @@ from app.dtos import (
     mention_output_list_dto,
     mention_input_dto,
     mention_update_input_dto,
+    recommendation_review_input_dto,
+    recommendation_review_output_dto,
 )
 
 ns = Namespace("mentions", description="Mention related operations")
@@ -124,3 +126,28 @@ class MentionRejectResource(MentionBaseRoute):
         self.user_service.check_user_mention_accessible(user_id, mention_id)
 
         return self.service.reject_mention(mention_id)
+
+
+@ns.route("/review")
+@ns.response(400, "Invalid input")
+@ns.response(403, "Authorization required")
+class MentionReviewResource(MentionBaseRoute):
+
+    @ns.expect(recommendation_review_input_dto, validate=True)
+    @ns.marshal_with(recommendation_review_output_dto)
+    def post(self):
+        """
+        Accept or reject many mention recommendations of a document annotation at once.
+        Reviews the given ids, all remaining recommendations of a tag,
+        or all remaining recommendations if neither ids nor tag are given.
+        """
+        data = request.get_json()
+
+        user_id = self.user_service.get_logged_in_user_id()
+        self.user_service.check_user_document_edit_accessible(
+            user_id, data["document_edit_id"]
+        )
+
+        return self.service.review_mentions(
+            data["document_edit_id"], data["action"], data.get("ids"), data.get("tag")
+        )
@@ -6,6 +6,8 @@ from app.dtos import (
     relation_output_model,
     relation_input_dto,
     relation_update_input_dto,
+    recommendation_review_input_dto,
+    recommendation_review_output_dto,
 )
 from flask import request
 
@@ -125,3 +127,28 @@ class RelationRejectResource(RelationBaseRoute):
         self.user_service.check_user_relation_accessible(user_id, relation_id)
 
         return self.service.reject_relation(relation_id)
+
+
+@ns.route("/review")
+@ns.response(400, "Invalid input")
+@ns.response(403, "Authorization required")
+class RelationReviewResource(RelationBaseRoute):
+
+    @ns.expect(recommendation_review_input_dto, validate=True)
+    @ns.marshal_with(recommendation_review_output_dto)
+    def post(self):
+        """
+        Accept or reject many relation recommendations of a document annotation at once.
+        Reviews the given ids, all remaining recommendations of a tag,
+        or all remaining recommendations if neither ids nor tag are given.
+        """
+        data = request.get_json()
+
+        user_id = self.user_service.get_logged_in_user_id()
+        self.user_service.check_user_document_edit_accessible(
+            user_id, data["document_edit_id"]
+        )
+
+        return self.service.review_relations(
+            data["document_edit_id"], data["action"], data.get("ids"), data.get("tag")
+        )
@@ -1,5 +1,4 @@
-import requests
-from flask import request, current_app
+from flask import request
 from flask_restx import Namespace
 from werkzeug.exceptions import BadRequest
 
@@ -10,6 +9,10 @@ from app.dtos import (
     get_recommendation_models_output_dto,
 )
 from app.routes.base_routes import AuthorizedBaseRoute
+from app.services.model_catalogue_service import (
+    model_catalogue_service,
+    ModelCatalogueService,
+)
 from app.services.schema_service import schema_service, SchemaService
 
 ns = Namespace("schemas", description="Schema related operations")
@@ -79,6 +82,7 @@ class SchemaQueryResource(SchemaBaseRoute):
 
 @ns.route("/<int:schema_id>/recommendation")
 class ModelRoutes(SchemaBaseRoute):
+    model_catalogue_service: ModelCatalogueService = model_catalogue_service
 
     @ns.marshal_with(get_recommendation_models_output_dto)
     def get(self, schema_id):
@@ -95,15 +99,7 @@ class ModelRoutes(SchemaBaseRoute):
         response = {}
         for step in steps:
             response[step] = []
-        headers = {"Content-Type": "application/json"}
-
-        pipeline_response = {}
-        for step in steps:
-            url = current_app.config.get("PIPELINE_URL") + "/steps/" + step
-            step_response = requests.get(url=url, headers=headers)
-            if step_response.status_code != 200:
-                raise BadRequest("Failed to fetch models: " + step_response.text)
-            pipeline_response[step] = step_response.json()
+        pipeline_response = self.model_catalogue_service.get_recommendation_models()
 
         for model in models:
             model_response = {}
@@ -1,14 +1,18 @@
-import requests
-from flask import request, current_app
+from flask import request
 from flask_restx import Namespace
-from werkzeug.exceptions import BadRequest
 
 from app.dtos import (
     model_train_input,
     model_train_output_list_dto,
     get_train_models_output_dto,
+    job_output_dto,
+    job_output_list_dto,
 )
 from app.routes.base_routes import AuthorizedBaseRoute
+from app.services.model_catalogue_service import (
+    model_catalogue_service,
+    ModelCatalogueService,
+)
 from app.services.train_service import TrainService, train_service
 
 ns = Namespace("training", description="Model training related operations")
@@ -23,6 +27,7 @@ class TrainBaseRoute(AuthorizedBaseRoute):
 @ns.response(403, "Authorization required")
 @ns.response(404, "Data not found")
 class TrainResource(TrainBaseRoute):
+    model_catalogue_service: ModelCatalogueService = model_catalogue_service
 
     @ns.expect(model_train_input)
     @ns.marshal_with(model_train_output_list_dto)
@@ -53,16 +58,45 @@ class TrainResource(TrainBaseRoute):
         user_id = self.user_service.get_logged_in_user_id()
         self.user_service.check_user_schema_accessible(user_id, schema_id)
 
-        steps = ["mention", "entity", "relation"]
-        response = {}
+        return self.model_catalogue_service.get_train_models()
 
-        for index, step in enumerate(steps):
-            url = current_app.config.get("PIPELINE_URL") + "/train/" + step
-            headers = {"Content-Type": "application/json"}
 
-            train_response = requests.get(url=url, headers=headers)
-            if train_response.status_code != 200:
-                raise BadRequest("Failed to fetch models: " + train_response.text)
+@ns.route("/<int:schema_id>/jobs")
+@ns.doc(params={"schema_id": "A Schema ID"})
+@ns.response(403, "Authorization required")
+@ns.response(404, "Data not found")
+class TrainJobResource(TrainBaseRoute):
 
-            response[step] = train_response.json()
-        return response
+    @ns.expect(model_train_input)
+    @ns.response(409, "Too many models of the schema are trained at once")
+    @ns.marshal_with(job_output_dto)
+    def post(self, schema_id):
+        """
+        Train a recommendation model for a given schema ID in the background.
+        The job result lists the stored model once training finished,
+        use /jobs/<job_id> to poll its status or cancel it.
+        """
+        data = request.json
+
+        user_id = self.user_service.get_logged_in_user_id()
+        self.user_service.check_user_schema_accessible(user_id, schema_id)
+
+        return self.service.submit_training_job(
+            schema_id,
+            data["model_name"],
+            data["model_type"],
+            data["model_step"],
+            data["document_edits"],
+            data["settings"],
+            user_id,
+        )
+
+    @ns.marshal_with(job_output_list_dto)
+    def get(self, schema_id):
+        """
+        Fetch the most recent training jobs of a schema
+        """
+        user_id = self.user_service.get_logged_in_user_id()
+        self.user_service.check_user_schema_accessible(user_id, schema_id)
+
+        return self.service.get_training_jobs(schema_id)
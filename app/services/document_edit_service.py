@@ -1,4 +1,10 @@
-from werkzeug.exceptions import BadRequest, NotFound
+import logging
+import time
+
+from flask import current_app
+from werkzeug.exceptions import BadRequest, Conflict, NotFound
+
+from app.config import Config
 
 from app.repositories.document_edit_repository import DocumentEditRepository
 from app.services.document_recommendation_service import (
@@ -7,6 +13,7 @@ from app.services.document_recommendation_service import (
 )
 from app.services.entity_service import EntityService, entity_service
 from app.services.f1_score_service import f1_score_service, F1ScoreService
+from app.services.job_service import JobService, job_service
 from app.services.schema_service import SchemaService, schema_service
 from app.services.token_service import TokenService, token_service
 from app.services.mention_services import MentionService, mention_service
@@ -14,6 +21,11 @@ from app.services.relation_services import RelationService, relation_service
 
 
 class DocumentEditService:
+    MENTION_RECOMMENDATION_JOB = "mention_recommendation"
+    STEP_RECOMMENDATION_JOB = "step_recommendation"
+    PROJECT_PRE_ANNOTATION_JOB = "project_pre_annotation"
+    GENERATING_STATE = "GENERATING"
+
     __document_edit_repository: DocumentEditRepository
     document_recommendation_service: DocumentRecommendationService
     token_service: TokenService
@@ -22,6 +34,7 @@ class DocumentEditService:
     schema_service: SchemaService
     entity_service: EntityService
     f1_score_service: F1ScoreService
+    job_service: JobService
 
     def __init__(
         self,
@@ -33,6 +46,7 @@ class DocumentEditService:
         schema_service,
         entity_service,
         f1_score_service,
+        job_service,
     ):
         self.__document_edit_repository = document_edit_repository
         self.document_recommendation_service = document_recommendation_service
@@ -42,6 +56,26 @@ class DocumentEditService:
         self.schema_service = schema_service
         self.entity_service = entity_service
         self.f1_score_service = f1_score_service
+        self.job_service = job_service
+        self.job_service.register(
+            self.MENTION_RECOMMENDATION_JOB,
+            lambda payload, report_progress: self.generate_mention_recommendations(
+                **payload
+            ),
+        )
+        self.job_service.register(
+            self.STEP_RECOMMENDATION_JOB,
+            lambda payload, report_progress: self.generate_step_recommendations(
+                **payload
+            ),
+            on_failure=lambda payload: self.revert_step(**payload),
+        )
+        self.job_service.register(
+            self.PROJECT_PRE_ANNOTATION_JOB,
+            lambda payload, report_progress: self.pre_annotate_documents(
+                report_progress=report_progress, **payload
+            ),
+        )
 
     def create_document_edit(
         self,
@@ -57,7 +91,7 @@ class DocumentEditService:
     ):
         """
         Create a new document annotation.
-        Generates recommendations for mentions and stores them for the newly created annotation.
+        Mention recommendations are generated by a background job, started once the annotation is committed.
 
         [Optional] takes ids and settings of models available inside the schema for mention, entity and relation suggestion.
         If not specified, default models (LLM) and default settings are used.
@@ -71,8 +105,8 @@ class DocumentEditService:
         :param model_settings_entities: Settings for entity recommendations as dict with fields "key" and "value".
         :param model_settings_relation: Settings for relation recommendations as dict with fields "key" and "value".
         :param with_recommendations: If true, create recommendations for mentions.
-        :return: document_edit_output_dto
-        :raises BadRequest: If annotation already exists, invalid model IDs were given or recommendation generation fails.
+        :return: document_edit_output_dto, with the ID of the recommendation job
+        :raises BadRequest: If annotation already exists or invalid model IDs were given.
         """
         # Check if document edit already exists
         existing_doc_edit = self.__get_document_edit_by_document(document_id, user_id)
@@ -82,9 +116,210 @@ class DocumentEditService:
         # Get schema of document
         schema = self.schema_service.get_schema_by_document(document_id)
 
+        model_mention, model_entities, model_relation = self.__resolve_models(
+            schema.id, model_mention, model_entities, model_relation
+        )
+        document_edit, document_recommendation = self.__create_document_edit(
+            user_id,
+            document_id,
+            schema.id,
+            model_mention,
+            model_entities,
+            model_relation,
+            model_settings_mention,
+            model_settings_entities,
+            model_settings_relation,
+        )
+
+        # Create mention recommendations in the background
+        job = None
+        if with_recommendations:
+            job = self.job_service.enqueue(
+                self.MENTION_RECOMMENDATION_JOB,
+                {
+                    "document_edit_id": document_edit.id,
+                    "document_recommendation_id": document_recommendation.id,
+                },
+                user_id,
+                concurrency_key=self.__mention_recommendation_key(document_edit.id),
+            )
+
+        return {
+            "id": document_edit.id,
+            "schema_id": document_edit.schema_id,
+            "document_id": document_edit.document_id,
+            "mention_model_id": document_edit.mention_model_id,
+            "entity_model_id": document_edit.entity_model_id,
+            "relation_model_id": document_edit.relation_model_id,
+            "state": {"id": 5, "state": "MENTION_SUGGESTION"},
+            "job_id": job.id if job is not None else None,
+        }
+
+    def pre_annotate_project(
+        self,
+        user_id,
+        project_id,
+        model_mention=None,
+        model_entities=None,
+        model_relation=None,
+        model_settings_mention=None,
+        model_settings_entities=None,
+        model_settings_relation=None,
+        batch_size=None,
+        concurrency=None,
+    ):
+        """
+        Start annotating all documents of a project the user has not annotated yet.
+        Annotations and their mention recommendations are created by a background job.
+
+        :param user_id: Owner ID of the new annotations.
+        :param project_id: Project ID of the documents.
+        :param model_mention: ID of model to use for mention recommendations.
+        :param model_entities: ID of model to use for entity recommendations.
+        :param model_relation: ID of model to use for relation recommendations.
+        :param model_settings_mention: Settings for mention recommendations as dict with fields "key" and "value".
+        :param model_settings_entities: Settings for entity recommendations as dict with fields "key" and "value".
+        :param model_settings_relation: Settings for relation recommendations as dict with fields "key" and "value".
+        :param batch_size: Documents stored per transaction.
+        :param concurrency: Maximum number of concurrent pipeline requests.
+        :return: Job database object
+        :raises BadRequest: If batch size or concurrency are invalid.
+        """
+        if batch_size is None:
+            batch_size = current_app.config.get(
+                "PRE_ANNOTATION_BATCH_SIZE", Config.PRE_ANNOTATION_BATCH_SIZE
+            )
+        if concurrency is None:
+            concurrency = current_app.config.get(
+                "PRE_ANNOTATION_CONCURRENCY", Config.PRE_ANNOTATION_CONCURRENCY
+            )
+        pool_size = current_app.config.get("HTTP_POOL_SIZE", Config.HTTP_POOL_SIZE)
+        if batch_size < 1:
+            raise BadRequest("Batch size must be positive")
+        if not 1 <= concurrency <= pool_size:
+            raise BadRequest(f"Concurrency must be between 1 and {pool_size}")
+
+        return self.job_service.enqueue(
+            self.PROJECT_PRE_ANNOTATION_JOB,
+            {
+                "user_id": user_id,
+                "project_id": project_id,
+                "model_mention": model_mention,
+                "model_entities": model_entities,
+                "model_relation": model_relation,
+                "model_settings_mention": model_settings_mention,
+                "model_settings_entities": model_settings_entities,
+                "model_settings_relation": model_settings_relation,
+                "batch_size": batch_size,
+                "concurrency": concurrency,
+            },
+            user_id,
+        )
+
+    def pre_annotate_documents(
+        self,
+        user_id,
+        project_id,
+        model_mention,
+        model_entities,
+        model_relation,
+        model_settings_mention,
+        model_settings_entities,
+        model_settings_relation,
+        batch_size,
+        concurrency,
+        report_progress,
+    ):
+        """
+        Creates annotations with mention recommendations for all documents of a project
+        the user has not annotated yet. Executed as background job.
+
+        Documents are sent to the pipeline concurrently and stored in batches, each batch
+        is committed on its own. A document whose recommendations fail is reported and
+        left without annotation, so it can be annotated later on.
+
+        :return: Number of documents and annotated documents, failed documents with
+            error message and throughput in documents per minute
+        :raises BadRequest: If invalid model IDs were given.
+        """
+        started = time.monotonic()
+        documents = self.__document_edit_repository.get_documents_without_document_edit(
+            project_id, user_id
+        )
+        result = {
+            "documents": len(documents),
+            "annotated": 0,
+            "failed": [],
+            "documents_per_minute": None,
+        }
+        if len(documents) == 0:
+            return result
+
+        schema_id = documents[0].schema_id
+        model_mention, model_entities, model_relation = self.__resolve_models(
+            schema_id, model_mention, model_entities, model_relation
+        )
+        params = self.__get_model_params(
+            schema_id, model_mention, model_settings_mention
+        )
+
+        processed = 0
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start : start + batch_size]
+            recommendations, errors = (
+                self.document_recommendation_service.get_mention_recommendations_by_documents(
+                    batch, schema_id, params, concurrency
+                )
+            )
+            for document in batch:
+                if document.id in errors:
+                    result["failed"].append(
+                        {"document_id": document.id, "error": errors[document.id]}
+                    )
+                    continue
+                document_edit, document_recommendation = self.__create_document_edit(
+                    user_id,
+                    document.id,
+                    schema_id,
+                    model_mention,
+                    model_entities,
+                    model_relation,
+                    model_settings_mention,
+                    model_settings_entities,
+                    model_settings_relation,
+                )
+                self.mention_service.create_recommended_mention(
+                    document_edit.id,
+                    document_recommendation.id,
+                    recommendations[document.id],
+                )
+                result["annotated"] += 1
+
+            # Annotated documents are skipped if the job is retried
+            self.job_service.checkpoint()
+            processed += len(batch)
+            report_progress(100 * processed // len(documents))
+
+        elapsed = time.monotonic() - started
+        result["documents_per_minute"] = round(processed * 60 / max(elapsed, 1e-3), 1)
+        logging.info(
+            f"Pre-annotated project {project_id}: {result['annotated']} of "
+            f"{processed} documents, {result['documents_per_minute']} documents/min"
+        )
+        return result
+
+    def __resolve_models(
+        self, schema_id, model_mention, model_entities, model_relation
+    ):
+        """
+        Replaces missing model IDs by the default models (LLM) and verifies the models.
+
+        :return: Tuple of mention, entity and relation model IDs
+        :raises BadRequest: If invalid model IDs were given.
+        """
         # Use default llm if no model is specified
         if not all([model_mention, model_relation, model_entities]):
-            models = self.schema_service.get_models_by_schema(schema.id)
+            models = self.schema_service.get_models_by_schema(schema_id)
             models = [
                 model
                 for model in models
@@ -105,20 +340,49 @@ class DocumentEditService:
 
         # Verify models are valid for given schema and steps
         self.schema_service.check_models_in_schema(
-            model_mention, model_entities, model_relation, schema.id
+            model_mention, model_entities, model_relation, schema_id
         )
+        return model_mention, model_entities, model_relation
 
-        # Create document edit
+    def __get_model_params(self, schema_id, model_id, model_settings):
+        """
+        Query parameters of a model for the recommendation system, like
+        __get_recommendation_params before an annotation exists.
+        """
+        params = {}
+        for model in self.schema_service.get_models_by_schema(schema_id):
+            if model["id"] == model_id:
+                params["model_type"] = model["type"]
+                params["name"] = model["name"]
+        for setting in model_settings or []:
+            params[setting["key"]] = setting["value"]
+        return params
+
+    def __create_document_edit(
+        self,
+        user_id,
+        document_id,
+        schema_id,
+        model_mention,
+        model_entities,
+        model_relation,
+        model_settings_mention,
+        model_settings_entities,
+        model_settings_relation,
+    ):
+        """
+        Stores a document edit with its document recommendation and model settings.
+
+        :return: Tuple of DocumentEdit and DocumentRecommendation database objects
+        """
         document_edit = self.__document_edit_repository.create_document_edit(
             document_id,
             user_id,
-            schema.id,
+            schema_id,
             model_mention,
             model_entities,
             model_relation,
         )
-        doc_edit = self.__get_document_edit_with_document_by_id(document_edit.id)
-
         # Create document recommendation for document edit
         document_recommendation = (
             self.document_recommendation_service.create_document_recommendation(
@@ -136,30 +400,44 @@ class DocumentEditService:
         self.__document_edit_repository.store_model_settings(
             document_edit.id, model_relation, model_settings_relation
         )
+        return document_edit, document_recommendation
 
-        # Create mention recommendations
-        if with_recommendations:
-            params = self.__get_recommendation_params(document_edit.id, 1)  # MENTIONS
-            mention_recommendations = (
-                self.document_recommendation_service.get_mention_recommendation(
-                    document_id, doc_edit.schema_id, doc_edit.content, params
-                )
-            )
+    def generate_mention_recommendations(
+        self, document_edit_id, document_recommendation_id
+    ):
+        """
+        Generates recommendations for mentions and stores them for an annotation.
+        Executed as background job. Nothing is stored once the annotation left the
+        mention suggestion step.
 
-            # Store mention recommendations
-            self.mention_service.create_recommended_mention(
-                document_edit.id, document_recommendation.id, mention_recommendations
+        :param document_edit_id: DocumentEdit ID of the annotation.
+        :param document_recommendation_id: Document recommendation the mentions belong to.
+        :return: Number of recommended mentions
+        :raises BadRequest: If recommendation generation fails.
+        """
+        doc_edit = self.__get_document_edit_with_document_by_id(document_edit_id)
+        if doc_edit is None:
+            # Annotation was deleted in the meantime
+            return {"mentions": 0}
+        mention_suggestion = self.__document_edit_repository.get_state_by_name(
+            "MENTION_SUGGESTION"
+        )
+        if doc_edit.state_id != mention_suggestion.id:
+            # Recommendations would never be reviewed
+            return {"mentions": 0}
+
+        params = self.__get_recommendation_params(document_edit_id, 1)  # MENTIONS
+        mention_recommendations = (
+            self.document_recommendation_service.get_mention_recommendation(
+                doc_edit.document_id, doc_edit.schema_id, doc_edit.content, params
             )
+        )
 
-        return {
-            "id": document_edit.id,
-            "schema_id": document_edit.schema_id,
-            "document_id": document_edit.document_id,
-            "mention_model_id": document_edit.mention_model_id,
-            "entity_model_id": document_edit.entity_model_id,
-            "relation_model_id": document_edit.relation_model_id,
-            "state": {"id": 5, "state": "MENTION_SUGGESTION"},
-        }
+        # Store mention recommendations
+        self.mention_service.create_recommended_mention(
+            document_edit_id, document_recommendation_id, mention_recommendations
+        )
+        return {"mentions": len(mention_recommendations)}
 
     def __get_document_edit_by_document(self, document_id, user_id):
         """
@@ -453,15 +731,21 @@ class DocumentEditService:
 
         When proceeding to a suggestion step, new recommendations will be generated.
         If unreviewed recommendations exist, it is forbidden to leave the suggestion step.
+        The mention suggestion step can also not be left while its recommendations are
+        still being generated.
+
+        Entity and relation recommendations are generated by a background job. Until it
+        finishes, the document edit is in state GENERATING and moves on to the requested
+        step afterward. If generation fails, the previous state is restored.
 
         :param document_edit_id: DocumentEdit ID
         :param state_name: New state of the document edit
-        :return: document_edit_output_dto
+        :return: document_edit_output_dto, with the ID of the recommendation job
         :raises NotFound: If document edit does not exist
         :raises BadRequest: If it is not allowed to proceed to specified step.
         """
         state = self.__document_edit_repository.get_state_by_name(state_name)
-        if state is None:
+        if state is None or state_name == self.GENERATING_STATE:
             raise BadRequest("Invalid state")
         document_edit = self.__document_edit_repository.get_document_edit_by_id(
             document_edit_id
@@ -469,9 +753,14 @@ class DocumentEditService:
         if document_edit is None:
             raise NotFound("Document edit does not exist")
 
+        generate_recommendations = False
         if document_edit.state_name == "MENTION_SUGGESTION":
             if state_name != "MENTIONS":
                 raise BadRequest("Not allowed to proceed to this step")
+            if self.job_service.has_active_jobs(
+                self.__mention_recommendation_key(document_edit_id)
+            ):
+                raise BadRequest("Recommendations are being generated")
             recs = self.mention_service.get_recommendations_by_document_edit(
                 document_edit_id
             )
@@ -480,16 +769,11 @@ class DocumentEditService:
         elif document_edit.state_name == "MENTIONS":
             if state_name != "ENTITIES":
                 raise BadRequest("Not allowed to proceed to this step")
-
-            self.save_entity_recommendation(document_edit_id)
-            self.entity_service.create_entity_for_mentions(document_edit_id)
-
+            generate_recommendations = True
         elif document_edit.state_name == "ENTITIES":
             if state_name != "RELATION_SUGGESTION":
                 raise BadRequest("Not allowed to proceed to this step")
-
-            self.save_relation_recommendation(document_edit_id)
-
+            generate_recommendations = True
         elif document_edit.state_name == "RELATION_SUGGESTION":
             if state_name != "RELATIONS":
                 raise BadRequest("Not allowed to proceed to this step")
@@ -503,11 +787,30 @@ class DocumentEditService:
                 raise BadRequest("Not allowed to proceed to this step")
         elif document_edit.state_name == "FINISHED":
             raise BadRequest("Annotation already finished")
+        elif document_edit.state_name == self.GENERATING_STATE:
+            raise BadRequest("Recommendations are being generated")
         else:
             raise BadRequest("Invalid state")
-        document_edit = self.__document_edit_repository.update_state(
-            document_edit_id, state.id
-        )
+
+        job = None
+        if generate_recommendations:
+            state = self.__document_edit_repository.get_state_by_name(
+                self.GENERATING_STATE
+            )
+            job = self.job_service.enqueue(
+                self.STEP_RECOMMENDATION_JOB,
+                {
+                    "document_edit_id": document_edit_id,
+                    "previous_state": document_edit.state_name,
+                    "state": state_name,
+                },
+                document_edit.user_id,
+            )
+        # Compare and set, so only one of concurrent requests proceeds
+        if not self.__document_edit_repository.transition_state(
+            document_edit_id, document_edit.state_id, state.id
+        ):
+            raise Conflict("Document edit was changed concurrently")
         return {
             "id": document_edit.id,
             "schema_id": document_edit.schema_id,
@@ -519,8 +822,56 @@ class DocumentEditService:
                 "id": state.id,
                 "state": state.type,
             },
+            "job_id": job.id if job is not None else None,
         }
 
+    def generate_step_recommendations(self, document_edit_id, previous_state, state):
+        """
+        Generates the recommendations of a step and moves the document edit from
+        GENERATING to this step. Executed as background job.
+
+        :param document_edit_id: DocumentEdit ID of the annotation.
+        :param previous_state: State the document edit was in before generation started.
+        :param state: Step to proceed to, ENTITIES or RELATION_SUGGESTION.
+        :return: ID of the new state
+        :raises BadRequest: If recommendation generation fails.
+        """
+        if state == "ENTITIES":
+            self.save_entity_recommendation(document_edit_id)
+            self.entity_service.create_entity_for_mentions(document_edit_id)
+        else:
+            self.save_relation_recommendation(document_edit_id)
+
+        new_state = self.__document_edit_repository.get_state_by_name(state)
+        self.__transition_from_generating(document_edit_id, new_state)
+        return {"state_id": new_state.id}
+
+    def revert_step(self, document_edit_id, previous_state, state):
+        """
+        Restores the previous state of a document edit after generation failed.
+
+        :param document_edit_id: DocumentEdit ID of the annotation.
+        :param previous_state: State the document edit was in before generation started.
+        :param state: Step the document edit should have proceeded to.
+        """
+        self.__transition_from_generating(
+            document_edit_id,
+            self.__document_edit_repository.get_state_by_name(previous_state),
+        )
+
+    @staticmethod
+    def __mention_recommendation_key(document_edit_id):
+        return f"mention_recommendation:{document_edit_id}"
+
+    def __transition_from_generating(self, document_edit_id, state):
+        generating = self.__document_edit_repository.get_state_by_name(
+            self.GENERATING_STATE
+        )
+        # The document edit may have been deleted in the meantime
+        self.__document_edit_repository.transition_state(
+            document_edit_id, generating.id, state.id
+        )
+
     def get_document_edits_by_schema(self, schema_id):
         """
         Fetch a list of all document edits by schema id.
@@ -641,48 +992,126 @@ class DocumentEditService:
             for edit_id in document_edit_ids
         ]
 
+    def check_document_edits_in_schema(self, document_edit_ids, schema_id):
+        """
+        Checks with one query that document edits belong to a schema.
+
+        :param document_edit_ids: DocumentEdit IDs to check, without duplicates
+        :param schema_id: Schema of the documents
+        :raises BadRequest: If document edit does not exist or does not belong to schema.
+        """
+        count = self.__document_edit_repository.count_document_edits_in_schema(
+            schema_id, document_edit_ids
+        )
+        if count != len(document_edit_ids):
+            raise BadRequest("At least one Document Edit does not belong to schema")
+
+    def export_document_edits_for_schema_training(
+        self, document_edit_ids, schema_id, batch_size=None
+    ):
+        """
+        Exports document edits for model training one by one, loaded in batches,
+        so the size of the training corpus does not bound memory.
+        Tokens are exported column-wise. Mentions reference their tokens, entities
+        their mentions and relations their head and tail mention by ID.
+
+        :param document_edit_ids: DocumentEdit IDs to export.
+        :param schema_id: Schema of the documents.
+        :param batch_size: Document edits loaded at once, TRAIN_EXPORT_BATCH_SIZE by default
+        :return: Generator of dicts with id, content, tokens, mentions, entitys and relations
+        :raises BadRequest: If document edit does not exist or does not belong to schema.
+        """
+        document_edit_ids = sorted(set(document_edit_ids))
+        self.check_document_edits_in_schema(document_edit_ids, schema_id)
+        if batch_size is None:
+            batch_size = current_app.config.get(
+                "TRAIN_EXPORT_BATCH_SIZE", Config.TRAIN_EXPORT_BATCH_SIZE
+            )
+
+        def export():
+            for start in range(0, len(document_edit_ids), batch_size):
+                yield from self.__export_batch(
+                    document_edit_ids[start : start + batch_size], schema_id
+                )
+
+        return export()
+
+    def __export_batch(self, document_edit_ids, schema_id):
+        document_edits = self.__document_edit_repository.get_document_edit_ids_with_document_by_schema(
+            schema_id, document_edit_ids
+        )
+        token_bundles = self.token_service.get_token_bundles(
+            {document_id for _, document_id, _ in document_edits}
+        )
+        mentions = self.mention_service.get_mention_references_by_edit_ids(
+            document_edit_ids
+        )
+        relations = self.relation_service.get_relation_references_by_edit_ids(
+            document_edit_ids
+        )
+
+        for edit_id, document_id, content in sorted(document_edits):
+            entities = {}
+            for mention in mentions[edit_id]:
+                if mention["entity_id"] is not None:
+                    entities.setdefault(
+                        mention["entity_id"],
+                        {
+                            "id": mention["entity_id"],
+                            "tag": mention["tag"],
+                            "mention_ids": [],
+                        },
+                    )["mention_ids"].append(mention["id"])
+            yield {
+                "id": edit_id,
+                "content": content,
+                "tokens": token_bundles[document_id].to_columns(),
+                "mentions": mentions[edit_id],
+                "entitys": list(entities.values()),
+                "relations": relations[edit_id],
+            }
+
     def get_f1_score(self, document_edit_id):
-        f1_score_request = self.get_document_edit_for_f1_score(document_edit_id)
-        return self.f1_score_service.get_f1_score(f1_score_request)
+        """
+        Calculates the F1 score of recommendations against the annotations of a
+        document edit. Scores are cached until its annotations change.
 
-    def get_document_edit_for_f1_score(self, document_edit_id):
+        :param document_edit_id: Document edit ID
+        :return: f1_score_dto
+        :raises BadRequest: If document edit does not exist or calculation failed
+        """
         document_edit = self.__document_edit_repository.get_document_edit_by_id(
             document_edit_id
         )
         if document_edit is None:
             raise BadRequest("Document Edit doesnt exist")
 
-        tokens_data = self.token_service.get_tokens_by_document(
-            document_edit.document_id
+        revision = document_edit.revision
+        if self.__document_edit_repository.is_revised_in_session(document_edit_id):
+            revision = None
+        return self.f1_score_service.get_f1_score_of_revision(
+            document_edit_id,
+            revision,
+            lambda: self.get_document_edit_for_f1_score(document_edit_id),
         )
-        tokens = tokens_data.get("tokens", [])
 
-        actual_mentions = self.mention_service.get_actual_mentions_by_document_edit(
+    def get_document_edit_for_f1_score(self, document_edit_id):
+        document_edit = self.__document_edit_repository.get_document_edit_by_id(
             document_edit_id
         )
-        predicted_mentions = (
-            self.mention_service.get_predicted_mentions_by_document_edit(
-                document_edit_id
-            )
-        )
+        if document_edit is None:
+            raise BadRequest("Document Edit doesnt exist")
 
-        mentions_data = self.mention_service.get_mentions_by_document_edit(
-            document_edit_id
+        tokens_data = self.token_service.get_tokens_by_document(
+            document_edit.document_id
         )
-        mentions_dict = {
-            mention["id"]: mention for mention in mentions_data["mentions"]
-        }
+        tokens = tokens_data.get("tokens", [])
 
-        actual_relations = (
-            self.relation_service.get_actual_relations_by_document_edit_id(
-                document_edit_id, mentions_dict
-            )
+        mentions = self.mention_service.get_f1_score_mentions_by_document_edit(
+            document_edit_id
         )
-
-        predicted_relations = (
-            self.relation_service.get_predicted_relations_by_document_edit_id(
-                document_edit_id, mentions_dict
-            )
+        relations = self.relation_service.get_f1_score_relations_by_document_edit(
+            document_edit_id, mentions["by_id"]
         )
 
         actual_document_edit = {
@@ -690,8 +1119,8 @@ class DocumentEditService:
                 "id": document_edit.document_id,
                 "tokens": tokens,
             },
-            "mentions": actual_mentions,
-            "relations": actual_relations,
+            "mentions": mentions["actual"],
+            "relations": relations["actual"],
         }
 
         predicted_document_edit = {
@@ -699,8 +1128,8 @@ class DocumentEditService:
                 "id": document_edit.document_id,
                 "tokens": tokens,
             },
-            "mentions": predicted_mentions,
-            "relations": predicted_relations,
+            "mentions": mentions["predicted"],
+            "relations": relations["predicted"],
         }
 
         return {"actual": actual_document_edit, "predicted": predicted_document_edit}
@@ -715,4 +1144,5 @@ document_edit_service = DocumentEditService(
     schema_service,
     entity_service,
     f1_score_service,
+    job_service,
 )
@@ -1,8 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import current_app
-from werkzeug.exceptions import BadRequest
-import requests
+from werkzeug.exceptions import BadRequest, HTTPException
 import logging
 
+from app.clients.service_client import pipeline_client
+from app.compiled_schema import CompiledSchema
 from app.repositories.document_recommendation_repository import (
     DocumentRecommendationRepository,
 )
@@ -48,9 +51,8 @@ class DocumentRecommendationService:
         if schema_mentions is None:
             raise BadRequest("Schema mentions not found")
 
-        tokens = self.token_service.get_tokens_by_document(document_id)["tokens"]
-        if tokens is None:
-            raise BadRequest("Tokens not found")
+        token_bundle = self.token_service.get_token_bundle(document_id)
+        tokens = token_bundle.to_dicts()
 
         mention_recommendation_input = self.get_mention_recommendation_input_dto(
             tokens, schema_id, schema_mentions, content, document_id
@@ -61,6 +63,76 @@ class DocumentRecommendationService:
             mention_recommendation_input, params=params
         )
 
+        return self.__map_mention_recommendations(
+            token_bundle.index, schema_mentions, mention_recommendations
+        )
+
+    def get_mention_recommendations_by_documents(
+        self, documents, schema_id, params, concurrency
+    ):
+        """
+        Generates mention recommendations for many documents of a schema.
+        Schema mentions and tokens are fetched once for all documents, the pipeline is
+        called with at most `concurrency` documents at a time.
+
+        :param documents: Objects with id and content of the documents
+        :param schema_id: Schema of the documents
+        :param params: Query parameters to pass in recommendation system
+        :param concurrency: Maximum number of concurrent pipeline requests
+        :return: Tuple of dict document ID to mention recommendations and
+            dict document ID to error message for documents that failed
+        :raises BadRequest: If schema has no mentions
+        """
+        schema_mentions = self.schema_service.get_schema_mentions_by_schema(schema_id)
+        if schema_mentions is None:
+            raise BadRequest("Schema mentions not found")
+        token_bundles = self.token_service.get_token_bundles(
+            [document.id for document in documents]
+        )
+        app = current_app._get_current_object()
+
+        def recommend(document):
+            token_bundle = token_bundles[document.id]
+            mention_recommendation_input = self.get_mention_recommendation_input_dto(
+                token_bundle.to_dicts(),
+                schema_id,
+                schema_mentions,
+                document.content,
+                document.id,
+            )
+            try:
+                with app.app_context():
+                    mention_recommendations = (
+                        self.get_mention_recommendation_from_pipeline_service(
+                            mention_recommendation_input, params=params
+                        )
+                    )
+                return (
+                    self.__map_mention_recommendations(
+                        token_bundle.index, schema_mentions, mention_recommendations
+                    ),
+                    None,
+                )
+            except Exception as e:
+                logging.warning(
+                    f"Mention recommendation for document {document.id} failed: {e}"
+                )
+                return None, e.description if isinstance(e, HTTPException) else str(e)
+
+        recommendations, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            for document, (result, error) in zip(
+                documents, executor.map(recommend, documents)
+            ):
+                if error is None:
+                    recommendations[document.id] = result
+                else:
+                    errors[document.id] = error
+        return recommendations, errors
+
+    def __map_mention_recommendations(
+        self, token_index, schema_mentions, mention_recommendations
+    ):
         # check for duplicate and overlapping tokens
         if not self.no_overlapping_or_duplicate_tokens(mention_recommendations):
             raise BadRequest("Overlapping or duplicate mentions found")
@@ -73,7 +145,7 @@ class DocumentRecommendationService:
         # create dictionary with filtered token ids belonging to a mention along with tag
         filtered_token_ids_and_schema_mention_id = (
             self.filter_tokens_by_schema_recommendations(
-                tokens,
+                token_index,
                 mention_recommendations,
                 schema_mention_dict,
             )
@@ -86,15 +158,8 @@ class DocumentRecommendationService:
     ):
         # get request dto for pipeline service
 
-        # Define the base URL
-        url = current_app.config.get("PIPELINE_URL") + "/steps/mention"
-        # Define the headers
-        headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(
-            url, params=params, json=mention_recommendation_input, headers=headers
+        response = pipeline_client.post(
+            "/steps/mention", params=params, json=mention_recommendation_input
         )
         if response.status_code != 200:
             raise BadRequest("Failed to fetch recommendations: " + response.text)
@@ -153,21 +218,24 @@ class DocumentRecommendationService:
         return True  # No overlaps or duplicate tokens found
 
     def filter_tokens_by_schema_recommendations(
-        self, tokens, mention_recommendations, schema_mention_dict
+        self, token_index, mention_recommendations, schema_mention_dict
     ):
+        """
+        Resolves the spans of recommended mentions to their tokens.
+
+        :param token_index: TokenIndex of the document, cached with its TokenBundle
+        :param mention_recommendations: Mentions with start and end document index and type
+        :param schema_mention_dict: Dict of schema mention tag to ID
+        :return: List of dicts with schema mention ID and token IDs
+        """
         result = []
-
         for mention_recommendations_item in mention_recommendations:
             start = mention_recommendations_item["startTokenDocumentIndex"]
             end = mention_recommendations_item["endTokenDocumentIndex"]
             type_ = mention_recommendations_item["type"]
 
             # Filter tokens whose document_index is between start and end (inclusive)
-            filtered_token_ids = [
-                token["id"]
-                for token in tokens
-                if start <= token["document_index"] <= end
-            ]
+            filtered_token_ids = token_index.token_ids(start, end)
 
             # Append the result with the type and filtered tokens
             if len(filtered_token_ids) > 0:
@@ -200,9 +268,8 @@ class DocumentRecommendationService:
                 relation_recommendation_input, params
             )
         )
-        schema_relations_dict = dict()
-        for schema_relation in schema["schema_relations"]:
-            schema_relations_dict[schema_relation["tag"]] = schema_relation["id"]
+        compiled_schema = CompiledSchema(schema)
+        schema_relations_dict = compiled_schema.schema_relation_ids_by_tag
 
         mention_id_to_schema_mention_id = dict()
         for mention in mentions_data["mentions"]:
@@ -222,7 +289,7 @@ class DocumentRecommendationService:
             try:
                 constraints.append(
                     self.schema_service.verify_constraint(
-                        schema,
+                        compiled_schema,
                         schema_relation_id=schema_relations_dict[relation["tag"]],
                         head_schema_mention_id=mention_id_to_schema_mention_id[
                             relation["head_mention_id"]
@@ -251,17 +318,10 @@ class DocumentRecommendationService:
         self, relation_recommendation_input, params
     ):
 
-        url = current_app.config.get("PIPELINE_URL") + "/steps/relation"
-
-        headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        logging.debug(f"Sending request to pipeline: {url}")
         logging.debug(f"Payload: {relation_recommendation_input}")
         logging.debug(f"Params: {params}")
-        response = requests.post(
-            url, params=params, json=relation_recommendation_input, headers=headers
+        response = pipeline_client.post(
+            "/steps/relation", params=params, json=relation_recommendation_input
         )
         logging.debug(f"Pipeline Response Status: {response.status_code}")
         logging.debug(f"Pipeline Response Text: {response}")
@@ -315,18 +375,21 @@ class DocumentRecommendationService:
             document_edit_id
         )
 
+        mention_id_groups = []
         for mention_group in entity_recommendations:
-            mention_list = mention_group.get("mentions", [])
-            for mention in mention_list:
-                if (
-                    mention["id"] not in entity_possible_dict.keys()
-                    or entity_possible_dict[mention["id"]] == False
-                ):
-                    mention_list.remove(mention)
-            if len(mention_list) > 0:
-                self.entity_service.save_entity_in_edit(
-                    document_edit_id, mention_list, document_recommendation.id
-                )
+            mention_ids = [
+                mention["id"]
+                for mention in mention_group.get("mentions", [])
+                if entity_possible_dict.get(mention["id"]) == True
+            ]
+            if len(mention_ids) > 0:
+                mention_id_groups.append(mention_ids)
+        self.entity_service.save_entities_in_edit(
+            document_edit_id,
+            mention_id_groups,
+            document_recommendation_id=document_recommendation.id,
+            is_shown_recommendation=True,
+        )
 
     def get_entity_recommendation_input_dto(
         self,
@@ -350,14 +413,8 @@ class DocumentRecommendationService:
         self, entity_recommendation_input, params
     ):
 
-        url = current_app.config.get("PIPELINE_URL") + "/steps/entity"
-
-        headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(
-            url, params=params, json=entity_recommendation_input, headers=headers
+        response = pipeline_client.post(
+            "/steps/entity", params=params, json=entity_recommendation_input
         )
 
         if response.status_code != 200:
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from werkzeug.exceptions import BadRequest, NotFound
 from app.repositories.document_repository import DocumentRepository
 from app.services.document_edit_service import (
@@ -22,35 +24,61 @@ class DocumentService:
         self.token_service = token_service
         self.document_edit_service = document_edit_service
 
-    def get_documents_by_project(self, user_id, project_id):
+    def get_documents_by_project(
+        self, user_id, project_id, cursor=None, limit=None, fields=None
+    ):
         """
         Fetch all documents of a project the user has access to.
         Documents also contain list of users which have annotated this document.
 
         :param user_id: User ID with access to the project.
         :param project_id: Project ID to query documents
+        :param cursor: Only fetch documents after this document ID, if given.
+        :param limit: Maximum number of documents to fetch, if given.
+        :param fields: Names of the document fields to fetch, all if not given.
         :return: document_list_dto
         """
-        response = self.get_documents_by_user(user_id)
-        documents = response["documents"]
-        filtered_documents = [
-            document
-            for document in documents
-            if document["project"]["id"] == project_id
-        ]
-        return {"documents": filtered_documents}
+        return self.__get_document_page(user_id, project_id, cursor, limit, fields)
 
-    def get_documents_by_user(self, user_id):
+    def get_documents_by_user(self, user_id, cursor=None, limit=None, fields=None):
         """
         Fetch all documents the user has access to.
         Documents also contain list of users which have annotated this document.
 
         :param user_id: User ID to query documents for.
+        :param cursor: Only fetch documents after this document ID, if given.
+        :param limit: Maximum number of documents to fetch, if given.
+        :param fields: Names of the document fields to fetch, all if not given.
+        :return: document_list_dto
+        """
+        return self.__get_document_page(user_id, None, cursor, limit, fields)
+
+    def __get_document_page(self, user_id, project_id, cursor, limit, fields):
+        """
+        Fetch a page of documents ordered by ID.
+        The next cursor is set if more documents exist after the page.
+        Content and document edits are only loaded if requested in fields.
+
         :return: document_list_dto
         """
-        documents = self.__document_repository.get_documents_by_user(user_id)
-        document_list = [self.__map_document_to_output_dto(doc) for doc in documents]
-        return {"documents": document_list}
+        documents = self.__document_repository.get_documents_by_user(
+            user_id,
+            project_id,
+            after_id=cursor,
+            limit=limit + 1 if limit is not None else None,
+            with_content=fields is None or "content" in fields,
+        )
+        next_cursor = None
+        if limit is not None and len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = documents[-1].id
+        return {
+            "documents": self.__map_documents_to_output_dto(
+                documents,
+                with_document_edits=fields is None or "document_edits" in fields,
+            ),
+            "next_cursor": next_cursor,
+        }
 
     def upload_document(self, user_id, project_id, file_name, file_content):
         # Validate file content
@@ -79,7 +107,7 @@ class DocumentService:
         document = self.__document_repository.get_document_by_id(document_id, user_id)
         if not document:
             raise NotFound("Document not found")
-        return self.__map_document_to_output_dto(document)
+        return self.__map_documents_to_output_dto([document])[0]
 
     def save_document(
         self, name: str, content: str, project_id: int, creator_id: int, state_id: int
@@ -146,34 +174,61 @@ class DocumentService:
             )
         )
 
-        processed_edits = [
-            {
-                "id": edit.edit_id,
-                "user": {
-                    "id": edit.user_id,
-                    "email": edit.user_email,
-                    "username": edit.user_username,
-                },
-                "state": {
-                    "id": edit.state_id,
-                    "type": edit.state_type,
-                },
-            }
-            for edit in document_edits
+        return [self.__map_document_edit_to_output_dto(edit) for edit in document_edits]
+
+    def __map_documents_to_output_dto(self, documents, with_document_edits=True):
+        """
+        Maps input documents to output dtos.
+        The document edits of all documents are fetched with a single query.
+
+        :param documents: Documents to map.
+        :param with_document_edits: Whether to fetch the document edits.
+        :return: List of document_output_dto
+        """
+        edits = (
+            self.__document_repository.get_all_document_edits_with_user_by_documents(
+                [doc.id for doc in documents]
+            )
+            if with_document_edits
+            else []
+        )
+        document_edits = defaultdict(list)
+        for edit in edits:
+            document_edits[edit.document_id].append(
+                self.__map_document_edit_to_output_dto(edit)
+            )
+        return [
+            self.__map_document_to_output_dto(doc, document_edits[doc.id])
+            for doc in documents
         ]
 
-        return processed_edits
+    @staticmethod
+    def __map_document_edit_to_output_dto(edit):
+        return {
+            "id": edit.edit_id,
+            "user": {
+                "id": edit.user_id,
+                "email": edit.user_email,
+                "username": edit.user_username,
+            },
+            "state": {
+                "id": edit.state_id,
+                "type": edit.state_type,
+            },
+        }
 
-    def __map_document_to_output_dto(self, doc):
+    @staticmethod
+    def __map_document_to_output_dto(doc, document_edits):
         """
         Maps input document to output dto.
 
         :param doc: Document to map.
+        :param document_edits: Mapped document edits of the document.
         :return: document_output_dto
         """
         return {
             "id": doc.id,
-            "content": doc.content,
+            "content": getattr(doc, "content", None),
             "name": doc.name,
             "state": {
                 "id": doc.document_state_id,
@@ -195,7 +250,7 @@ class DocumentService:
                 "id": doc.document_edit_id,
                 "state": doc.document_edit_state,
             },
-            "document_edits": self.get_all_document_edits_with_user_by_document(doc.id),
+            "document_edits": document_edits,
             "creator": {
                 "id": doc.creator_id,
                 "username": doc.username,
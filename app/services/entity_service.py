@@ -65,6 +65,18 @@ class EntityService:
         """
         return self.__entity_repository.create_in_edit(document_edit_id)
 
+    def create_entities_in_edit(self, document_edit_id: int, count: int):
+        """
+        Create multiple empty entities for given documentEdit in bulk.
+
+        :param document_edit_id: DocumentEdit ID to create entities for.
+        :param count: Number of entities to create.
+        :return: List of entity IDs.
+        """
+        return self.__entity_repository.create_entities(
+            document_edit_id, count, is_shown_recommendation=True
+        )
+
     def delete_entity(self, entity_id):
         entity = self.__entity_repository.get_entity_by_id(entity_id)
         if entity is None:
@@ -107,8 +119,10 @@ class EntityService:
         entity = self.__entity_repository.create_entity(document_edit_id)
 
         # add entity id to mention or replace previous one
+        self.mention_service.add_to_entities(
+            {mention["id"]: entity.id for mention in mentions_of_entity}
+        )
         for mention in mentions_of_entity:
-            self.mention_service.add_to_entity(entity.id, mention["id"])
             mention["entity_id"] = entity.id
 
         response = {
@@ -136,22 +150,55 @@ class EntityService:
             ):
                 mentions_without_entity.append(mention)
 
-        for mention in mentions_without_entity:
-            entity = self.__entity_repository.create_entity(document_edit_id)
-            self.mention_service.add_to_entity(entity.id, mention["id"])
-            mention["entity_id"] = entity.id
+        entity_ids = self.save_entities_in_edit(
+            document_edit_id, [[mention["id"]] for mention in mentions_without_entity]
+        )
+        for mention, entity_id in zip(mentions_without_entity, entity_ids):
+            mention["entity_id"] = entity_id
         return mentions_without_entity
 
     def save_entity_in_edit(
         self, document_edit_id, mentions, document_recommendation_id
     ):
-        entity = self.__entity_repository.create_entity(
+        self.save_entities_in_edit(
             document_edit_id,
+            [[mention["id"] for mention in mentions]],
             document_recommendation_id=document_recommendation_id,
             is_shown_recommendation=True,
         )
-        for mention in mentions:
-            self.mention_service.add_to_entity(entity.id, mention["id"])
+
+    def save_entities_in_edit(
+        self,
+        document_edit_id,
+        mention_id_groups,
+        document_recommendation_id=None,
+        is_shown_recommendation=False,
+    ):
+        """
+        Saves one entity per group of mentions and adds the mentions to it.
+        Entities are inserted with one statement, mentions are assigned with another.
+        Does not check for valid inputs.
+
+        :param document_edit_id: DocumentEdit ID to create entities for.
+        :param mention_id_groups: List of mention ID lists, one per entity.
+        :param document_recommendation_id: Document recommendation ID of the entities.
+        :param is_shown_recommendation: Are entities shown recommendations.
+        :return: List of entity IDs in the order of mention_id_groups.
+        """
+        entity_ids = self.__entity_repository.create_entities(
+            document_edit_id,
+            len(mention_id_groups),
+            document_recommendation_id=document_recommendation_id,
+            is_shown_recommendation=is_shown_recommendation,
+        )
+        self.mention_service.add_to_entities(
+            {
+                mention_id: entity_id
+                for mention_ids, entity_id in zip(mention_id_groups, entity_ids)
+                for mention_id in mention_ids
+            }
+        )
+        return entity_ids
 
 
 entity_service = EntityService(
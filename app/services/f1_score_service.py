@@ -1,26 +1,46 @@
-from flask import current_app
 from werkzeug.exceptions import BadRequest
-import requests
+
+from app.cache import LruCache
+from app.clients.service_client import difference_calc_client
+from app.config import Config
 
 
 class F1ScoreService:
+    __f1_score_cache: LruCache
 
-    def __init__(self):
-        pass
+    def __init__(self, f1_score_cache):
+        self.__f1_score_cache = f1_score_cache
 
     def get_f1_score(self, f1_score_request_dto):
-        # Define the base URL
-        url = current_app.config.get("DIFFERENCE_CALC_URL") + "/f1-score"
-        # Define the headers
-        headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(url, json=f1_score_request_dto, headers=headers)
+        response = difference_calc_client.post("/f1-score", json=f1_score_request_dto)
         if response.status_code != 200:
             raise BadRequest("Failed to fetch f1 score: " + response.text)
         f1_score = response.json()
         return f1_score
 
+    def get_f1_score_of_revision(self, document_edit_id, revision, build_request):
+        """
+        Fetches the F1 score of a document edit, cached per annotation revision.
+        Only the score of the latest revision of a document edit is kept.
+
+        :param document_edit_id: Document edit ID
+        :param revision: Committed annotation revision of the document edit,
+            None if the current transaction changed its annotations
+        :param build_request: Function building the f1 score request, called on a miss
+        :return: f1_score_dto
+        :raises BadRequest: If the F1 score could not be calculated
+        """
+        if revision is not None:
+            cached = self.__f1_score_cache.get(document_edit_id)
+            if cached is not None and cached[0] == revision:
+                return cached[1]
+
+        f1_score = self.get_f1_score(build_request())
+        if revision is not None:
+            self.__f1_score_cache.put(document_edit_id, (revision, f1_score))
+        return f1_score
+
 
-f1_score_service = F1ScoreService()
+f1_score_service = F1ScoreService(
+    LruCache("f1_scores", maxsize=Config.F1_SCORE_CACHE_SIZE)
+)
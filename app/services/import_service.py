@@ -1,5 +1,16 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
 import typing
 
+from flask import current_app
+from werkzeug.exceptions import BadRequest
+
+from app.compiled_schema import CompiledSchema
+from app.config import Config
+from app.json_stream import JsonArrayReader
 from app.repositories.document_repository import DocumentRepository
 from app.services.document_edit_service import (
     document_edit_service,
@@ -7,75 +18,31 @@ from app.services.document_edit_service import (
 )
 from app.services.document_service import DocumentService, document_service
 from app.services.entity_service import EntityService, entity_service
+from app.services.job_service import JobService, job_service
 from app.services.mention_services import MentionService, mention_service
 from app.services.relation_services import RelationService, relation_service
 from app.services.schema_service import SchemaService, schema_service
 from app.services.token_service import TokenService, token_service
 
 
-def _verify_constraint(schema, tag: str, head_mention, tail_mention) -> any:
-    schema_head_mention = next(
-        (
-            mention
-            for mention in schema["schema_mentions"]
-            if mention["tag"] == head_mention["tag"]
-        ),
-        None,
-    )
-
-    if schema_head_mention is None:
-        # This is a LogicError as the mentions has been saved before
-        raise ImportError(
-            f'Given Mention type "{head_mention["tag"]}" does not exist in the schema of the project'
-        )
-
-    schema_tail_mention = next(
-        (
-            mention
-            for mention in schema["schema_mentions"]
-            if mention["tag"] == tail_mention["tag"]
-        ),
-        None,
-    )
-
-    if schema_tail_mention is None:
-        # This is a LogicError as the mentions has been saved before
-        raise ImportError(
-            f'Given Mention type "{tail_mention["tag"]}" does not exist in the schema of the project'
-        )
-
-    constraint = next(
-        (
-            constraint
-            for constraint in schema["schema_constraints"]
-            if constraint["schema_relation"]["tag"] == tag
-            and (
-                (
-                    constraint["schema_mention_head"]["tag"]
-                    == schema_head_mention.get("tag")
-                    and constraint["schema_mention_tail"]["tag"]
-                    == schema_tail_mention.get("tag")
-                )
-                or (
-                    constraint["schema_mention_tail"]["tag"]
-                    == schema_head_mention.get("tag")
-                    and constraint["schema_mention_head"]["tag"]
-                    == schema_tail_mention.get("tag")
-                    and constraint["is_directed"] == False
-                )
-            )
-        ),
-        None,
+def _verify_constraint(
+    schema: CompiledSchema, tag: str, head_mention, tail_mention
+) -> any:
+    # Mention types were verified when the mentions were saved
+    constraint = schema.constraint_by_tags(
+        tag, head_mention["tag"], tail_mention["tag"]
     )
     if constraint is None:
         raise ImportError(
-            f"The Relation '{tag}' with mention_head: '{schema_head_mention.get("tag")}' and mention_tail: '{schema_tail_mention.get("tag")}' is not allowed in the schema."
+            f"The Relation '{tag}' with mention_head: '{head_mention["tag"]}' and mention_tail: '{tail_mention["tag"]}' is not allowed in the schema."
         )
 
     return constraint
 
 
 class ImportService:
+    PET_IMPORT_JOB = "pet_import"
+
     _document_service: DocumentService
     _document_edit_service: DocumentEditService
     _token_service: TokenService
@@ -83,6 +50,7 @@ class ImportService:
     _entity_service: EntityService
     _relation_service: RelationService
     _schema_service: SchemaService
+    _job_service: JobService
 
     def __init__(
         self,
@@ -93,6 +61,7 @@ class ImportService:
         entity_service: EntityService,
         relation_service: RelationService,
         schema_service: SchemaService,
+        job_service: JobService,
     ):
         self._document_service = document_service
         self._document_edit_service = document_edit_service
@@ -101,6 +70,13 @@ class ImportService:
         self._entity_service = entity_service
         self._relation_service = relation_service
         self._schema_service = schema_service
+        self._job_service = job_service
+        self._job_service.register(
+            self.PET_IMPORT_JOB,
+            lambda payload, report_progress: self.import_pet_file(
+                report_progress=report_progress, **payload
+            ),
+        )
 
     def import_pet_documents(
         self,
@@ -108,12 +84,105 @@ class ImportService:
         project_id: int,
         user_id,
     ):
+        schema = self._schema_service.get_compiled_schema_by_project_id(project_id)
         for pet_document in pet_documents:
-            self._import_pet_document(pet_document, project_id, user_id)
+            self._import_pet_document(pet_document, project_id, user_id, schema)
 
         return {"count": len(pet_documents), "success": True}
 
-    def _import_pet_document(self, pet_document: any, project_id: int, user_id: int):
+    def import_pet_stream(self, stream, project_id: int, user_id: int, chunk_size=None):
+        """
+        Starts importing a list of PET documents in the background.
+        The upload is copied to a temporary file as it arrives, without parsing it.
+
+        :param stream: Binary stream of a JSON object with the documents as "documents"
+        :param project_id: Target project of the documents
+        :param user_id: User importing the documents
+        :param chunk_size: Documents imported per transaction
+        :return: Job database object
+        :raises BadRequest: If the chunk size is invalid
+        """
+        if chunk_size is None:
+            chunk_size = current_app.config.get(
+                "IMPORT_CHUNK_SIZE", Config.IMPORT_CHUNK_SIZE
+            )
+        if chunk_size < 1:
+            raise BadRequest("Chunk size must be positive")
+
+        with tempfile.NamedTemporaryFile(
+            prefix="pet-import-", suffix=".json", delete=False
+        ) as file:
+            shutil.copyfileobj(stream, file)
+        try:
+            # Documents are committed in chunks, so a retry would import them twice
+            return self._job_service.enqueue(
+                self.PET_IMPORT_JOB,
+                {
+                    "path": file.name,
+                    "project_id": project_id,
+                    "user_id": user_id,
+                    "chunk_size": chunk_size,
+                },
+                user_id,
+                max_attempts=1,
+            )
+        except Exception:
+            os.remove(file.name)
+            raise
+
+    def import_pet_file(
+        self, path, project_id: int, user_id: int, chunk_size: int, report_progress
+    ):
+        """
+        Imports PET documents from a file while parsing it, one document at a time.
+        Executed as background job, every chunk of documents is committed on its own.
+        The file is deleted afterward.
+
+        :return: Number of imported documents and throughput in documents per minute
+        :raises ImportError: If a document is invalid. Its message names how many
+            documents were committed before.
+        """
+        started = time.monotonic()
+        imported = 0
+        committed = 0
+        try:
+            schema = self._schema_service.get_compiled_schema_by_project_id(project_id)
+            size = max(os.path.getsize(path), 1)
+            with open(path, "rb") as file:
+                for pet_document in JsonArrayReader(file).items("documents"):
+                    self._import_pet_document(pet_document, project_id, user_id, schema)
+                    imported += 1
+                    if imported % chunk_size == 0:
+                        self._job_service.checkpoint()
+                        committed = imported
+                        report_progress(min(100 * file.tell() // size, 99))
+        except Exception as e:
+            raise ImportError(
+                f"Document {imported + 1} could not be imported, "
+                f"{committed} documents were imported before: {e}"
+            ) from e
+        finally:
+            os.remove(path)
+
+        elapsed = time.monotonic() - started
+        documents_per_minute = round(imported * 60 / max(elapsed, 1e-3), 1)
+        logging.info(
+            f"Imported {imported} PET documents into project {project_id}, "
+            f"{documents_per_minute} documents/min"
+        )
+        return {
+            "count": imported,
+            "success": True,
+            "documents_per_minute": documents_per_minute,
+        }
+
+    def _import_pet_document(
+        self,
+        pet_document: any,
+        project_id: int,
+        user_id: int,
+        schema: CompiledSchema,
+    ):
         document = self._document_service.save_document(
             pet_document.get("name"),
             pet_document.get("text"),
@@ -123,84 +192,114 @@ class ImportService:
         )
 
         tokens = pet_document.get("tokens")
-        token_ids_by_index = {}
-        for index, token in enumerate(tokens):
-            created_token = self._token_service.save_token(
-                text=token.get("text"),
-                document_index=token.get("indexInDocument"),
-                pos_tag=token.get("posTag"),
-                sentence_index=token.get("sentenceIndex"),
-                doc_id=document.id,
-            )
-            token_ids_by_index[index] = created_token.id
+        token_ids = self._token_service.save_tokens(
+            [
+                {
+                    "text": token.get("text"),
+                    "document_index": token.get("indexInDocument"),
+                    "pos_tag": token.get("posTag"),
+                    "sentence_index": token.get("sentenceIndex"),
+                }
+                for token in tokens
+            ],
+            document.id,
+        )
+        token_ids_by_index = dict(enumerate(token_ids))
 
         # Create document edit
         document_edit = self._document_edit_service.create_document_edit(
             user_id, document.id, with_recommendations=False
         )
         # Import Mentions to documentEdit
-        schema = self._schema_service.get_schema_by_project_id(project_id)
-
         mentions = pet_document.get("mentions")
-        mentions_by_index = {}
-        for index, mention in enumerate(mentions):
-            schema_mention_id = None
-            for schema_mention in schema["schema_mentions"]:
-                if schema_mention.get("tag") == mention.get("type"):
-                    schema_mention_id = schema_mention.get("id")
-                    break
+
+        # Import Entities of documentEdit first, so mentions are saved with their entity
+        entities = pet_document.get("entities")
+        entity_ids = self._entity_service.create_entities_in_edit(
+            document_edit["id"], len(entities)
+        )
+        entity_ids_by_mention_index = {}
+        for entity, entity_id in zip(entities, entity_ids):
+            for mention_index in entity["mentionIndices"]:
+                if not 0 <= mention_index < len(mentions):
+                    raise ImportError(
+                        "Given Entity refers to a mention not in the document"
+                    )
+                entity_ids_by_mention_index[mention_index] = entity_id
+
+        mentions_to_save = []
+        mentioned_token_ids = set()
+        for mention_index, mention in enumerate(mentions):
+            schema_mention_id = schema.schema_mention_ids_by_tag.get(
+                mention.get("type")
+            )
             if schema_mention_id is None:
                 raise ImportError(
                     f'Given Mention type "{mention.get("type")}" does not exist in the schema of the project'
                 )
-            created_mention = self._mention_service.create_mentions(
-                document_edit_id=document_edit["id"],
-                schema_mention_id=schema_mention_id,
-                token_ids=[
-                    token_ids_by_index.get(t)
-                    for t in mention.get("tokenDocumentIndices")
-                ],
+            token_ids = [
+                token_ids_by_index.get(t) for t in mention.get("tokenDocumentIndices")
+            ]
+            # Mentions are saved in bulk, so tokens are checked here
+            if None in token_ids:
+                raise ImportError("Given Mention refers to a token not in the document")
+            if len(set(token_ids)) != len(token_ids):
+                raise ImportError("Given Mention refers to a token more than once")
+            if mentioned_token_ids.intersection(token_ids):
+                raise ImportError("Given Mentions share tokens")
+            mentioned_token_ids.update(token_ids)
+            mentions_to_save.append(
+                {
+                    "schema_mention_id": schema_mention_id,
+                    "token_ids": token_ids,
+                    "entity_id": entity_ids_by_mention_index.get(mention_index),
+                }
             )
-            mentions_by_index[index] = created_mention
-
-        # Import Entities of documentEdit
-        entities = pet_document.get("entities")
-        for entity in entities:
-            created_entity = self._entity_service.create_in_edit(document_edit["id"])
-
-            for mention_index in entity["mentionIndices"]:
-                self._mention_service.add_to_entity(
-                    created_entity.id, mentions_by_index.get(mention_index)["id"]
-                )
+        mention_ids = self._mention_service.save_mentions(
+            document_edit["id"], mentions_to_save
+        )
+        mentions_by_index = {
+            index: {"id": mention_id, "tag": mention.get("type")}
+            for index, (mention, mention_id) in enumerate(zip(mentions, mention_ids))
+        }
 
         # Import Relations of documentEdit
         relations = pet_document.get("relations")
+        relations_to_save = []
         for relation in relations:
-            schema_relation_id = None
-            for schema_relation in schema["schema_relations"]:
-                if schema_relation.get("tag") == relation.get("type"):
-                    schema_relation_id = schema_relation.get("id")
-                    break
-
+            schema_relation_id = schema.schema_relation_ids_by_tag.get(
+                relation.get("type")
+            )
             if schema_relation_id is None:
                 raise ImportError(
                     f'Given Relation type "{relation.get("type")}" does not exist in the schema of the project'
                 )
 
+            head_mention = mentions_by_index.get(relation["headMentionIndex"])
+            tail_mention = mentions_by_index.get(relation["tailMentionIndex"])
+            if head_mention is None or tail_mention is None:
+                raise ImportError(
+                    "Given Relation refers to a mention not in the document"
+                )
+
             schema_constraint = _verify_constraint(
                 schema,
                 relation.get("type"),
-                mentions_by_index.get(relation["headMentionIndex"]),
-                mentions_by_index.get(relation["tailMentionIndex"]),
+                head_mention,
+                tail_mention,
             )
 
-            self._relation_service.save_relation_in_edit(
-                schema_relation_id,
-                schema_constraint["is_directed"],
-                mentions_by_index.get(relation["headMentionIndex"])["id"],
-                mentions_by_index.get(relation["tailMentionIndex"])["id"],
-                document_edit["id"],
+            relations_to_save.append(
+                {
+                    "schema_relation_id": schema_relation_id,
+                    "is_directed": schema_constraint["is_directed"],
+                    "mention_head_id": head_mention["id"],
+                    "mention_tail_id": tail_mention["id"],
+                }
             )
+        self._relation_service.save_relations_in_edit(
+            document_edit["id"], relations_to_save
+        )
 
 
 import_service = ImportService(
@@ -211,4 +310,5 @@ import_service = ImportService(
     entity_service=entity_service,
     relation_service=relation_service,
     schema_service=schema_service,
+    job_service=job_service,
 )
@@ -0,0 +1,372 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g
+from werkzeug.exceptions import Conflict, Forbidden, HTTPException, NotFound
+
+from app.config import Config
+from app.db import Session
+from app.repositories.job_repository import JobRepository
+
+
+class JobCancelled(Exception):
+    """
+    Raised when a running job reports progress after it was cancelled.
+    """
+
+
+class JobService:
+    """
+    Runs long-running work like recommendation generation in background worker threads.
+
+    Jobs are stored in the database and handed to the worker pool once the transaction
+    that created them commits. Every attempt runs in its own transaction, so a failed
+    attempt leaves no partial writes and can be retried safely.
+
+    Each process renews the heartbeat of the jobs it runs. Jobs whose heartbeat went
+    stale, because the process running them stopped, are recovered by a sweep that runs
+    at startup and periodically afterward.
+    """
+
+    __job_repository: JobRepository
+
+    def __init__(self, job_repository, session_factory, workers, retry_backoff):
+        self.__job_repository = job_repository
+        self.__session_factory = session_factory
+        self.__workers = workers
+        self.__retry_backoff = retry_backoff
+        self.__handlers = {}
+        self.__executor = None
+        self.__executor_lock = threading.Lock()
+        # Jobs submitted to the worker pool of this process and not finished yet
+        self.__job_ids = set()
+
+    def init_app(self, app):
+        """
+        Starts the sweep recovering orphaned jobs, once at startup and then every
+        JOB_SWEEP_INTERVAL seconds. An interval of 0 disables it.
+        """
+        interval = app.config.get("JOB_SWEEP_INTERVAL", Config.JOB_SWEEP_INTERVAL)
+        if interval > 0:
+            threading.Thread(
+                target=self.__sweep,
+                args=(app, interval),
+                name="job-sweep",
+                daemon=True,
+            ).start()
+
+    def register(self, job_type, handler, on_failure=None, resumable=True):
+        """
+        Registers the handler executing jobs of a type.
+
+        :param job_type: Job type name
+        :param handler: Function called with the job payload and a function reporting
+            progress in percent. Its return value is stored as job result.
+        :param on_failure: Optional function called with the job payload once the job
+            failed for good or was cancelled, e.g. to revert state changed when it
+            was enqueued.
+            It runs in the transaction recording the failure.
+        :param resumable: Whether another process may run the job once the process
+            that enqueued it stopped. Jobs depending on state of that process, like
+            local files, fail instead.
+        """
+        self.__handlers[job_type] = (handler, on_failure, resumable)
+
+    def enqueue(
+        self,
+        job_type,
+        payload,
+        user_id,
+        max_attempts=3,
+        concurrency_key=None,
+        concurrency_limit=None,
+    ):
+        """
+        Creates a job, which is executed after the current transaction commits.
+
+        :param job_type: Registered job type
+        :param payload: JSON serializable arguments of the handler
+        :param user_id: User owning the job
+        :param max_attempts: Number of attempts before the job fails
+        :param concurrency_key: Key shared by jobs limited in number, e.g. per schema
+        :param concurrency_limit: Maximum of queued and running jobs with the key
+        :return: Job database object
+        :raises Conflict: If the limit of jobs with the key is reached
+        """
+        if concurrency_limit is not None:
+            self.__job_repository.lock_concurrency_key(concurrency_key)
+            if (
+                self.__job_repository.count_active_jobs(concurrency_key)
+                >= concurrency_limit
+            ):
+                raise Conflict(
+                    f"{concurrency_limit} such jobs are already queued or running, "
+                    f"try again once one finished"
+                )
+        job = self.__job_repository.create_job(
+            job_type, payload, user_id, max_attempts, concurrency_key
+        )
+        app = current_app._get_current_object()
+        job_id = job.id
+        self.__job_repository.run_after_commit(lambda: self.__submit(app, job_id))
+        return job
+
+    def get_job(self, job_id, user_id, wait=0):
+        """
+        Fetch status and progress of a job.
+        Optionally waits for the job to finish (long polling).
+
+        :param job_id: Job ID to query
+        :param user_id: User requesting the job
+        :param wait: Maximum seconds to wait for the job to finish
+        :return: job_output_dto
+        :raises NotFound: If the job does not exist
+        :raises Forbidden: If the job belongs to another user
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            job = self.__get_accessible_job(job_id, user_id)
+            if job.status in JobRepository.FINISHED or (time.monotonic() >= deadline):
+                return self.__map_job_to_output_dto(job)
+            time.sleep(min(0.5, max(deadline - time.monotonic(), 0)))
+
+    def get_jobs_by_concurrency_key(self, concurrency_key, limit=20):
+        """
+        Fetch the most recent jobs sharing a concurrency key.
+
+        :param concurrency_key: Key of the jobs
+        :param limit: Maximum number of jobs
+        :return: job_output_list_dto
+        """
+        return {
+            "jobs": [
+                self.__map_job_to_output_dto(job)
+                for job in self.__job_repository.get_jobs_by_concurrency_key(
+                    concurrency_key, limit
+                )
+            ]
+        }
+
+    def has_active_jobs(self, concurrency_key):
+        """
+        Checks if jobs sharing a concurrency key are queued or running.
+
+        :param concurrency_key: Key of the jobs
+        :return: True if at least one job is queued or running
+        """
+        return self.__job_repository.count_active_jobs(concurrency_key) > 0
+
+    def cancel_job(self, job_id, user_id):
+        """
+        Cancels a queued or running job. Running jobs stop the next time they report
+        progress, work they did not commit by a checkpoint is rolled back.
+
+        :param job_id: Job ID to cancel
+        :param user_id: User cancelling the job
+        :return: job_output_dto
+        :raises NotFound: If the job does not exist
+        :raises Forbidden: If the job belongs to another user
+        :raises Conflict: If the job already finished
+        """
+        job = self.__get_accessible_job(job_id, user_id)
+        if self.__job_repository.cancel_job(job_id, JobRepository.QUEUED):
+            # Running jobs call their failure handler themselves once they stopped
+            _, on_failure, _ = self.__handlers.get(job.type, (None, None, True))
+            if on_failure is not None:
+                on_failure(job.payload)
+        elif not self.__job_repository.cancel_job(job_id, JobRepository.RUNNING):
+            raise Conflict("Job already finished")
+        return self.__map_job_to_output_dto(self.__job_repository.get_job_by_id(job_id))
+
+    def recover_jobs(self):
+        """
+        Renews the heartbeat of the jobs of this process and recovers jobs whose
+        heartbeat is older than JOB_STALE_AFTER seconds.
+        Interrupted running jobs are queued again unless they used up their attempts,
+        queued jobs are resubmitted to this process. Jobs that are not resumable fail
+        instead, failed jobs run their failure handler.
+
+        :return: Number of recovered jobs
+        """
+        stale_after = current_app.config.get("JOB_STALE_AFTER", Config.JOB_STALE_AFTER)
+        app = current_app._get_current_object()
+        recovered = 0
+        g.db_session = self.__session_factory()
+        try:
+            with self.__executor_lock:
+                own_job_ids = set(self.__job_ids)
+            if own_job_ids:
+                self.__job_repository.touch_jobs(own_job_ids)
+                g.db_session.commit()
+
+            for job in self.__job_repository.get_stale_jobs(stale_after):
+                if job.id in own_job_ids or not self.__job_repository.claim_stale_job(
+                    job.id, job.status, stale_after
+                ):
+                    continue
+                _, on_failure, resumable = self.__handlers.get(
+                    job.type, (None, None, True)
+                )
+                final = not resumable or (
+                    job.status == JobRepository.RUNNING
+                    and job.attempts >= job.max_attempts
+                )
+                if final and on_failure is not None:
+                    self.__run_failure_handler(job.id, on_failure, job.payload)
+                if final or job.status == JobRepository.RUNNING:
+                    self.__job_repository.fail_attempt(
+                        job.id, "Job was interrupted by a restart", final, job.status
+                    )
+                g.db_session.commit()
+                logging.warning(
+                    f"Recovered orphaned job {job.id} ({job.type}), "
+                    f"{'failed' if final else 'resubmitted'}"
+                )
+                if not final:
+                    self.__submit(app, job.id)
+                recovered += 1
+        except Exception:
+            g.db_session.rollback()
+            logging.exception("Recovering orphaned jobs failed")
+        finally:
+            self.__session_factory.remove()
+        return recovered
+
+    def checkpoint(self):
+        """
+        Commits the work the running job did so far.
+        Only for handlers that skip work already done when the job is retried.
+        """
+        g.db_session.commit()
+
+    def shutdown(self):
+        """
+        Waits for all submitted jobs to finish.
+        """
+        with self.__executor_lock:
+            if self.__executor is not None:
+                self.__executor.shutdown(wait=True)
+                self.__executor = None
+
+    def __submit(self, app, job_id):
+        with self.__executor_lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    max_workers=self.__workers, thread_name_prefix="job"
+                )
+            self.__job_ids.add(job_id)
+            self.__executor.submit(self.__run, app, job_id)
+
+    def __run(self, app, job_id):
+        try:
+            with app.app_context():
+                while self.__run_attempt(job_id):
+                    time.sleep(self.__retry_backoff)
+        finally:
+            with self.__executor_lock:
+                self.__job_ids.discard(job_id)
+
+    def __sweep(self, app, interval):
+        while True:
+            with app.app_context():
+                self.recover_jobs()
+            time.sleep(interval)
+
+    def __run_attempt(self, job_id):
+        """
+        Runs one attempt of a job in its own transaction.
+
+        :return: True if the job should be retried
+        """
+        g.db_session = self.__session_factory()
+        try:
+            job = self.__job_repository.start_attempt(job_id)
+            g.db_session.commit()
+            if job is None:
+                return False
+            job_type, payload = job.type, job.payload
+            attempts, max_attempts = job.attempts, job.max_attempts
+
+            handler, on_failure, _ = self.__handlers.get(job_type, (None, None, True))
+            try:
+                if handler is None:
+                    raise KeyError(f"No handler registered for job type {job_type}")
+                result = handler(
+                    payload, lambda progress: self.__report_progress(job_id, progress)
+                )
+                if not self.__job_repository.finish_job(job_id, result):
+                    # Cancelled after the last progress report
+                    raise JobCancelled(f"Job {job_id} was cancelled")
+                g.db_session.commit()
+                return False
+            except JobCancelled:
+                g.db_session.rollback()
+                logging.info(f"Job {job_id} ({job_type}) was cancelled")
+                if on_failure is not None:
+                    self.__run_failure_handler(job_id, on_failure, payload)
+                    g.db_session.commit()
+                return False
+            except Exception as e:
+                g.db_session.rollback()
+                logging.exception(f"Job {job_id} ({job_type}) failed")
+                # Client errors will fail again, retrying them is pointless
+                final = attempts >= max_attempts or (
+                    isinstance(e, HTTPException) and e.code < 500
+                )
+                error = e.description if isinstance(e, HTTPException) else str(e)
+                if final and on_failure is not None:
+                    self.__run_failure_handler(job_id, on_failure, payload)
+                self.__job_repository.fail_attempt(job_id, error, final)
+                g.db_session.commit()
+                return not final
+        except Exception:
+            g.db_session.rollback()
+            logging.exception(f"Job {job_id} could not be executed")
+            return False
+        finally:
+            self.__session_factory.remove()
+
+    def __report_progress(self, job_id, progress):
+        if not self.__job_repository.update_progress(job_id, progress):
+            raise JobCancelled(f"Job {job_id} was cancelled")
+
+    def __get_accessible_job(self, job_id, user_id):
+        job = self.__job_repository.get_job_by_id(job_id)
+        if job is None:
+            raise NotFound("Job not found")
+        if job.user_id != user_id:
+            raise Forbidden("You have no access to this job")
+        return job
+
+    @staticmethod
+    def __run_failure_handler(job_id, on_failure, payload):
+        try:
+            on_failure(payload)
+        except Exception:
+            g.db_session.rollback()
+            logging.exception(f"Failure handler of job {job_id} failed")
+
+    @staticmethod
+    def __map_job_to_output_dto(job):
+        return {
+            "id": job.id,
+            "type": job.type,
+            "status": job.status,
+            "progress": job.progress,
+            "attempts": job.attempts,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+
+
+job_service = JobService(
+    JobRepository(),
+    Session,
+    workers=Config.JOB_WORKERS,
+    retry_backoff=Config.JOB_RETRY_BACKOFF,
+)
@@ -1,6 +1,8 @@
+from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import BadRequest, NotFound, Conflict
 
 from app.repositories.mention_repository import MentionRepository
+from app.repositories.token_mention_repository import TokenMentionRepository
 from app.services.schema_service import SchemaService, schema_service
 from app.services.token_service import TokenService, token_service
 
@@ -20,6 +22,9 @@ from app.services.token_mention_service import (
 
 
 class MentionService:
+    ACCEPT = "accept"
+    REJECT = "reject"
+
     __mention_repository: MentionRepository
     token_mention_service: TokenMentionService
     relation_mention_service: RelationMentionService
@@ -127,17 +132,13 @@ class MentionService:
         if schema_mention.schema_id != schema.id:
             raise BadRequest("Mention Tag not allowed")
 
-        # save mention
-        mention = self.__mention_repository.create_mention(
-            document_edit_id=document_edit_id,
-            schema_mention_id=schema_mention_id,
+        # save mention with its token mentions
+        (mention_id,) = self.save_mentions(
+            document_edit_id,
+            [{"schema_mention_id": schema_mention_id, "token_ids": token_ids}],
         )
 
-        # save token mention
-        for token_id in token_ids:
-            self.token_mention_service.create_token_mention(token_id, mention.id)
-
-        return self.get_mention_dto_by_id(mention.id)
+        return self.get_mention_dto_by_id(mention_id)
 
     def add_to_entity(self, entity_id: int, mention_id: int):
         """
@@ -150,6 +151,15 @@ class MentionService:
         """
         self.__mention_repository.add_to_entity(entity_id, mention_id)
 
+    def add_to_entities(self, entity_ids_by_mention_id):
+        """
+        Add mentions to existing entities at once.
+        Does not check for valid inputs.
+
+        :param entity_ids_by_mention_id: Dict mapping mention IDs to entity IDs
+        """
+        self.__mention_repository.add_to_entities(entity_ids_by_mention_id)
+
     def delete_mention(self, mention_id):
         if not isinstance(mention_id, int) or mention_id <= 0:
             raise BadRequest("Invalid mention ID. It must be a positive integer.")
@@ -251,8 +261,10 @@ class MentionService:
 
             # Update token mentions
             self.token_mention_service.delete_token_mentions_by_mention_id(mention_id)
-            for token_id in token_ids:
-                self.token_mention_service.create_token_mention(token_id, mention_id)
+            self.__create_token_mentions(
+                [(token_id, mention_id) for token_id in token_ids],
+                mention.document_edit_id,
+            )
 
         # Raise exception if entity is specified but forbidden by schema
         if entity_id is not None or mention.entity_id is not None:
@@ -283,24 +295,11 @@ class MentionService:
 
         :param document_edit_id: DocumentEdit ID to check tokens.
         :param token_ids: Token IDs to check.
-        :return: List of duplicate tokens, empty list if no duplicates found.
+        :return: List of duplicate token mentions with token_id and mention_id, empty list if no duplicates found.
         """
-        # Fetch mentions of document edit
-        mentions = self.__mention_repository.get_mentions_with_tokens_by_document_edit(
-            document_edit_id
+        return self.token_mention_service.get_token_mentions_in_document_edit(
+            document_edit_id, token_ids
         )
-        if len(mentions) > 0:
-
-            mention_ids = []
-            for mention in mentions:
-                mention_ids.append(mention.mention_id)
-
-            # Find duplicate tokens
-            duplicate_token_mention = self.token_mention_service.get_token_mention(
-                token_ids, mention_ids
-            )
-            return duplicate_token_mention
-        return []
 
     def accept_mention(self, mention_id):
         """
@@ -312,27 +311,26 @@ class MentionService:
         if not mention.isShownRecommendation:
             raise BadRequest("Mention recommendation already processed.")
 
-        # Create new mention
-        new_mention = self.__mention_repository.create_mention(
-            schema_mention_id=mention.schema_mention_id,
-            document_edit_id=mention.document_edit_id,
-            document_recommendation_id=None,
-            is_shown_recommendation=False,
-            entity_id=mention.entity_id,
-        )
-
-        # Add tokens to mention
+        # Create new mention with the tokens of the recommendation
         token_mentions = self.token_mention_service.get_token_mentions_by_mention_id(
             mention_id
         )
-        for token_mention in token_mentions:
-            self.token_mention_service.create_token_mention(
-                token_mention.token_id, new_mention.id
-            )
+        (new_mention_id,) = self.save_mentions(
+            mention.document_edit_id,
+            [
+                {
+                    "schema_mention_id": mention.schema_mention_id,
+                    "token_ids": [
+                        token_mention.token_id for token_mention in token_mentions
+                    ],
+                    "entity_id": mention.entity_id,
+                }
+            ],
+        )
 
         # Update mention recommendation
         self.__mention_repository.update_is_shown_recommendation(mention_id, False)
-        return self.get_mention_dto_by_id(new_mention.id)
+        return self.get_mention_dto_by_id(new_mention_id)
 
     def reject_mention(self, mention_id):
         """
@@ -348,6 +346,65 @@ class MentionService:
         self.__mention_repository.update_is_shown_recommendation(mention_id, False)
         return {"message": "Mention successfully rejected."}
 
+    def review_mentions(self, document_edit_id, action, mention_ids=None, tag=None):
+        """
+        Accepts or rejects many mention recommendations of a document edit at once.
+        Without mention IDs and tag, all remaining recommendations are reviewed.
+        Accepted recommendations are copied with two inserts, all recommendations are
+        marked as processed with one update.
+
+        :param document_edit_id: DocumentEdit ID of the recommendations.
+        :param action: "accept" or "reject"
+        :param mention_ids: Mention recommendations to review.
+        :param tag: Review the recommendations of this schema mention tag.
+        :return: recommendation_review_output_dto
+        :raises BadRequest: If the action is invalid, or a mention is no unreviewed recommendation of the document edit.
+        :raises Conflict: If accepted recommendations share tokens with each other or with mentions.
+        """
+        if action not in (self.ACCEPT, self.REJECT):
+            raise BadRequest(f"Invalid action {action}")
+
+        recommendations = self.__mention_repository.get_shown_recommendations(
+            document_edit_id, mention_ids, tag
+        )
+        if mention_ids is not None and len(recommendations) != len(set(mention_ids)):
+            raise BadRequest("Invalid mention or recommendation already processed.")
+        recommendation_ids = [recommendation.id for recommendation in recommendations]
+
+        ids = []
+        if action == self.ACCEPT and recommendation_ids:
+            token_ids = {
+                recommendation_id: [] for recommendation_id in recommendation_ids
+            }
+            for (
+                token_mention
+            ) in self.token_mention_service.get_token_mentions_by_mention_ids(
+                recommendation_ids
+            ):
+                token_ids[token_mention.mention_id].append(token_mention.token_id)
+            ids = self.save_mentions(
+                document_edit_id,
+                [
+                    {
+                        "schema_mention_id": recommendation.schema_mention_id,
+                        "token_ids": token_ids[recommendation.id],
+                        "entity_id": recommendation.entity_id,
+                    }
+                    for recommendation in recommendations
+                ],
+            )
+
+        if recommendation_ids:
+            self.__mention_repository.update_is_shown_recommendations(
+                recommendation_ids, False
+            )
+        return {
+            "action": action,
+            "count": len(recommendation_ids),
+            "recommendation_ids": recommendation_ids,
+            "ids": ids,
+        }
+
     def get_mention_by_id(self, mention_id):
         """
         Returns mention database entry for given mention ID.
@@ -363,15 +420,77 @@ class MentionService:
     def create_recommended_mention(
         self, document_edit_id, document_recommendation_id, mention_recommendations
     ):
-        for mention_recommendation in mention_recommendations:
-            mention = self.__mention_repository.create_mention(
-                mention_recommendation["mention_schema_id"],
-                document_edit_id,
-                document_recommendation_id,
-                is_shown_recommendation=True,
+        self.save_mentions(
+            document_edit_id,
+            [
+                {
+                    "schema_mention_id": mention_recommendation["mention_schema_id"],
+                    "token_ids": mention_recommendation["token_ids"],
+                }
+                for mention_recommendation in mention_recommendations
+            ],
+            document_recommendation_id=document_recommendation_id,
+            is_shown_recommendation=True,
+        )
+
+    def save_mentions(
+        self,
+        document_edit_id,
+        mentions,
+        document_recommendation_id=None,
+        is_shown_recommendation=False,
+    ):
+        """
+        Saves mentions with their tokens in bulk, without validation.
+        All mentions are inserted at once, followed by all their token mentions.
+
+        :param document_edit_id: DocumentEdit ID of the mentions
+        :param mentions: List of dicts with schema_mention_id, token_ids and optional entity_id
+        :param document_recommendation_id: Document recommendation, if the mentions are recommendations
+        :param is_shown_recommendation: True if the mentions are unreviewed recommendations
+        :return: List of mention IDs in the order of mentions
+        """
+        mention_ids = self.__mention_repository.create_mentions(
+            [
+                {
+                    "schema_mention_id": mention["schema_mention_id"],
+                    "document_edit_id": document_edit_id,
+                    "document_recommendation_id": document_recommendation_id,
+                    "is_shown_recommendation": is_shown_recommendation,
+                    "entity_id": mention.get("entity_id"),
+                }
+                for mention in mentions
+            ]
+        )
+        self.__create_token_mentions(
+            [
+                (token_id, mention_id)
+                for mention, mention_id in zip(mentions, mention_ids)
+                for token_id in mention["token_ids"]
+            ],
+            # Only mentions which are no recommendations claim their tokens
+            document_edit_id if document_recommendation_id is None else None,
+        )
+        return mention_ids
+
+    def __create_token_mentions(self, token_mentions, document_edit_id):
+        """
+        Saves token mentions.
+        The database rejects tokens that are already part of another mention of
+        the document edit, e.g. if two requests passed the duplicate check at once.
+
+        :param token_mentions: List of (token_id, mention_id) tuples
+        :param document_edit_id: DocumentEdit ID, None for recommendations
+        :raises Conflict: If a token is already part of a mention
+        """
+        try:
+            self.token_mention_service.create_token_mentions(
+                token_mentions, document_edit_id
             )
-            for token_id in mention_recommendation["token_ids"]:
-                self.token_mention_service.create_token_mention(token_id, mention.id)
+        except IntegrityError as e:
+            if TokenMentionRepository.is_duplicate_token_error(e):
+                raise Conflict("Token already part of mention")
+            raise
 
     def verify_mention_in_document_edit_not_recommendation(
         self, mention_id, document_edit_id
@@ -447,55 +566,92 @@ class MentionService:
 
         return mention_dict
 
-    def get_actual_mentions_by_document_edit(self, document_edit_id):
-        actual_mentions = (
-            self.__mention_repository.get_actual_mentions_with_tokens_by_document_edit(
-                document_edit_id
-            )
-        )
-        return self.__map_mentions_to_f1_score_dto(actual_mentions)
+    def get_mention_references_by_edit_ids(self, document_edit_ids):
+        """
+        Fetch mentions of document edits, referencing their tokens by ID.
 
-    def get_predicted_mentions_by_document_edit(self, document_edit_id):
-        predicted_mentions = self.__mention_repository.get_predicted_mentions_with_tokens_by_document_edit(
-            document_edit_id
+        :param document_edit_ids: List of document edit IDs
+        :return: Dict mapping document edit ID -> list of mentions with id, tag,
+            entity_id and token_ids
+        """
+        rows = self.__mention_repository.get_mention_token_ids_by_edit_ids(
+            document_edit_ids
         )
-        return self.__map_mentions_to_f1_score_dto(predicted_mentions)
-
-    def __map_mentions_to_f1_score_dto(self, mentions):
-        # Create a dictionary to group tokens by mention_id
-        mentions_map = {}
+        mentions = {document_edit_id: [] for document_edit_id in document_edit_ids}
+        mention = None
+        # Rows are sorted by mention ID
+        for row in rows:
+            if mention is None or mention["id"] != row.id:
+                mention = {
+                    "id": row.id,
+                    "tag": row.tag,
+                    "entity_id": row.entity_id,
+                    "token_ids": [],
+                }
+                mentions[row.document_edit_id].append(mention)
+            mention["token_ids"].append(row.token_id)
+        return mentions
 
-        for mention in mentions:
-            mention_id = mention.mention_id
+    def get_f1_score_mentions_by_document_edit(self, document_edit_id):
+        """
+        Fetches all mentions of a document edit with one query, for F1 score calculation.
 
-            # If the mention is not already in the map, add it
-            if mention_id not in mentions_map:
-                mentions_map[mention_id] = {
-                    "tag": mention.tag,
+        :param document_edit_id: Document edit ID to query
+        :return: Dict with the actual and predicted mentions as lists of mentions with
+            tag, tokens and entity, and "by_id" mapping IDs of actual and shown
+            recommended mentions to dicts with tag, tokens and entity_id
+        """
+        rows = self.__mention_repository.get_all_mentions_with_tokens_by_document_edit(
+            document_edit_id
+        )
+        # Group tokens by mention
+        mentions = {}
+        for row in rows:
+            mention = mentions.get(row.mention_id)
+            if mention is None:
+                mention = mentions[row.mention_id] = {
+                    "tag": row.tag,
                     "tokens": [],
-                    **(
-                        {"entity": {"id": mention.entity_id}}
-                        if mention.entity_id
-                        else {"entity": {"id": 0}}
-                    ),
+                    "entity_id": row.entity_id,
+                    "is_recommendation": row.document_recommendation_id is not None,
+                    "is_shown": row.isShownRecommendation,
                 }
-
-            # Add token data to the mention's tokens list
-            if mention.token_id is not None:  # Ensure token data exists
-                mentions_map[mention_id]["tokens"].append(
+            if row.token_id is not None:  # Ensure token data exists
+                mention["tokens"].append(
                     {
-                        "id": mention.token_id,
-                        "text": mention.text,
-                        "document_index": mention.document_index,
-                        "sentence_index": mention.sentence_index,
-                        "pos_tag": mention.pos_tag,
+                        "id": row.token_id,
+                        "text": row.text,
+                        "document_index": row.document_index,
+                        "sentence_index": row.sentence_index,
+                        "pos_tag": row.pos_tag,
                     }
                 )
 
-        # Convert the dictionary to a list of mentions
-        mentions_list = list(mentions_map.values())
+        return {
+            "actual": [
+                self.__map_mention_to_f1_score_dto(mention)
+                for mention in mentions.values()
+                if not mention["is_recommendation"]
+            ],
+            "predicted": [
+                self.__map_mention_to_f1_score_dto(mention)
+                for mention in mentions.values()
+                if mention["is_recommendation"]
+            ],
+            "by_id": {
+                mention_id: mention
+                for mention_id, mention in mentions.items()
+                if not mention["is_recommendation"] or mention["is_shown"]
+            },
+        }
 
-        return mentions_list
+    @staticmethod
+    def __map_mention_to_f1_score_dto(mention):
+        return {
+            "tag": mention["tag"],
+            "tokens": mention["tokens"],
+            "entity": {"id": mention["entity_id"] or 0},
+        }
 
 
 mention_service = MentionService(
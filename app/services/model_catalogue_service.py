@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.exceptions import BadRequest
+
+from app.cache import TtlCache
+from app.clients.service_client import pipeline_client, ServiceClient
+from app.config import Config
+
+
+class ModelCatalogueService:
+    """
+    Provides the recommendation and training models offered by the pipeline.
+    The catalogue is fetched for all steps concurrently and cached.
+    """
+
+    STEPS = ["mention", "entity", "relation"]
+
+    __pipeline_client: ServiceClient
+    __catalogue_cache: TtlCache
+
+    def __init__(self, pipeline_client, catalogue_cache):
+        self.__pipeline_client = pipeline_client
+        self.__catalogue_cache = catalogue_cache
+
+    def get_recommendation_models(self):
+        """
+        Fetches the recommendation models with their settings per step.
+
+        :return: Dict of step to list of pipeline models
+        :raises BadRequest: If the pipeline does not return the models
+        """
+        return self.__get_catalogue("/steps/")
+
+    def get_train_models(self):
+        """
+        Fetches the trainable models with their settings per step.
+
+        :return: Dict of step to list of pipeline models
+        :raises BadRequest: If the pipeline does not return the models
+        """
+        return self.__get_catalogue("/train/")
+
+    def __get_catalogue(self, path):
+        app = current_app._get_current_object()
+        return self.__catalogue_cache.get(path, lambda: self.__fetch(app, path))
+
+    def __fetch(self, app, path):
+        """
+        Requests the models of all steps concurrently.
+        Runs in an app context, as it is also called from the background refresh.
+        """
+
+        def fetch_step(step):
+            with app.app_context():
+                response = self.__pipeline_client.get(path + step)
+                if response.status_code != 200:
+                    raise BadRequest("Failed to fetch models: " + response.text)
+                return response.json()
+
+        with ThreadPoolExecutor(max_workers=len(self.STEPS)) as executor:
+            return dict(zip(self.STEPS, executor.map(fetch_step, self.STEPS)))
+
+
+model_catalogue_service = ModelCatalogueService(
+    pipeline_client,
+    TtlCache(
+        "model_catalogue",
+        ttl=Config.MODEL_CATALOGUE_TTL,
+        stale_ttl=Config.MODEL_CATALOGUE_STALE_TTL,
+    ),
+)
@@ -109,6 +109,38 @@ class RelationService:
             is_shown_recommendation,
         )
 
+    def save_relations_in_edit(
+        self,
+        document_edit_id,
+        relations,
+        document_recommendation_id=None,
+        is_shown_recommendation=False,
+    ):
+        """
+        Saves relations in bulk.
+        Does not check for valid inputs.
+
+        :param document_edit_id: Document edit ID of the relations
+        :param relations: List of dicts with schema_relation_id, is_directed, mention_head_id and mention_tail_id
+        :param document_recommendation_id: Document recommendation ID of the relations
+        :param is_shown_recommendation: are relations shown recommendations
+        :return: List of relation IDs in the order of relations
+        """
+        return self.__relation_repository.create_relations(
+            [
+                {
+                    "schema_relation_id": relation["schema_relation_id"],
+                    "is_directed": relation["is_directed"],
+                    "mention_head_id": relation["mention_head_id"],
+                    "mention_tail_id": relation["mention_tail_id"],
+                    "document_edit_id": document_edit_id,
+                    "document_recommendation_id": document_recommendation_id,
+                    "is_shown_recommendation": is_shown_recommendation,
+                }
+                for relation in relations
+            ]
+        )
+
     def delete_relation_by_id(self, relation_id):
         self.relation_mention_service.delete_relation_by_id(relation_id)
 
@@ -321,6 +353,56 @@ class RelationService:
         self.__relation_repository.update_is_shown_recommendation(relation_id, False)
         return {"message": "Relation successfully rejected."}
 
+    def review_relations(self, document_edit_id, action, relation_ids=None, tag=None):
+        """
+        Accepts or rejects many relation recommendations of a document edit at once.
+        Without relation IDs and tag, all remaining recommendations are reviewed.
+        Accepted recommendations are copied with one insert, all recommendations are
+        marked as processed with one update.
+
+        :param document_edit_id: DocumentEdit ID of the recommendations.
+        :param action: "accept" or "reject"
+        :param relation_ids: Relation recommendations to review.
+        :param tag: Review the recommendations of this schema relation tag.
+        :return: recommendation_review_output_dto
+        :raises BadRequest: If the action is invalid, or a relation is no unreviewed recommendation of the document edit.
+        """
+        if action not in (MentionService.ACCEPT, MentionService.REJECT):
+            raise BadRequest(f"Invalid action {action}")
+
+        recommendations = self.__relation_repository.get_shown_recommendations(
+            document_edit_id, relation_ids, tag
+        )
+        if relation_ids is not None and len(recommendations) != len(set(relation_ids)):
+            raise BadRequest("Invalid relation or recommendation already processed.")
+        recommendation_ids = [recommendation.id for recommendation in recommendations]
+
+        ids = []
+        if action == MentionService.ACCEPT:
+            ids = self.save_relations_in_edit(
+                document_edit_id,
+                [
+                    {
+                        "schema_relation_id": recommendation.schema_relation_id,
+                        "is_directed": recommendation.isDirected,
+                        "mention_head_id": recommendation.mention_head_id,
+                        "mention_tail_id": recommendation.mention_tail_id,
+                    }
+                    for recommendation in recommendations
+                ],
+            )
+
+        if recommendation_ids:
+            self.__relation_repository.update_is_shown_recommendations(
+                recommendation_ids, False
+            )
+        return {
+            "action": action,
+            "count": len(recommendation_ids),
+            "recommendation_ids": recommendation_ids,
+            "ids": ids,
+        }
+
     def __check_duplicate_relations(self, mention_head_id, mention_tail_id):
         """
         Checks if relation containing with the same mentions already exists.
@@ -351,6 +433,28 @@ class RelationService:
             document_edit_id
         )
 
+    def get_relation_references_by_edit_ids(self, document_edit_ids):
+        """
+        Fetch relations of document edits, referencing head and tail mention by ID.
+
+        :param document_edit_ids: List of document edit IDs
+        :return: Dict mapping document edit ID -> list of relations with id, tag,
+            head_mention_id and tail_mention_id
+        """
+        relations = {document_edit_id: [] for document_edit_id in document_edit_ids}
+        for relation in self.__relation_repository.get_relations_by_edit_ids(
+            document_edit_ids
+        ):
+            relations[relation.document_edit_id].append(
+                {
+                    "id": relation.id,
+                    "tag": relation.tag,
+                    "head_mention_id": relation.mention_head_id,
+                    "tail_mention_id": relation.mention_tail_id,
+                }
+            )
+        return relations
+
     def get_document_edit_to_relation_dict(self, document_edit_ids, mention_dict):
         """
         Fetch relations by list of document edit IDs
@@ -379,21 +483,37 @@ class RelationService:
 
         return document_edit_relation_dict
 
-    def get_actual_relations_by_document_edit_id(self, document_edit_id, mentions_dict):
-        actual_relations = (
-            self.__relation_repository.get_actual_relations_by_document_edit(
-                document_edit_id
-            )
-        )
-        return self.__map_relation_to_f1_score_dto(actual_relations, mentions_dict)
+    def get_f1_score_relations_by_document_edit(self, document_edit_id, mentions_dict):
+        """
+        Fetches all relations of a document edit with one query, for F1 score calculation.
+        Relations whose head or tail mention is missing in mentions_dict are skipped.
 
-    def get_predicted_relations_by_document_edit_id(
-        self, document_edit_id, mentions_dict
-    ):
-        predicted_relation = self.__relation_repository.get_predicted_recommended_relations_by_document_edit(
+        :param document_edit_id: Document edit ID to query
+        :param mentions_dict: Dict mapping mention IDs to mentions with tag, tokens
+            and entity_id
+        :return: Dict with the actual and predicted relations
+        """
+        relations = self.__relation_repository.get_all_relations_by_document_edit(
             document_edit_id
         )
-        return self.__map_relation_to_f1_score_dto(predicted_relation, mentions_dict)
+        return {
+            "actual": self.__map_relation_to_f1_score_dto(
+                [
+                    relation
+                    for relation in relations
+                    if relation.document_recommendation_id is None
+                ],
+                mentions_dict,
+            ),
+            "predicted": self.__map_relation_to_f1_score_dto(
+                [
+                    relation
+                    for relation in relations
+                    if relation.document_recommendation_id is not None
+                ],
+                mentions_dict,
+            ),
+        }
 
     def __map_relation_to_f1_score_dto(self, relations, mentions_dict):
         transformed_relations = []
@@ -1,18 +1,23 @@
+import copy
 import random
 import re
 import typing
 
 from werkzeug.exceptions import BadRequest, Conflict
 
+from app.cache import LruCache
+from app.compiled_schema import CompiledSchema
 from app.models import Schema, SchemaMention, SchemaRelation, SchemaConstraint
 from app.repositories.schema_repository import SchemaRepository
 
 
 class SchemaService:
     __schema_repository: SchemaRepository
+    __schema_cache: LruCache
 
-    def __init__(self, schema_repository):
+    def __init__(self, schema_repository, schema_cache):
         self.__schema_repository = schema_repository
+        self.__schema_cache = schema_cache
 
     def get_schema_by_id(self, schema_id):
         """
@@ -38,28 +43,100 @@ class SchemaService:
             raise BadRequest("Project not found")
         return self._build_schema(schema)
 
+    def get_compiled_schema_by_project_id(self, project_id):
+        """
+        Fetches schema of project with lookup tables for tags and constraints
+        :param project_id: Project ID to query
+        :return: CompiledSchema
+        :raises BadRequest: If schema not found
+        """
+        return CompiledSchema(self.get_schema_by_project_id(project_id))
+
     def _build_schema(self, schema):
         """
         Maps schema database entry to schema output dto.
-        Queries components associated with schema.
+        Components associated with schema are taken from the schema cache.
         :param schema: Schema database object
         :return: schema_output_dto
         """
-        constraints = self.__schema_repository.get_schema_constraints_by_schema(
-            schema.id
-        )
-        mentions = self.__schema_repository.get_schema_mentions_by_schema(schema.id)
-        relations = self.__schema_repository.get_schema_relations_by_schema(schema.id)
-        models = self.get_models_by_schema(schema.id)
-        return {
-            "id": schema.id,
-            "name": schema.name,
-            "is_fixed": schema.isFixed,
-            "modellingLanguage": schema.modelling_language,
-            "team_id": schema.team_id,
-            "team_name": schema.team_name,
-            "models": models,
-            "schema_mentions": [
+        return self._build_schemas([schema])[0]
+
+    def _build_schemas(self, schemas):
+        """
+        Maps schema database entries to schema output dtos.
+        Components of all schemas missing in the schema cache are queried together,
+        with one query per component table.
+        :param schemas: Schema database objects
+        :return: List of schema_output_dto
+        """
+        components = self.__get_schema_components(schemas)
+        return [
+            {
+                "id": schema.id,
+                "name": schema.name,
+                "is_fixed": schema.isFixed,
+                "modellingLanguage": schema.modelling_language,
+                "team_id": schema.team_id,
+                "team_name": schema.team_name,
+                **components[schema.id],
+            }
+            for schema in schemas
+        ]
+
+    def __get_schema_components(self, schemas):
+        """
+        Fetches components of schemas from the schema cache.
+        Cached components are only used if they were built from the current schema version.
+        Schemas modified in the current transaction are neither read from nor written to the cache,
+        as the transaction might still be rolled back.
+        :param schemas: Schema database objects
+        :return: Components of schema_output_dto by schema ID
+        """
+        components = {}
+        missing_schemas = []
+        for schema in schemas:
+            if self.__schema_repository.is_schema_modified(schema.id):
+                missing_schemas.append(schema)
+                continue
+            cached = self.__schema_cache.get(schema.id)
+            if cached is not None and cached[0] == schema.version:
+                components[schema.id] = copy.deepcopy(cached[1])
+            else:
+                missing_schemas.append(schema)
+
+        if missing_schemas:
+            queried = self.__query_schema_components(
+                [schema.id for schema in missing_schemas]
+            )
+            for schema in missing_schemas:
+                if not self.__schema_repository.is_schema_modified(schema.id):
+                    self.__schema_cache.put(
+                        schema.id, (schema.version, queried[schema.id])
+                    )
+                components[schema.id] = copy.deepcopy(queried[schema.id])
+        return components
+
+    def __query_schema_components(self, schema_ids):
+        """
+        Queries components associated with schemas, one query per component table.
+        :param schema_ids: Schema IDs
+        :return: Components of schema_output_dto by schema ID
+        """
+        components = {
+            schema_id: {
+                "models": [],
+                "schema_mentions": [],
+                "schema_relations": [],
+                "schema_constraints": [],
+            }
+            for schema_id in schema_ids
+        }
+        for model in self.__schema_repository.get_models_by_schemas(schema_ids):
+            components[model.schema_id]["models"].append(self.__map_model(model))
+        for mention in self.__schema_repository.get_schema_mentions_by_schemas(
+            schema_ids
+        ):
+            components[mention.schema_id]["schema_mentions"].append(
                 {
                     "id": mention.id,
                     "tag": mention.tag,
@@ -67,17 +144,21 @@ class SchemaService:
                     "color": mention.color,
                     "entityPossible": mention.entityPossible,
                 }
-                for mention in mentions
-            ],
-            "schema_relations": [
+            )
+        for relation in self.__schema_repository.get_schema_relations_by_schemas(
+            schema_ids
+        ):
+            components[relation.schema_id]["schema_relations"].append(
                 {
                     "id": relation.id,
                     "tag": relation.tag,
                     "description": relation.description,
                 }
-                for relation in relations
-            ],
-            "schema_constraints": [
+            )
+        for constraint in self.__schema_repository.get_schema_constraints_by_schemas(
+            schema_ids
+        ):
+            components[constraint.schema_id]["schema_constraints"].append(
                 {
                     "id": constraint.id,
                     "is_directed": constraint.isDirected,
@@ -101,9 +182,8 @@ class SchemaService:
                         "entityPossible": constraint.mention_tail_entityPossible,
                     },
                 }
-                for constraint in constraints
-            ],
-        }
+            )
+        return components
 
     def get_schemas_by_user(self, user_id):
         """
@@ -111,10 +191,8 @@ class SchemaService:
         :param user_id: User ID to query
         :return: schema_output_list_dto
         """
-        schemas = self.__schema_repository.get_schema_ids_by_user(user_id)
-        if schemas is None:
-            return {"schemas": []}
-        return {"schemas": [self.get_schema_by_id(schema.id) for schema in schemas]}
+        schemas = self.__schema_repository.get_schemas_by_user(user_id)
+        return {"schemas": self._build_schemas(schemas)}
 
     def __create_schema(self, modelling_language_id, team_id, name) -> Schema:
         """
@@ -203,35 +281,18 @@ class SchemaService:
     ) -> any:
         """
         Verifies that a relation conforms to a schema constraint.
-        :param schema: schema_output_dto
+        :param schema: schema_output_dto or CompiledSchema, which should be passed
+            when verifying many relations
         :param schema_relation_id: Schema relation ID of the relation
         :param head_schema_mention_id: Schema mention ID of head mention
         :param tail_schema_mention_id: Schema mention ID of tail mention
         :return: Constraint that matches relation
         :raises BadRequest: If no constraint matches
         """
-        constraint = next(
-            (
-                constraint
-                for constraint in schema["schema_constraints"]
-                if constraint["schema_relation"]["id"] == schema_relation_id
-                and (
-                    (
-                        constraint["schema_mention_head"]["id"]
-                        == head_schema_mention_id
-                        and constraint["schema_mention_tail"]["id"]
-                        == tail_schema_mention_id
-                    )
-                    or (
-                        constraint["schema_mention_tail"]["id"]
-                        == head_schema_mention_id
-                        and constraint["schema_mention_head"]["id"]
-                        == tail_schema_mention_id
-                        and constraint["is_directed"] == False
-                    )
-                )
-            ),
-            None,
+        if not isinstance(schema, CompiledSchema):
+            schema = CompiledSchema(schema)
+        constraint = schema.constraint(
+            schema_relation_id, head_schema_mention_id, tail_schema_mention_id
         )
         if constraint is None:
             raise BadRequest(
@@ -324,6 +385,15 @@ class SchemaService:
         return self.get_schema_by_id(created_schema.id)
 
     def create_schema_components(self, schema, schema_id):
+        """
+        Creates mentions, relations and constraints of a schema.
+
+        :param schema: schema_input_dto
+        :param schema_id: Schema ID to create components for
+        :raises Conflict: If duplicate mention tags, relation tags or constraints detected
+        :raises BadRequest: If no matching constraint found
+        """
+        self.__invalidate_schema(schema_id)
         if self.__has_duplicates(schema["schema_mentions"], key="tag"):
             raise Conflict("Duplicate tags found in schema mentions.")
         if self.__has_duplicates(schema["schema_relations"], key="tag"):
@@ -431,18 +501,19 @@ class SchemaService:
         :return: schema_model_dto
         """
         models = self.__schema_repository.get_models_by_schema(schema_id)
-        return [
-            {
-                "id": model.id,
-                "name": model.model_name,
-                "type": model.model_type,
-                "step": {
-                    "id": model.model_step_id,
-                    "type": model.model_step_name,
-                },
-            }
-            for model in models
-        ]
+        return [self.__map_model(model) for model in models]
+
+    @staticmethod
+    def __map_model(model):
+        return {
+            "id": model.id,
+            "name": model.model_name,
+            "type": model.model_type,
+            "step": {
+                "id": model.model_step_id,
+                "type": model.model_step_name,
+            },
+        }
 
     def get_schema_mentions_by_schema(self, schema_id):
         schema_mentions = self.__schema_repository.get_schema_mentions_by_schema(
@@ -480,6 +551,7 @@ class SchemaService:
         return self.get_schema_by_id(schema_id)
 
     def delete_schema_components(self, schema_id):
+        self.__invalidate_schema(schema_id)
         self.__schema_repository.delete_all_constraints(schema_id)
         self.__schema_repository.delete_all_relations(schema_id)
         self.__schema_repository.delete_all_mentions(schema_id)
@@ -519,6 +591,7 @@ class SchemaService:
         :return: Newly created recommendation model database object
         :raises BadRequest: If step name is not allowed
         """
+        self.__invalidate_schema(schema_id)
         db_steps = self.__schema_repository.get_model_steps()
         step_dict = {}
         for db_step in db_steps:
@@ -539,5 +612,14 @@ class SchemaService:
             models.append(model)
         return models
 
+    def __invalidate_schema(self, schema_id):
+        """
+        Invalidates cached components of a schema before it is modified.
+
+        :param schema_id: Schema ID
+        """
+        self.__schema_repository.increment_schema_version(schema_id)
+        self.__schema_cache.invalidate(schema_id)
+
 
-schema_service = SchemaService(SchemaRepository())
+schema_service = SchemaService(SchemaRepository(), LruCache("schemas", maxsize=256))
@@ -1,17 +1,20 @@
-import json
-import requests
 from werkzeug.exceptions import BadRequest, Forbidden
-from flask import current_app
 
+from app.cache import LruCache
+from app.clients.service_client import pipeline_client
+from app.config import Config
 from app.models import Token
 from app.repositories.token_repository import TokenRepository
+from app.token_bundle import TokenBundle
 
 
 class TokenService:
     __token_repository: TokenRepository
+    __token_cache: LruCache
 
-    def __init__(self, token_repository):
+    def __init__(self, token_repository, token_cache):
         self.__token_repository = token_repository
+        self.__token_cache = token_cache
 
     def tokenize_document(self, doc_id, content):
         """
@@ -22,23 +25,14 @@ class TokenService:
         :return: Token dict
         :raises BadRequest: If tokenization failed
         """
-        url = current_app.config.get("PIPELINE_URL") + "/steps/tokenize"
-        request_data = json.dumps({"content": content, "document_id": str(doc_id)})
-        response = requests.post(
-            url=url,
-            data=request_data,
-            headers={"Content-Type": "application/json"},
+        response = pipeline_client.post(
+            "/steps/tokenize", json={"content": content, "document_id": str(doc_id)}
         )
         tokens = response.json()
+        if not isinstance(tokens, list):
+            raise BadRequest("Tokenization failed")
         try:
-            for token in tokens:
-                self.save_token(
-                    token["text"],
-                    token["document_index"],
-                    token["pos_tag"],
-                    token["sentence_index"],
-                    doc_id,
-                )
+            self.save_tokens(tokens, doc_id)
         except:
             raise BadRequest("Tokenization failed")
         return {"tokens": tokens}
@@ -56,6 +50,7 @@ class TokenService:
         :param doc_id: document ID
         :return: token database object
         """
+        self.__token_cache.invalidate(doc_id)
         return self.__token_repository.create_token(
             text,
             document_index,
@@ -64,6 +59,17 @@ class TokenService:
             doc_id,
         )
 
+    def save_tokens(self, tokens, doc_id):
+        """
+        Saves all tokens of a document in bulk, without validation
+
+        :param tokens: List of token dicts with text, document_index, pos_tag and sentence_index
+        :param doc_id: document ID
+        :return: List of token IDs in the order of tokens
+        """
+        self.__token_cache.invalidate(doc_id)
+        return self.__token_repository.create_tokens(tokens, doc_id)
+
     def get_tokens_by_document(self, document_id):
         """
         Fetches all tokens for a document
@@ -71,21 +77,55 @@ class TokenService:
         :param document_id: Document ID to query tokens
         :return: token_output_list_dto
         """
-        tokens = self.__token_repository.get_tokens_by_document(document_id)
-        if tokens is None:
-            return {"tokens": []}
-        return {
-            "tokens": [
-                {
-                    "id": token.id,
-                    "text": token.text,
-                    "document_index": token.document_index,
-                    "sentence_index": token.sentence_index,
-                    "pos_tag": token.pos_tag,
-                }
-                for token in tokens
-            ]
-        }
+        return {"tokens": self.get_token_bundle(document_id).to_dicts()}
+
+    def get_token_bundle(self, document_id):
+        """
+        Fetches the tokens of a document in compact form
+
+        :param document_id: Document ID to query tokens
+        :return: TokenBundle
+        """
+        return self.get_token_bundles([document_id])[document_id]
+
+    def get_token_bundles(self, document_ids):
+        """
+        Fetches the tokens of documents in compact form.
+        Tokens do not change after tokenization, so bundles are cached per document.
+        Documents not cached are loaded with one query.
+
+        :param document_ids: Document IDs to query tokens
+        :return: Dict of document ID to TokenBundle
+        """
+        bundles = {}
+        missing_ids = []
+        for document_id in dict.fromkeys(document_ids):
+            bundle = None
+            if not self.__token_repository.is_tokenized_in_session(document_id):
+                bundle = self.__token_cache.get(document_id)
+            if bundle is None:
+                missing_ids.append(document_id)
+            else:
+                bundles[document_id] = bundle
+
+        if missing_ids:
+            rows_by_document = {document_id: [] for document_id in missing_ids}
+            for row in self.__token_repository.get_token_columns_by_documents(
+                missing_ids
+            ):
+                rows_by_document[row.document_id].append(row)
+            for document_id, rows in rows_by_document.items():
+                bundle = TokenBundle(rows)
+                # Documents without tokens may not be tokenized yet,
+                # uncommitted tokens may still be rolled back
+                if len(
+                    bundle
+                ) > 0 and not self.__token_repository.is_tokenized_in_session(
+                    document_id
+                ):
+                    self.__token_cache.put(document_id, bundle)
+                bundles[document_id] = bundle
+        return bundles
 
     def get_tokens_by_mention(self, mention_id):
         """
@@ -118,13 +158,30 @@ class TokenService:
         :param document_edit_id: Document edit ID to check
         :raises Forbidden: If at least one token is not part of the document
         """
-        document_tokens = self.__token_repository.get_tokens_by_document_edit(
-            document_edit_id
+        token_ids = set(token_ids)
+        if not token_ids:
+            return
+        count = self.__token_repository.count_tokens_in_document_edit(
+            document_edit_id, token_ids
         )
-        document_token_ids = [document_token.id for document_token in document_tokens]
-        for token_id in token_ids:
-            if token_id not in document_token_ids:
-                raise Forbidden("Tokens do not belong to this document.")
+        if count != len(token_ids):
+            raise Forbidden("Tokens do not belong to this document.")
+
+    def check_tokens_in_document(self, token_ids, document_id):
+        """
+        Checks with one query that tokens are part of a document.
+        Pass the tokens of all mentions of a document at once.
+
+        :param token_ids: Token IDs to check, may contain duplicates
+        :param document_id: Document ID to check
+        :raises Forbidden: If at least one token is not part of the document
+        """
+        token_ids = set(token_ids)
+        if not token_ids:
+            return
+        count = self.__token_repository.count_tokens_in_document(document_id, token_ids)
+        if count != len(token_ids):
+            raise Forbidden("Tokens do not belong to this document.")
 
     def get_tokens_by_document_ids(self, document_ids):
         """
@@ -133,21 +190,12 @@ class TokenService:
         :param document_ids: List of document IDs
         :return: Token dict containing tokens by document ID
         """
-        tokens = self.__token_repository.get_tokens_by_document_ids(document_ids)
-        document_tokens_dict = {document_id: [] for document_id in document_ids}
-
-        for token in tokens:
-            document_tokens_dict[token.document_id].append(
-                {
-                    "text": token.text,
-                    "document_index": token.document_index,
-                    "pos_tag": token.pos_tag,
-                    "sentence_index": token.sentence_index,
-                    "id": token.id,
-                }
-            )
-
-        return document_tokens_dict
+        return {
+            document_id: bundle.to_dicts()
+            for document_id, bundle in self.get_token_bundles(document_ids).items()
+        }
 
 
-token_service = TokenService(TokenRepository())
+token_service = TokenService(
+    TokenRepository(), LruCache("tokens", maxsize=Config.TOKEN_CACHE_SIZE)
+)
@@ -1,21 +1,42 @@
-import requests
+import itertools
+import time
+
 from flask import current_app
 from werkzeug.exceptions import BadRequest
 
+from app.clients.service_client import pipeline_client
+from app.config import Config
+from app.json_stream import gzip_ndjson
 from app.services.document_edit_service import (
     DocumentEditService,
     document_edit_service,
 )
+from app.services.job_service import JobService, job_service
 from app.services.schema_service import SchemaService, schema_service
 
 
 class TrainService:
+    TRAINING_JOB = "model_training"
+    PIPELINE_STEPS = {
+        "MENTIONS": "mention",
+        "ENTITIES": "entity",
+        "RELATIONS": "relation",
+    }
+
     schema_service: SchemaService
     document_edit_service: DocumentEditService
+    job_service: JobService
 
-    def __init__(self, schema_service, document_edit_service):
+    def __init__(self, schema_service, document_edit_service, job_service):
         self.schema_service = schema_service
         self.document_edit_service = document_edit_service
+        self.job_service = job_service
+        self.job_service.register(
+            self.TRAINING_JOB,
+            lambda payload, report_progress: self.run_training_job(
+                report_progress=report_progress, **payload
+            ),
+        )
 
     def train_model_for_schema(
         self, schema_id, model_name, model_type, step, document_edits, settings
@@ -33,13 +54,136 @@ class TrainService:
         :return: model_train_output_list_dto
         :raises BadRequest: If model name already exists or training failed
         """
+        self.__check_model(model_name, step)
+        train_response = self.__send_training_data(
+            schema_id, model_name, model_type, step, document_edits, settings
+        )
+        if train_response.status_code != 200:
+            raise BadRequest("Failed to train model: " + train_response.text)
+
+        return self.__add_model(schema_id, model_name, model_type, step)
+
+    def submit_training_job(
+        self, schema_id, model_name, model_type, step, document_edits, settings, user_id
+    ):
+        """
+        Starts training a recommendation model for given schema id in the background.
+        The model is stored in the database once training finished, the job result
+        is a model_train_output_list_dto.
+
+        :param schema_id: Schema ID to train model for
+        :param model_name: Name of the model
+        :param model_type: Type of the model
+        :param step: Step for which model can be used
+        :param document_edits: Document edit IDs to use as training input
+        :param settings: Settings for model training
+        :param user_id: User starting the training
+        :return: Job database object
+        :raises BadRequest: If model name already exists or a document edit does not
+            belong to the schema
+        :raises Conflict: If too many models of the schema are trained at once
+        """
+        self.__check_model(model_name, step)
+        document_edits = sorted(set(document_edits))
+        self.document_edit_service.check_document_edits_in_schema(
+            document_edits, schema_id
+        )
+        # Training creates a model in the pipeline, so a failed job is not retried
+        return self.job_service.enqueue(
+            self.TRAINING_JOB,
+            {
+                "schema_id": schema_id,
+                "model_name": model_name,
+                "model_type": model_type,
+                "step": step,
+                "document_edits": document_edits,
+                "settings": settings,
+            },
+            user_id,
+            max_attempts=1,
+            concurrency_key=self.__concurrency_key(schema_id),
+            concurrency_limit=current_app.config.get(
+                "TRAIN_JOBS_PER_SCHEMA", Config.TRAIN_JOBS_PER_SCHEMA
+            ),
+        )
+
+    def get_training_jobs(self, schema_id):
+        """
+        Fetch the most recent training jobs of a schema.
+
+        :param schema_id: Schema ID to query
+        :return: job_output_list_dto
+        """
+        return self.job_service.get_jobs_by_concurrency_key(
+            self.__concurrency_key(schema_id)
+        )
+
+    def run_training_job(
+        self,
+        schema_id,
+        model_name,
+        model_type,
+        step,
+        document_edits,
+        settings,
+        report_progress,
+    ):
+        """
+        Sends the training data to the pipeline, waits for training to finish
+        and stores the model. Pipelines training asynchronously answer with
+        202 and the ID of the training, which is polled until it finished.
+        Progress is reported while polling, which stops a cancelled job.
+
+        :return: model_train_output_list_dto
+        :raises BadRequest: If training failed
+        :raises JobCancelled: If the job was cancelled
+        """
+        train_response = self.__send_training_data(
+            schema_id, model_name, model_type, step, document_edits, settings
+        )
+        # No transaction is held open while the pipeline trains
+        self.job_service.checkpoint()
+        report_progress(10)
+
+        if train_response.status_code == 202:
+            self.__wait_for_training(train_response.json()["id"], report_progress)
+        elif train_response.status_code != 200:
+            raise BadRequest("Failed to train model: " + train_response.text)
+
+        # Another model may have taken the name meanwhile
+        self.__check_model(model_name, step)
+        return self.__add_model(schema_id, model_name, model_type, step)
+
+    def __wait_for_training(self, training_id, report_progress):
+        poll_interval = current_app.config.get(
+            "TRAIN_POLL_INTERVAL", Config.TRAIN_POLL_INTERVAL
+        )
+        while True:
+            time.sleep(poll_interval)
+            response = pipeline_client.get(f"/train/jobs/{training_id}")
+            if response.status_code != 200:
+                raise BadRequest("Failed to fetch training status: " + response.text)
+            status = response.json()
+            if status["status"] == "SUCCEEDED":
+                return
+            if status["status"] == "FAILED":
+                raise BadRequest(
+                    "Failed to train model: " + str(status.get("error", ""))
+                )
+            # Sending the data was the first 10 percent, 100 is reached once stored
+            report_progress(10 + int((status.get("progress") or 0) * 0.89))
+
+    def __check_model(self, model_name, step):
         duplicate = self.schema_service.get_model_by_name(model_name)
         if duplicate is not None:
             raise BadRequest("Model Name already exists")
 
-        if step not in ["MENTIONS", "ENTITIES", "RELATIONS"]:
+        if step not in self.PIPELINE_STEPS:
             raise BadRequest("Step must be mention, entity or relation")
 
+    def __send_training_data(
+        self, schema_id, model_name, model_type, step, document_edits, settings
+    ):
         # Query parameter for training endpoint
         params = {}
         for setting in settings:
@@ -48,35 +192,35 @@ class TrainService:
         params["name"] = model_name
 
         schema = self.schema_service.get_schema_by_id(schema_id)
+        path = "/train/" + self.PIPELINE_STEPS[step]
 
+        # Training creates a new model, so the request must not be retried
+        if current_app.config.get("TRAIN_STREAM_EXPORT", Config.TRAIN_STREAM_EXPORT):
+            # The first line holds the schema, every further line one document edit
+            documents = (
+                self.document_edit_service.export_document_edits_for_schema_training(
+                    document_edits, schema_id
+                )
+            )
+            return pipeline_client.post_stream(
+                path,
+                gzip_ndjson(itertools.chain([{"schema": schema}], documents)),
+                "application/x-ndjson",
+                params=params,
+            )
         document_edits = (
             self.document_edit_service.get_document_edits_for_schema_training(
                 document_edits, schema_id
             )
         )
-
-        request_body = {
-            "schema": schema,
-            "documents": document_edits,
-        }
-        pipeline_step_mapping = {
-            "MENTIONS": "mention",
-            "ENTITIES": "entity",
-            "RELATIONS": "relation",
-        }
-        url = (
-            current_app.config.get("PIPELINE_URL")
-            + "/train/"
-            + pipeline_step_mapping[step]
-        )
-        headers = {"Content-Type": "application/json"}
-
-        train_response = requests.post(
-            url=url, headers=headers, params=params, json=request_body
+        return pipeline_client.post(
+            path,
+            params=params,
+            json={"schema": schema, "documents": document_edits},
+            idempotent=False,
         )
-        if train_response.status_code != 200:
-            raise BadRequest("Failed to train model: " + train_response.text)
 
+    def __add_model(self, schema_id, model_name, model_type, step):
         # Store model in database
         models = self.schema_service.add_model_to_schema(
             schema_id, model_name, model_type, [step]
@@ -97,5 +241,9 @@ class TrainService:
             ]
         }
 
+    @staticmethod
+    def __concurrency_key(schema_id):
+        return f"training:{schema_id}"
+
 
-train_service = TrainService(schema_service, document_edit_service)
+train_service = TrainService(schema_service, document_edit_service, job_service)
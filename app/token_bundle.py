@@ -0,0 +1,87 @@
+from array import array
+
+from app.token_index import TokenIndex
+
+
+class TokenBundle:
+    """
+    Compact, immutable representation of the tokens of one document.
+
+    Tokens are stored column-wise in parallel arrays of ids, document and sentence
+    indices, sorted by document index. Texts and POS tags are stored as codes into
+    tables of their distinct values. Token dicts are only built when requested.
+    """
+
+    def __init__(self, rows):
+        """
+        :param rows: Rows with id, document_index, sentence_index, text and pos_tag,
+            sorted by document_index
+        """
+        self.ids = array("q")
+        self.document_indices = array("q")
+        self.sentence_indices = array("q")
+        self.__text_codes = array("l")
+        self.__pos_tag_codes = array("l")
+        texts = {}
+        pos_tags = {}
+        for row in rows:
+            self.ids.append(row.id)
+            self.document_indices.append(row.document_index)
+            self.sentence_indices.append(row.sentence_index)
+            self.__text_codes.append(texts.setdefault(row.text, len(texts)))
+            self.__pos_tag_codes.append(pos_tags.setdefault(row.pos_tag, len(pos_tags)))
+        self.__texts = tuple(texts)
+        self.__pos_tags = tuple(pos_tags)
+        self.__index = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def index(self):
+        """
+        TokenIndex resolving spans of document indices to token IDs, built on first use.
+        """
+        if self.__index is None:
+            self.__index = TokenIndex.from_columns(self.document_indices, self.ids)
+        return self.__index
+
+    def to_dicts(self):
+        """
+        Builds new token dicts, as used in token_output_dto.
+
+        :return: List of token dicts sorted by document index
+        """
+        texts = self.__texts
+        pos_tags = self.__pos_tags
+        return [
+            {
+                "id": token_id,
+                "text": texts[text_code],
+                "document_index": document_index,
+                "sentence_index": sentence_index,
+                "pos_tag": pos_tags[pos_tag_code],
+            }
+            for token_id, document_index, sentence_index, text_code, pos_tag_code in zip(
+                self.ids,
+                self.document_indices,
+                self.sentence_indices,
+                self.__text_codes,
+                self.__pos_tag_codes,
+            )
+        ]
+
+    def to_columns(self):
+        """
+        Builds the tokens column-wise, without one dict per token.
+
+        :return: Dict of equally long lists with id, text, document_index,
+            sentence_index and pos_tag, sorted by document index
+        """
+        return {
+            "id": list(self.ids),
+            "text": [self.__texts[code] for code in self.__text_codes],
+            "document_index": list(self.document_indices),
+            "sentence_index": list(self.sentence_indices),
+            "pos_tag": [self.__pos_tags[code] for code in self.__pos_tag_codes],
+        }
@@ -0,0 +1,56 @@
+from bisect import bisect_left, bisect_right
+
+
+class TokenIndex:
+    """
+    Tokens of a document sorted by document index.
+    Resolves a span of document indices to its tokens by binary search,
+    instead of scanning all tokens for every span.
+    """
+
+    def __init__(self, tokens):
+        """
+        :param tokens: Token dicts with id and document_index
+        """
+        tokens = sorted(tokens, key=lambda token: token["document_index"])
+        self.__document_indices = [token["document_index"] for token in tokens]
+        self.__token_ids = [token["id"] for token in tokens]
+
+    @classmethod
+    def from_columns(cls, document_indices, token_ids):
+        """
+        Creates the index from parallel sequences, already sorted by document index.
+
+        :param document_indices: Document indices of the tokens, ascending
+        :param token_ids: Token IDs in the same order
+        """
+        index = cls.__new__(cls)
+        index.__document_indices = document_indices
+        index.__token_ids = token_ids
+        return index
+
+    def __len__(self):
+        return len(self.__token_ids)
+
+    def bounds(self, start, end):
+        """
+        Positions of the first and behind the last token of a span.
+
+        :param start: First document index of the span
+        :param end: Last document index of the span, inclusive
+        :return: Tuple of start and stop position, equal if the span has no tokens
+        """
+        low = bisect_left(self.__document_indices, start)
+        high = bisect_right(self.__document_indices, end, lo=low)
+        return low, high
+
+    def token_ids(self, start, end):
+        """
+        IDs of the tokens whose document index is between start and end, inclusive.
+
+        :param start: First document index of the span
+        :param end: Last document index of the span, inclusive
+        :return: List of token IDs sorted by document index
+        """
+        low, high = self.bounds(start, end)
+        return list(self.__token_ids[low:high])
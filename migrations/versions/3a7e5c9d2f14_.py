@@ -0,0 +1,29 @@
+"""add schema version
+
+Revision ID: 3a7e5c9d2f14
+Revises: 8f3c2a1d9b47
+Create Date: 2026-10-18 11:04:27.530912
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3a7e5c9d2f14"
+down_revision = "8f3c2a1d9b47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("Schema", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), server_default="1", nullable=False)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("Schema", schema=None) as batch_op:
+        batch_op.drop_column("version")
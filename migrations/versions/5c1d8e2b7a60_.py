@@ -0,0 +1,52 @@
+"""add job table
+
+Revision ID: 5c1d8e2b7a60
+Revises: 3a7e5c9d2f14
+Create Date: 2026-10-18 13:21:09.662143
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5c1d8e2b7a60"
+down_revision = "3a7e5c9d2f14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "Job",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["User.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_Job_user_id", "Job", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_Job_user_id", table_name="Job")
+    op.drop_table("Job")
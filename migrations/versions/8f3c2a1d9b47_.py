@@ -0,0 +1,97 @@
+"""add indexes for annotation lookups
+
+Revision ID: 8f3c2a1d9b47
+Revises: 161b855778b7
+Create Date: 2026-10-18 09:12:41.118305
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8f3c2a1d9b47"
+down_revision = "161b855778b7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_UserTeam_user_id_team_id", "UserTeam", ["user_id", "team_id"])
+    op.create_index("ix_SchemaMention_schema_id", "SchemaMention", ["schema_id"])
+    op.create_index("ix_SchemaRelation_schema_id", "SchemaRelation", ["schema_id"])
+    op.create_index(
+        "ix_SchemaConstraint_schema_relation_id",
+        "SchemaConstraint",
+        ["schema_relation_id"],
+    )
+    op.create_index(
+        "ix_Document_project_id_active",
+        "Document",
+        ["project_id"],
+        postgresql_where=sa.text("active = true"),
+    )
+    op.create_index(
+        "ix_DocumentEdit_document_id_user_id_active",
+        "DocumentEdit",
+        ["document_id", "user_id"],
+        postgresql_where=sa.text("active = true"),
+    )
+    op.create_index("ix_DocumentEdit_user_id", "DocumentEdit", ["user_id"])
+    op.create_index("ix_DocumentEdit_schema_id", "DocumentEdit", ["schema_id"])
+    op.create_index(
+        "ix_Token_document_id_document_index",
+        "Token",
+        ["document_id", "document_index"],
+    )
+    op.create_index(
+        "ix_Mention_document_edit_id_document_recommendation_id",
+        "Mention",
+        ["document_edit_id", "document_recommendation_id"],
+    )
+    op.create_index("ix_Mention_entity_id", "Mention", ["entity_id"])
+    op.create_index("ix_TokenMention_mention_id", "TokenMention", ["mention_id"])
+    op.create_index("ix_TokenMention_token_id", "TokenMention", ["token_id"])
+    op.create_index("ix_Entity_document_edit_id", "Entity", ["document_edit_id"])
+    op.create_index(
+        "ix_Relation_document_edit_id_document_recommendation_id",
+        "Relation",
+        ["document_edit_id", "document_recommendation_id"],
+    )
+    op.create_index(
+        "ix_Relation_mention_head_id_mention_tail_id",
+        "Relation",
+        ["mention_head_id", "mention_tail_id"],
+    )
+    op.create_index("ix_Relation_mention_tail_id", "Relation", ["mention_tail_id"])
+
+
+def downgrade():
+    op.drop_index("ix_Relation_mention_tail_id", table_name="Relation")
+    op.drop_index("ix_Relation_mention_head_id_mention_tail_id", table_name="Relation")
+    op.drop_index(
+        "ix_Relation_document_edit_id_document_recommendation_id",
+        table_name="Relation",
+    )
+    op.drop_index("ix_Entity_document_edit_id", table_name="Entity")
+    op.drop_index("ix_TokenMention_token_id", table_name="TokenMention")
+    op.drop_index("ix_TokenMention_mention_id", table_name="TokenMention")
+    op.drop_index("ix_Mention_entity_id", table_name="Mention")
+    op.drop_index(
+        "ix_Mention_document_edit_id_document_recommendation_id",
+        table_name="Mention",
+    )
+    op.drop_index("ix_Token_document_id_document_index", table_name="Token")
+    op.drop_index("ix_DocumentEdit_schema_id", table_name="DocumentEdit")
+    op.drop_index("ix_DocumentEdit_user_id", table_name="DocumentEdit")
+    op.drop_index(
+        "ix_DocumentEdit_document_id_user_id_active", table_name="DocumentEdit"
+    )
+    op.drop_index("ix_Document_project_id_active", table_name="Document")
+    op.drop_index(
+        "ix_SchemaConstraint_schema_relation_id", table_name="SchemaConstraint"
+    )
+    op.drop_index("ix_SchemaRelation_schema_id", table_name="SchemaRelation")
+    op.drop_index("ix_SchemaMention_schema_id", table_name="SchemaMention")
+    op.drop_index("ix_UserTeam_user_id_team_id", table_name="UserTeam")
@@ -0,0 +1,45 @@
+"""add generating document edit state
+
+Revision ID: 9d4b6f1e3c82
+Revises: 5c1d8e2b7a60
+Create Date: 2026-10-18 15:02:47.318204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d4b6f1e3c82"
+down_revision = "5c1d8e2b7a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.bulk_insert(
+        sa.table(
+            "DocumentEditState",
+            sa.column("id", sa.Integer),
+            sa.column("type", sa.String),
+        ),
+        [
+            {"id": 7, "type": "GENERATING"},
+        ],
+    )
+
+
+def downgrade():
+    # Document edits still generating recommendations fall back to MENTIONS
+    op.execute(
+        """
+        update "DocumentEdit" set state_id = (
+            select id from "DocumentEditState" where type = 'MENTIONS'
+        )
+        where state_id = (
+            select id from "DocumentEditState" where type = 'GENERATING'
+        )
+        """
+    )
+    op.execute("""delete from "DocumentEditState" where type = 'GENERATING'""")
@@ -0,0 +1,64 @@
+"""add document edit to token mentions for duplicate checks
+
+Revision ID: b7e2d94f0a13
+Revises: 9d4b6f1e3c82
+Create Date: 2026-10-18 17:41:09.562831
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e2d94f0a13"
+down_revision = "9d4b6f1e3c82"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("TokenMention", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("document_edit_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "TokenMention_document_edit_id_fkey",
+            "DocumentEdit",
+            ["document_edit_id"],
+            ["id"],
+        )
+
+    # Accepted recommendations were copied without a duplicate check,
+    # so only the first mention of a token keeps its claim on the token
+    op.execute(
+        """
+        update "TokenMention" set document_edit_id = first.document_edit_id
+        from (
+            select distinct on (m.document_edit_id, tm.token_id)
+                tm.id, m.document_edit_id
+            from "TokenMention" tm
+            join "Mention" m on m.id = tm.mention_id
+            where m.document_recommendation_id is null
+            order by m.document_edit_id, tm.token_id, tm.id
+        ) as first
+        where "TokenMention".id = first.id
+        """
+    )
+
+    op.create_index(
+        "ix_TokenMention_document_edit_id_token_id",
+        "TokenMention",
+        ["document_edit_id", "token_id"],
+        unique=True,
+        postgresql_where=sa.text("document_edit_id IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_TokenMention_document_edit_id_token_id", table_name="TokenMention"
+    )
+    with op.batch_alter_table("TokenMention", schema=None) as batch_op:
+        batch_op.drop_constraint(
+            "TokenMention_document_edit_id_fkey", type_="foreignkey"
+        )
+        batch_op.drop_column("document_edit_id")
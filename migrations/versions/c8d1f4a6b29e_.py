@@ -0,0 +1,33 @@
+"""add heartbeat to jobs
+
+Revision ID: c8d1f4a6b29e
+Revises: f2a7d3c9e564
+Create Date: 2026-10-18 21:04:52.318760
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c8d1f4a6b29e"
+down_revision = "f2a7d3c9e564"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("Job", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+        batch_op.create_index(
+            "ix_Job_status_heartbeat_at",
+            ["status", "heartbeat_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("Job", schema=None) as batch_op:
+        batch_op.drop_index("ix_Job_status_heartbeat_at")
+        batch_op.drop_column("heartbeat_at")
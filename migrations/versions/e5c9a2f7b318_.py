@@ -0,0 +1,33 @@
+"""add concurrency key to jobs
+
+Revision ID: e5c9a2f7b318
+Revises: b7e2d94f0a13
+Create Date: 2026-10-18 19:12:36.104527
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5c9a2f7b318"
+down_revision = "b7e2d94f0a13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("Job", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("concurrency_key", sa.String(), nullable=True))
+        batch_op.create_index(
+            "ix_Job_concurrency_key_status",
+            ["concurrency_key", "status"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("Job", schema=None) as batch_op:
+        batch_op.drop_index("ix_Job_concurrency_key_status")
+        batch_op.drop_column("concurrency_key")
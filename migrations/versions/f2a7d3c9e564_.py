@@ -0,0 +1,29 @@
+"""add annotation revision to document edits
+
+Revision ID: f2a7d3c9e564
+Revises: e5c9a2f7b318
+Create Date: 2026-10-18 20:27:51.883140
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2a7d3c9e564"
+down_revision = "e5c9a2f7b318"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("DocumentEdit", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("revision", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("DocumentEdit", schema=None) as batch_op:
+        batch_op.drop_column("revision")
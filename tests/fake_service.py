@@ -0,0 +1,105 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeService:
+    """
+    In-process HTTP server standing in for the pipeline or difference calculation service.
+
+    Responses are registered per method and path, either as a (status, body) tuple
+    or as a list of tuples answered in turn. Received requests are recorded
+    with their decoded JSON body, query parameters, headers and client port.
+    NDJSON bodies are decoded to a list of lines, chunked bodies are supported.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        self.delay = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fake._handle(self)
+
+            def do_POST(self):
+                fake._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def respond(self, method, path, *responses):
+        self.responses[(method, path)] = list(responses)
+
+    def _handle(self, handler):
+        if handler.headers.get("Transfer-Encoding") == "chunked":
+            body = self._read_chunked(handler.rfile)
+        else:
+            body = handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+        if handler.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        if handler.headers.get("Content-Type") == "application/x-ndjson":
+            body_json = [json.loads(line) for line in body.splitlines()]
+        else:
+            body_json = json.loads(body) if body else None
+        url = urlparse(handler.path)
+        self.requests.append(
+            {
+                "method": handler.command,
+                "path": url.path,
+                "params": parse_qs(url.query),
+                "headers": dict(handler.headers),
+                "json": body_json,
+                "chunked": handler.headers.get("Transfer-Encoding") == "chunked",
+                "client_port": handler.client_address[1],
+            }
+        )
+        if self.delay:
+            threading.Event().wait(self.delay)
+
+        responses = self.responses.get((handler.command, url.path), [(404, {})])
+        status, response_body = responses.pop(0) if len(responses) > 1 else responses[0]
+        data = json.dumps(response_body).encode("utf-8")
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, e.g. after a timeout
+            pass
+
+    @staticmethod
+    def _read_chunked(stream):
+        chunks = []
+        while True:
+            size = int(stream.readline().split(b";")[0], 16)
+            if size == 0:
+                stream.readline()
+                return b"".join(chunks)
+            chunks.append(stream.read(size))
+            stream.readline()
@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine, event
+
+from app.db import db, SessionFactory
+from app.models import Entity, Mention, SchemaMention
+from app.repositories.entity_repository import EntityRepository
+from app.repositories.mention_repository import MentionRepository
+from app.repositories.token_mention_repository import TokenMentionRepository
+from app.services.entity_service import EntityService
+from app.services.mention_services import MentionService
+from app.services.token_mention_service import TokenMentionService
+from tests.test_routes import BaseTestCase
+
+
+class TestEntityBulk(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        g.db_session.add(SchemaMention(id=1, schema_id=1, tag="Actor"))
+        g.db_session.flush()
+        self.mention_service = MentionService(
+            MentionRepository(),
+            TokenMentionService(TokenMentionRepository()),
+            MagicMock(),
+            MagicMock(),
+            self.token_service,
+            self.schema_service,
+        )
+        self.service = EntityService(
+            EntityRepository(), MagicMock(), MagicMock(), self.mention_service
+        )
+        self.mention_ids = self.mention_service.save_mentions(
+            2,
+            [{"schema_mention_id": 1, "token_ids": [index]} for index in range(1000)],
+        )
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def entity_ids_of_mentions(self):
+        return [
+            row.entity_id
+            for row in g.db_session.query(Mention.entity_id).order_by(Mention.id)
+        ]
+
+    def test_statements_per_entity_materialization(self):
+        self.mention_service.get_mentions_by_document_edit = MagicMock(
+            return_value={
+                "mentions": [
+                    {
+                        "id": mention_id,
+                        "entity_id": None,
+                        "schema_mention": {"entityPossible": index % 2 == 0},
+                    }
+                    for index, mention_id in enumerate(self.mention_ids)
+                ]
+            }
+        )
+        self.statements.clear()
+
+        mentions = self.service.create_entity_for_mentions(2)
+
+        # Previously an INSERT, a SELECT and an UPDATE per mention (1,500)
+        entity_inserts = [
+            statement
+            for statement in self.statements
+            if statement.startswith('INSERT INTO "Entity"')
+        ]
+        # The document edits of the mentions are selected to increment their revision
+        self.assertEqual(len(self.statements), len(entity_inserts) + 2)
+        self.assertTrue(self.statements[-1].startswith('UPDATE "Mention"'))
+        self.assertEqual(len(mentions), 500)
+        entity_ids = self.entity_ids_of_mentions()
+        self.assertEqual(entity_ids[1::2], [None] * 500)
+        self.assertEqual(
+            entity_ids[::2], [mention["entity_id"] for mention in mentions]
+        )
+        self.assertEqual(len(set(entity_ids[::2])), 500)
+        self.assertEqual(g.db_session.query(Entity).count(), 500)
+
+    def test_save_entities_in_edit(self):
+        loaded = g.db_session.get(Mention, self.mention_ids[0])
+
+        entity_ids = self.service.save_entities_in_edit(
+            2,
+            [self.mention_ids[:3], self.mention_ids[3:4]],
+            document_recommendation_id=None,
+            is_shown_recommendation=True,
+        )
+
+        self.assertEqual(
+            self.entity_ids_of_mentions()[:5],
+            [entity_ids[0]] * 3 + [entity_ids[1], None],
+        )
+        # Loaded mentions see the new entity
+        self.assertEqual(loaded.entity_id, entity_ids[0])
+        self.assertTrue(g.db_session.get(Entity, entity_ids[1]).isShownRecommendation)
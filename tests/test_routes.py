@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from app import create_app
+from app.cache import clear_caches
 from app.config import TestingConfig
 from app.repositories.document_edit_repository import DocumentEditRepository
 from app.repositories.document_recommendation_repository import (
@@ -23,6 +24,7 @@ from app.services.entity_mention_service import EntityMentionService
 from app.services.entity_service import EntityService
 from app.services.f1_score_service import F1ScoreService
 from app.services.import_service import ImportService
+from app.services.job_service import JobService
 from app.services.mention_services import MentionService
 from app.services.project_service import ProjectService
 from app.services.relation_mention_service import RelationMentionService
@@ -36,6 +38,7 @@ from app.services.user_service import UserService
 
 class BaseTestCase(unittest.TestCase):
     def setUp(self):
+        clear_caches()
         self.app = create_app(TestingConfig)
         self.client = self.app.test_client()
         self.patcher = patch(
@@ -52,6 +55,7 @@ class BaseTestCase(unittest.TestCase):
         self.entity_mention_service = MagicMock(spec=EntityMentionService)
         self.entity_service = MagicMock(spec=EntityService)
         self.import_service = MagicMock(spec=ImportService)
+        self.job_service = MagicMock(spec=JobService)
         self.mention_service = MagicMock(spec=MentionService)
         self.project_service = MagicMock(spec=ProjectService)
         self.relation_mention_service = MagicMock(spec=RelationMentionService)
@@ -118,6 +122,7 @@ class DocumentEditBaseTestCase(BaseTestCase):
             self.schema_service,
             self.entity_service,
             self.f1_score_service,
+            self.job_service,
         )
 
 
@@ -0,0 +1,115 @@
+from collections import namedtuple
+
+from flask import g
+from sqlalchemy import create_engine, event
+
+from app.cache import LruCache
+from app.db import db, SessionFactory
+from app.repositories.token_repository import TokenRepository
+from app.services.token_service import TokenService
+from app.token_bundle import TokenBundle
+from tests.test_routes import BaseTestCase
+
+Row = namedtuple("Row", ["id", "document_index", "sentence_index", "text", "pos_tag"])
+
+
+class TestTokenBundle(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.cache = LruCache("test_tokens", maxsize=10)
+        self.service = TokenService(TokenRepository(), self.cache)
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def save_tokens(self, document_id, texts):
+        self.service.save_tokens(
+            [
+                {
+                    "text": text,
+                    "document_index": index,
+                    "pos_tag": None if text == "." else "NN",
+                    "sentence_index": 0,
+                }
+                for index, text in enumerate(texts)
+            ],
+            document_id,
+        )
+
+    def test_bundle_builds_token_dicts(self):
+        bundle = TokenBundle(
+            [
+                Row(4, 0, 0, "the", "DT"),
+                Row(5, 1, 0, "the", "DT"),
+                Row(6, 2, 0, ".", None),
+            ]
+        )
+
+        self.assertEqual(len(bundle), 3)
+        self.assertEqual(
+            bundle.to_dicts()[2],
+            {
+                "id": 6,
+                "text": ".",
+                "document_index": 2,
+                "sentence_index": 0,
+                "pos_tag": None,
+            },
+        )
+        self.assertEqual(bundle.index.token_ids(1, 2), [5, 6])
+        # Callers get new dicts, which they may change
+        bundle.to_dicts()[0]["text"] = "changed"
+        self.assertEqual(bundle.to_dicts()[0]["text"], "the")
+
+    def test_committed_tokens_are_cached(self):
+        self.save_tokens(1, ["Tokens", "are", "cached", "."])
+        g.db_session.commit()
+        g.db_session = SessionFactory(bind=self.engine)
+
+        first = self.service.get_tokens_by_document(1)
+        self.statements.clear()
+        second = self.service.get_tokens_by_document(1)
+
+        self.assertEqual(self.statements, [])
+        self.assertEqual(first, second)
+        self.assertEqual(
+            [token["text"] for token in first["tokens"]][:2], ["Tokens", "are"]
+        )
+
+    def test_uncommitted_and_missing_tokens_are_not_cached(self):
+        self.save_tokens(1, ["Pending"])
+
+        self.assertEqual(len(self.service.get_tokens_by_document(1)["tokens"]), 1)
+        self.assertEqual(self.service.get_tokens_by_document(2), {"tokens": []})
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_documents_are_loaded_with_one_query(self):
+        self.save_tokens(1, ["One"])
+        self.save_tokens(2, ["Two", "tokens"])
+        g.db_session.commit()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.service.get_tokens_by_document(1)
+        self.statements.clear()
+
+        tokens = self.service.get_tokens_by_document_ids([1, 2, 3])
+
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(
+            {document_id: len(tokens[document_id]) for document_id in tokens},
+            {1: 1, 2: 2, 3: 0},
+        )
@@ -54,14 +54,14 @@ class TokenFetchByDocumentTestCase(BaseTestCase):
 
     @patch.object(UserService, "get_logged_in_user_id")
     @patch.object(UserService, "check_user_document_accessible")
-    @patch.object(TokenRepository, "get_tokens_by_document")
+    @patch.object(TokenRepository, "get_token_columns_by_documents")
     def test_get_tokens_by_document_no_tokens(
         self, get_tokens_mock, check_access_mock, get_user_mock
     ):
         # Mock the service to raise a BadRequest exception
         get_user_mock.return_value = 1
         check_access_mock.return_value = None
-        get_tokens_mock.return_value = None
+        get_tokens_mock.return_value = []
 
         response = self.client.get("/api/tokens/1")
 
@@ -71,14 +71,14 @@ class TokenFetchByDocumentTestCase(BaseTestCase):
 
     @patch.object(UserService, "get_logged_in_user_id")
     @patch.object(UserService, "check_user_document_accessible")
-    @patch.object(TokenRepository, "get_tokens_by_document")
+    @patch.object(TokenRepository, "get_token_columns_by_documents")
     def test_get_tokens_by_document_no_access(
         self, get_tokens_mock, check_access_mock, get_user_mock
     ):
         # Mock the service to raise a BadRequest exception
         get_user_mock.return_value = 1
         check_access_mock.side_effect = Forbidden()
-        get_tokens_mock.return_value = None
+        get_tokens_mock.return_value = []
 
         response = self.client.get("/api/tokens/1")
 
@@ -87,7 +87,7 @@ class TokenFetchByDocumentTestCase(BaseTestCase):
 
     @patch.object(UserService, "get_logged_in_user_id")
     @patch.object(UserService, "check_user_document_accessible")
-    @patch.object(TokenRepository, "get_tokens_by_document")
+    @patch.object(TokenRepository, "get_token_columns_by_documents")
     def test_get_projects_by_user_service_valid(
         self, get_tokens_mock, check_access_mock, get_user_mock
     ):
@@ -96,6 +96,7 @@ class TokenFetchByDocumentTestCase(BaseTestCase):
         token_return = namedtuple(
             "Token",
             [
+                "document_id",
                 "id",
                 "text",
                 "document_index",
@@ -103,7 +104,7 @@ class TokenFetchByDocumentTestCase(BaseTestCase):
                 "pos_tag",
             ],
         )
-        get_tokens_mock.return_value = [token_return(6, "Doc", 1, 1, "A")]
+        get_tokens_mock.return_value = [token_return(1, 6, "Doc", 1, 1, "A")]
 
         response = self.client.get("/api/tokens/1")
 
@@ -0,0 +1,141 @@
+import random
+import time
+import unittest
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.document_recommendation_service import (
+    DocumentRecommendationService,
+)
+from app.token_bundle import TokenBundle
+from app.token_index import TokenIndex
+
+Row = namedtuple("Row", ["id", "document_index", "sentence_index", "text", "pos_tag"])
+
+
+class TestTokenIndex(unittest.TestCase):
+    def setUp(self):
+        # Unsorted and with a gap at document index 3
+        self.index = TokenIndex(
+            [
+                {"id": 15, "document_index": 5},
+                {"id": 10, "document_index": 0},
+                {"id": 11, "document_index": 1},
+                {"id": 12, "document_index": 2},
+                {"id": 14, "document_index": 4},
+            ]
+        )
+
+    def test_token_ids_of_span(self):
+        self.assertEqual(self.index.token_ids(1, 2), [11, 12])
+        self.assertEqual(self.index.token_ids(2, 4), [12, 14])
+        self.assertEqual(self.index.token_ids(0, 0), [10])
+
+    def test_span_without_tokens(self):
+        self.assertEqual(self.index.token_ids(3, 3), [])
+        self.assertEqual(self.index.token_ids(6, 9), [])
+        self.assertEqual(self.index.token_ids(4, 2), [])
+        self.assertEqual(TokenIndex([]).token_ids(0, 5), [])
+
+    def test_bounds(self):
+        self.assertEqual(self.index.bounds(1, 4), (1, 4))
+        self.assertEqual(self.index.bounds(3, 3), (3, 3))
+        self.assertEqual(len(self.index), 5)
+
+
+class TestFilterTokensBySchemaRecommendations(unittest.TestCase):
+    def setUp(self):
+        self.service = DocumentRecommendationService(*(MagicMock() for _ in range(6)))
+
+    def test_matches_linear_scan(self):
+        random.seed(15)
+        tokens = [
+            {"id": 1000 + position, "document_index": position}
+            for position in range(0, 3000, 3)
+        ]
+        random.shuffle(tokens)
+        recommendations = []
+        for _ in range(200):
+            start = random.randrange(3000)
+            recommendations.append(
+                {
+                    "startTokenDocumentIndex": start,
+                    "endTokenDocumentIndex": start + random.randrange(10),
+                    "type": "Actor",
+                }
+            )
+
+        result = self.service.filter_tokens_by_schema_recommendations(
+            TokenIndex(tokens), recommendations, {"Actor": 7}
+        )
+
+        expected = []
+        for recommendation in recommendations:
+            token_ids = sorted(
+                token["id"]
+                for token in tokens
+                if recommendation["startTokenDocumentIndex"]
+                <= token["document_index"]
+                <= recommendation["endTokenDocumentIndex"]
+            )
+            if token_ids:
+                expected.append({"mention_schema_id": 7, "token_ids": token_ids})
+        self.assertEqual(result, expected)
+
+    def test_large_document(self):
+        bundle = TokenBundle([Row(i, i, 0, "token", "NN") for i in range(50000)])
+        recommendations = [
+            {
+                "startTokenDocumentIndex": i * 25,
+                "endTokenDocumentIndex": i * 25 + 2,
+                "type": "Actor",
+            }
+            for i in range(2000)
+        ]
+
+        started = time.perf_counter()
+        result = self.service.filter_tokens_by_schema_recommendations(
+            bundle.index, recommendations, {"Actor": 7}
+        )
+
+        # A linear scan per span takes 100M comparisons
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(len(result), 2000)
+        self.assertEqual(result[-1]["token_ids"], [49975, 49976, 49977])
+
+    def test_index_of_cached_bundle_reused(self):
+        bundle = TokenBundle(
+            [Row(10, 0, 0, "Clerk", "NN"), Row(11, 1, 0, "sends", "VB")]
+        )
+        token_service, schema_service = MagicMock(), MagicMock()
+        token_service.get_token_bundle.return_value = bundle
+        schema_service.get_schema_mentions_by_schema.return_value = [
+            SimpleNamespace(id=7, tag="Actor", description="")
+        ]
+        service = DocumentRecommendationService(
+            MagicMock(),
+            MagicMock(),
+            token_service,
+            schema_service,
+            MagicMock(),
+            MagicMock(),
+        )
+        recommendation = {
+            "startTokenDocumentIndex": 0,
+            "endTokenDocumentIndex": 1,
+            "type": "Actor",
+        }
+
+        with patch.object(
+            service,
+            "get_mention_recommendation_from_pipeline_service",
+            return_value=[recommendation],
+        ), patch.object(
+            TokenIndex, "from_columns", wraps=TokenIndex.from_columns
+        ) as from_columns:
+            for _ in range(2):
+                result = service.get_mention_recommendation(1, 2, "Clerk sends", {})
+
+        self.assertEqual(result, [{"mention_schema_id": 7, "token_ids": [10, 11]}])
+        from_columns.assert_called_once()
@@ -0,0 +1,75 @@
+from flask import g
+from sqlalchemy import create_engine, event
+from werkzeug.exceptions import Forbidden
+
+from app.cache import LruCache
+from app.db import db, SessionFactory
+from app.models import DocumentEdit
+from app.repositories.token_repository import TokenRepository
+from app.services.token_service import TokenService
+from tests.test_routes import BaseTestCase
+
+
+class TestTokenOwnership(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.service = TokenService(TokenRepository(), LruCache("test_tokens", 10))
+        self.token_ids = {
+            document_id: self.service.save_tokens(
+                [
+                    {
+                        "text": "Token",
+                        "document_index": index,
+                        "pos_tag": "NN",
+                        "sentence_index": 0,
+                    }
+                    for index in range(500)
+                ],
+                document_id,
+            )
+            for document_id in (1, 2)
+        }
+        g.db_session.add(
+            DocumentEdit(id=3, document_id=1, user_id=1, schema_id=1, state_id=1)
+        )
+        g.db_session.flush()
+        self.statements.clear()
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_tokens_in_document_edit(self):
+        self.service.check_tokens_in_document_edit(self.token_ids[1][10:20], 3)
+        # Tokens of a mention may be listed twice
+        self.service.check_tokens_in_document_edit([self.token_ids[1][0]] * 2, 3)
+
+        self.assertEqual(len(self.statements), 2)
+        with self.assertRaises(Forbidden):
+            self.service.check_tokens_in_document_edit(
+                [self.token_ids[1][0], self.token_ids[2][0]], 3
+            )
+        with self.assertRaises(Forbidden):
+            self.service.check_tokens_in_document_edit(self.token_ids[1][:1], 4)
+
+    def test_tokens_in_document(self):
+        self.service.check_tokens_in_document(self.token_ids[2], 2)
+        self.service.check_tokens_in_document([], 2)
+
+        self.assertEqual(len(self.statements), 1)
+        with self.assertRaises(Forbidden):
+            self.service.check_tokens_in_document(self.token_ids[2] + [99999], 2)
@@ -3,7 +3,7 @@ from app.repositories.token_repository import TokenRepository
 from tests.test_routes import BaseTestCase
 from unittest.mock import patch
 from app.services.token_service import TokenService, token_service
-import requests
+from tests.fake_service import FakeService
 
 
 class TokenizationTestCases(BaseTestCase):
@@ -12,33 +12,35 @@ class TokenizationTestCases(BaseTestCase):
     def setUp(self):
         super().setUp()
         self.service = token_service
+        self.pipeline = FakeService().start()
+        self.addCleanup(self.pipeline.stop)
+        self.app.config["PIPELINE_URL"] = self.pipeline.url
 
-    @patch.object(requests, "post")
-    @patch.object(TokenRepository, "create_token")
-    def test_tokenization_service_failed(
-        self, create_token_mock, pipeline_tokenize_mock
-    ):
-        pipeline_tokenize_mock.return_value.json.return_value = None
-        create_token_mock.return_value = ""
+    @patch.object(TokenRepository, "create_tokens")
+    def test_tokenization_service_failed(self, create_tokens_mock):
+        self.pipeline.respond("POST", "/steps/tokenize", (200, None))
+        create_tokens_mock.return_value = []
         with self.app.app_context():
             with self.assertRaises(BadRequest):
                 self.service.tokenize_document(1, "Content of Document")
 
-    @patch.object(requests, "post")
-    @patch.object(TokenRepository, "create_token")
-    def test_tokenization_service_valid(
-        self, create_token_mock, pipeline_tokenize_mock
-    ):
-        pipeline_tokenize_mock.return_value.json.return_value = valid_response
-        create_token_mock.return_value = ""
+    @patch.object(TokenRepository, "create_tokens")
+    def test_tokenization_service_valid(self, create_tokens_mock):
+        self.pipeline.respond("POST", "/steps/tokenize", (200, valid_response))
+        create_tokens_mock.return_value = [1, 2, 3]
 
-        pipeline_tokenize_mock.return_value.status_code = 200
         with self.app.app_context():
             res = self.service.tokenize_document(1, "Content of Document")
         self.assertEqual(
             res["tokens"],
             valid_response,
         )
+        self.assertEqual(
+            self.pipeline.requests[0]["json"],
+            {"content": "Content of Document", "document_id": "1"},
+        )
+        # All tokens are stored with a single bulk call
+        create_tokens_mock.assert_called_once_with(valid_response, 1)
 
 
 valid_response = [
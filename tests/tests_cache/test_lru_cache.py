@@ -0,0 +1,34 @@
+import unittest
+
+from app.cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LruCache("test", maxsize=2)
+
+    def test_least_recently_used_entry_evicted(self):
+        self.cache.put(1, "a")
+        self.cache.put(2, "b")
+        self.cache.get(1)
+        self.cache.put(3, "c")
+
+        self.assertEqual(self.cache.get(1), "a")
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual(self.cache.get(3), "c")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_metrics(self):
+        self.cache.put(1, "a")
+        self.cache.get(1)
+        self.cache.get(2)
+        self.cache.invalidate(1)
+        self.cache.get(1)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import threading
+import unittest
+
+from app.cache import TtlCache
+
+
+class TestTtlCache(unittest.TestCase):
+
+    def test_fresh_value_cached(self):
+        cache = TtlCache("test_ttl", ttl=60, stale_ttl=0)
+        loads = []
+
+        cache.get("key", lambda: loads.append(1) or len(loads))
+        value = cache.get("key", lambda: loads.append(1) or len(loads))
+
+        self.assertEqual(value, 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_expired_value_loaded_synchronously(self):
+        cache = TtlCache("test_ttl", ttl=0, stale_ttl=0)
+        cache.get("key", lambda: 1)
+
+        self.assertEqual(cache.get("key", lambda: 2), 2)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_stale_value_kept_if_refresh_fails(self):
+        cache = TtlCache("test_ttl", ttl=0, stale_ttl=60)
+        cache.get("key", lambda: 1)
+        refreshed = threading.Event()
+
+        def failing_loader():
+            refreshed.set()
+            raise RuntimeError("Service down")
+
+        self.assertEqual(cache.get("key", failing_loader), 1)
+        refreshed.wait(1)
+        self.assertEqual(cache.get("key", lambda: 1), 1)
+        self.assertGreaterEqual(cache.stats()["stale_hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+from werkzeug.exceptions import GatewayTimeout, ServiceUnavailable
+
+from app.clients.service_client import ServiceClient
+from tests.fake_service import FakeService
+from tests.test_routes import BaseTestCase
+
+
+class TestServiceClient(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = FakeService().start()
+        self.addCleanup(self.service.stop)
+        self.http_client = ServiceClient("fake", "FAKE_URL")
+        self.addCleanup(self.http_client.close)
+        self.app.config.update(
+            FAKE_URL=self.service.url,
+            HTTP_RETRIES=2,
+            HTTP_RETRY_BACKOFF=0,
+            HTTP_CIRCUIT_FAILURE_THRESHOLD=2,
+            HTTP_CIRCUIT_RESET_TIMEOUT=60,
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+
+    def test_connections_kept_alive(self):
+        self.service.respond("POST", "/steps/mention", (200, []))
+
+        for _ in range(3):
+            self.assertEqual(
+                self.http_client.post("/steps/mention", json={"a": 1}).status_code, 200
+            )
+
+        self.assertEqual(
+            len({request["client_port"] for request in self.service.requests}), 1
+        )
+
+    def test_idempotent_request_retried(self):
+        self.service.respond("POST", "/steps/mention", (503, {}), (200, ["ok"]))
+
+        response = self.http_client.post("/steps/mention", json={}, params={"a": "b"})
+
+        self.assertEqual(response.json(), ["ok"])
+        self.assertEqual(len(self.service.requests), 2)
+        self.assertEqual(self.service.requests[1]["params"], {"a": ["b"]})
+
+    def test_non_idempotent_request_not_retried(self):
+        self.service.respond("POST", "/train/mention", (503, {}), (200, ["ok"]))
+
+        response = self.http_client.post("/train/mention", json={}, idempotent=False)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_circuit_opens_after_failures(self):
+        self.app.config["HTTP_RETRIES"] = 0
+        self.service.respond("GET", "/steps/mention", (500, {}))
+
+        self.http_client.get("/steps/mention")
+        self.http_client.get("/steps/mention")
+        with self.assertRaises(ServiceUnavailable):
+            self.http_client.get("/steps/mention")
+
+        self.assertEqual(len(self.service.requests), 2)
+        self.assertEqual(self.http_client.stats()["circuit"], "open")
+
+    def test_circuit_closes_after_successful_trial(self):
+        self.app.config.update(HTTP_RETRIES=0, HTTP_CIRCUIT_RESET_TIMEOUT=0)
+        self.service.respond("GET", "/steps/mention", (500, {}), (500, {}), (200, []))
+        self.http_client.get("/steps/mention")
+        self.http_client.get("/steps/mention")
+
+        self.assertEqual(self.http_client.get("/steps/mention").status_code, 200)
+        self.assertEqual(self.http_client.stats()["circuit"], "closed")
+
+    def test_timeout(self):
+        self.app.config.update(HTTP_RETRIES=0, HTTP_READ_TIMEOUT=0.05)
+        self.service.delay = 0.5
+        self.service.respond("GET", "/steps/mention", (200, []))
+
+        with self.assertRaises(GatewayTimeout):
+            self.http_client.get("/steps/mention")
+
+    def test_read_timeout_not_retried(self):
+        self.app.config.update(HTTP_READ_TIMEOUT=0.05)
+        self.service.delay = 0.5
+        self.service.respond("POST", "/steps/mention", (200, []))
+
+        with self.assertRaises(GatewayTimeout):
+            self.http_client.post("/steps/mention", json={})
+
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_unreachable_service(self):
+        self.app.config.update(HTTP_RETRIES=1, FAKE_URL="http://127.0.0.1:9")
+
+        with self.assertRaises(ServiceUnavailable):
+            self.http_client.get("/steps/mention")
+
+        self.assertEqual(
+            self.http_client.stats()["endpoints"]["GET /steps/mention"]["errors"], 2
+        )
+
+    def test_gzip_request_body(self):
+        self.app.config.update(HTTP_GZIP_REQUESTS=True, HTTP_GZIP_MIN_BYTES=10)
+        self.service.respond("POST", "/heatmap", (200, []))
+        body = {"content": "x" * 100}
+
+        self.http_client.post("/heatmap", json=body)
+
+        self.assertEqual(
+            self.service.requests[0]["headers"]["Content-Encoding"], "gzip"
+        )
+        self.assertEqual(self.service.requests[0]["json"], body)
+
+    def test_streamed_request_body(self):
+        self.service.respond("POST", "/train/mention", (503, {}), (200, []))
+        chunks = [b'{"a": 1}\n', b'{"b": 2}\n']
+
+        response = self.http_client.post_stream(
+            "/train/mention",
+            iter(chunks),
+            "application/x-ndjson",
+            params={"name": "model"},
+            gzipped=False,
+        )
+
+        # Streamed bodies cannot be sent twice
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.service.requests), 1)
+        request = self.service.requests[0]
+        self.assertTrue(request["chunked"])
+        self.assertEqual(request["json"], [{"a": 1}, {"b": 2}])
+        self.assertEqual(request["params"], {"name": ["model"]})
+
+    def test_latency_metrics(self):
+        self.service.respond("GET", "/steps/entity", (200, []))
+
+        self.http_client.get("/steps/entity")
+        self.http_client.get("/steps/entity")
+
+        metrics = self.http_client.stats()["endpoints"]["GET /steps/entity"]
+        self.assertEqual((metrics["calls"], metrics["errors"]), (2, 0))
+        self.assertGreater(metrics["max_ms"], 0)
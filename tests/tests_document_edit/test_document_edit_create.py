@@ -6,7 +6,9 @@ from werkzeug.exceptions import BadRequest
 from app.models import (
     Schema,
     DocumentEdit,
+    DocumentEditState,
     DocumentRecommendation,
+    Job,
 )
 from app.services.document_edit_service import DocumentEditService
 
@@ -21,11 +23,7 @@ class TestDocumentEditCreateResource(DocumentEditBaseTestCase):
     @patch.object(
         DocumentEditService, "_DocumentEditService__get_document_edit_by_document"
     )
-    @patch.object(
-        DocumentEditService,
-        "_DocumentEditService__get_document_edit_with_document_by_id",
-    )
-    def test_create_document_edit_success(self, get_edit_doc_mock, get_edit_mock):
+    def test_create_document_edit_success(self, get_edit_mock):
         get_edit_mock.return_value = None
 
         # Get schema of document
@@ -39,8 +37,6 @@ class TestDocumentEditCreateResource(DocumentEditBaseTestCase):
         document_edit.content = "Content"
         self.document_edit_repository.create_document_edit.return_value = document_edit
 
-        get_edit_doc_mock.return_value = document_edit
-
         # Create document recommendation for document edit
         document_recommendation = DocumentRecommendation(id=8)
         self.document_recommendation_service.create_document_recommendation.return_value = (
@@ -50,15 +46,12 @@ class TestDocumentEditCreateResource(DocumentEditBaseTestCase):
         # Store model settings
         self.document_edit_repository.store_model_settings.return_value = None
 
-        self.document_recommendation_service.get_mention_recommendation.return_value = (
-            None
-        )
-
-        self.mention_service.create_recommended_mention.return_value = None
+        self.job_service.enqueue.return_value = Job(id=7)
 
         response = self.service.create_document_edit(1, 2, 3, 4, 5)
 
         self.assertEqual(2, response["id"])
+        self.assertEqual(7, response["job_id"])
 
         # Assert all functions are called
         self.schema_service.get_schema_by_document.assert_called()
@@ -66,8 +59,59 @@ class TestDocumentEditCreateResource(DocumentEditBaseTestCase):
         self.document_edit_repository.create_document_edit.assert_called()
         self.document_recommendation_service.create_document_recommendation.assert_called()
         self.document_edit_repository.store_model_settings.assert_called()
-        self.document_recommendation_service.get_mention_recommendation.assert_called()
-        self.mention_service.create_recommended_mention.assert_called()
+        # Recommendations are generated by a background job
+        self.job_service.enqueue.assert_called_once_with(
+            DocumentEditService.MENTION_RECOMMENDATION_JOB,
+            {"document_edit_id": 2, "document_recommendation_id": 8},
+            1,
+            concurrency_key="mention_recommendation:2",
+        )
+        self.document_recommendation_service.get_mention_recommendation.assert_not_called()
+
+    @patch.object(
+        DocumentEditService,
+        "_DocumentEditService__get_document_edit_with_document_by_id",
+    )
+    def test_generate_mention_recommendations(self, get_edit_doc_mock):
+        document_edit = DocumentEdit(id=2, document_id=3, schema_id=1, state_id=5)
+        document_edit.content = "Content"
+        get_edit_doc_mock.return_value = document_edit
+        self.document_edit_repository.get_state_by_name.return_value = (
+            DocumentEditState(id=5, type="MENTION_SUGGESTION")
+        )
+        self.document_edit_repository.get_document_edit_model.return_value = []
+        recommendations = [{"mention_schema_id": 1, "token_ids": [1, 2]}]
+        self.document_recommendation_service.get_mention_recommendation.return_value = (
+            recommendations
+        )
+
+        result = self.service.generate_mention_recommendations(2, 8)
+
+        self.assertEqual(result, {"mentions": 1})
+        self.document_recommendation_service.get_mention_recommendation.assert_called_once_with(
+            3, 1, "Content", {}
+        )
+        self.mention_service.create_recommended_mention.assert_called_once_with(
+            2, 8, recommendations
+        )
+
+    @patch.object(
+        DocumentEditService,
+        "_DocumentEditService__get_document_edit_with_document_by_id",
+    )
+    def test_no_mention_recommendations_after_suggestion_step(self, get_edit_doc_mock):
+        get_edit_doc_mock.return_value = DocumentEdit(
+            id=2, document_id=3, schema_id=1, state_id=2
+        )
+        self.document_edit_repository.get_state_by_name.return_value = (
+            DocumentEditState(id=5, type="MENTION_SUGGESTION")
+        )
+
+        result = self.service.generate_mention_recommendations(2, 8)
+
+        self.assertEqual(result, {"mentions": 0})
+        self.document_recommendation_service.get_mention_recommendation.assert_not_called()
+        self.mention_service.create_recommended_mention.assert_not_called()
 
     @patch.object(
         DocumentEditService, "_DocumentEditService__get_document_edit_by_document"
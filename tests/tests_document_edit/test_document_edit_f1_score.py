@@ -0,0 +1,222 @@
+from unittest.mock import MagicMock, patch
+
+from flask import g
+from sqlalchemy import create_engine, event, update
+
+from app.cache import LruCache
+from app.db import db, SessionFactory
+from app.models import (
+    Document,
+    DocumentEdit,
+    DocumentEditState,
+    Mention,
+    Relation,
+    SchemaMention,
+    SchemaRelation,
+    Token,
+    TokenMention,
+)
+from app.repositories.base_repository import BaseRepository
+from app.repositories.document_edit_repository import DocumentEditRepository
+from app.repositories.mention_repository import MentionRepository
+from app.repositories.relation_repository import RelationRepository
+from app.repositories.token_repository import TokenRepository
+from app.services.document_edit_service import DocumentEditService
+from app.services.f1_score_service import F1ScoreService
+from app.services.mention_services import MentionService
+from app.services.relation_services import RelationService
+from app.services.token_service import TokenService
+from tests.test_routes import BaseTestCase
+
+
+class TestF1Score(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.f1_score_service = F1ScoreService(LruCache("test_f1_scores", maxsize=10))
+        self.service = DocumentEditService(
+            DocumentEditRepository(),
+            MagicMock(),
+            TokenService(TokenRepository(), LruCache("test_tokens", maxsize=10)),
+            MentionService(MentionRepository(), *(MagicMock() for _ in range(5))),
+            RelationService(RelationRepository(), *(MagicMock() for _ in range(4))),
+            MagicMock(),
+            MagicMock(),
+            self.f1_score_service,
+            MagicMock(),
+        )
+        self.create_document_edit()
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def create_document_edit(self):
+        session = g.db_session
+        session.add_all(
+            [
+                SchemaMention(id=1, schema_id=1, tag="Actor"),
+                SchemaRelation(id=1, schema_id=1, tag="flow"),
+                DocumentEditState(id=1, type="MENTIONS"),
+                Document(
+                    id=1,
+                    name="doc",
+                    content="Clerk sends",
+                    creator_id=1,
+                    state_id=1,
+                    project_id=1,
+                ),
+                DocumentEdit(id=2, document_id=1, user_id=1, schema_id=1, state_id=1),
+                DocumentEdit(id=3, document_id=1, user_id=1, schema_id=1, state_id=1),
+                Token(
+                    id=10,
+                    text="Clerk",
+                    document_index=0,
+                    sentence_index=0,
+                    document_id=1,
+                ),
+                Token(
+                    id=11,
+                    text="sends",
+                    document_index=1,
+                    sentence_index=0,
+                    document_id=1,
+                ),
+                Mention(id=1, schema_mention_id=1, document_edit_id=2),
+                Mention(id=2, schema_mention_id=1, document_edit_id=2, entity_id=5),
+                # Shown and hidden recommendations
+                Mention(
+                    id=3,
+                    schema_mention_id=1,
+                    document_edit_id=2,
+                    document_recommendation_id=1,
+                    isShownRecommendation=True,
+                ),
+                Mention(
+                    id=4,
+                    schema_mention_id=1,
+                    document_edit_id=2,
+                    document_recommendation_id=1,
+                ),
+                TokenMention(mention_id=1, token_id=10),
+                TokenMention(mention_id=2, token_id=11),
+                TokenMention(mention_id=3, token_id=10),
+                TokenMention(mention_id=4, token_id=11),
+                Relation(
+                    id=1,
+                    schema_relation_id=1,
+                    mention_head_id=1,
+                    mention_tail_id=2,
+                    document_edit_id=2,
+                ),
+                Relation(
+                    id=2,
+                    schema_relation_id=1,
+                    mention_head_id=3,
+                    mention_tail_id=2,
+                    document_edit_id=2,
+                    document_recommendation_id=1,
+                ),
+                # Refers to a hidden recommendation, so it is skipped
+                Relation(
+                    id=3,
+                    schema_relation_id=1,
+                    mention_head_id=4,
+                    mention_tail_id=2,
+                    document_edit_id=2,
+                    document_recommendation_id=1,
+                ),
+            ]
+        )
+        session.commit()
+
+    def revision(self, document_edit_id):
+        return g.db_session.get(
+            DocumentEdit, document_edit_id, populate_existing=True
+        ).revision
+
+    def test_payload_with_one_mention_query(self):
+        self.statements.clear()
+
+        request = self.service.get_document_edit_for_f1_score(2)
+
+        # Document edit, tokens, mentions and relations
+        self.assertEqual(len(self.statements), 4)
+        actual, predicted = request["actual"], request["predicted"]
+        self.assertEqual(
+            [mention["entity"]["id"] for mention in actual["mentions"]], [0, 5]
+        )
+        self.assertEqual(len(predicted["mentions"]), 2)
+        self.assertEqual(len(actual["relations"]), 1)
+        self.assertEqual(
+            predicted["relations"][0]["mention_head"]["tokens"][0]["text"], "Clerk"
+        )
+        self.assertEqual(len(predicted["relations"]), 1)
+        self.assertEqual(len(actual["document"]["tokens"]), 2)
+
+    def test_revision_incremented_by_committed_annotation_writes(self):
+        self.assertEqual(self.revision(2), 1)
+
+        # ORM objects
+        g.db_session.add(Mention(schema_mention_id=1, document_edit_id=2))
+        g.db_session.commit()
+        # Bulk statements, one change per transaction and document edit
+        BaseRepository().bulk_insert(
+            TokenMention, [{"mention_id": 1, "token_id": 11, "document_edit_id": 2}]
+        )
+        BaseRepository().bulk_update(Mention, "entity_id", {1: 7, 2: 7})
+        g.db_session.commit()
+        g.db_session.query(Relation).filter(Relation.id == 1).delete()
+        g.db_session.commit()
+
+        self.assertEqual(self.revision(2), 4)
+        self.assertEqual(self.revision(3), 0)
+
+    def test_revision_kept_on_rollback(self):
+        g.db_session.execute(update(Mention).values(entity_id=None))
+        g.db_session.rollback()
+        g.db_session.add(
+            Document(name="d", content="", creator_id=1, state_id=1, project_id=1)
+        )
+        g.db_session.commit()
+
+        self.assertEqual(self.revision(2), 1)
+
+    def test_f1_score_cached_per_revision(self):
+        with patch.object(
+            self.f1_score_service, "get_f1_score", return_value={"f1": 0.5}
+        ) as get_f1_score:
+            self.assertEqual(self.service.get_f1_score(2), {"f1": 0.5})
+            # A repeated poll in a new request only reads the revision
+            g.db_session.close()
+            g.db_session = SessionFactory(bind=self.engine)
+            self.statements.clear()
+            self.assertEqual(self.service.get_f1_score(2), {"f1": 0.5})
+            self.assertEqual(get_f1_score.call_count, 1)
+            self.assertEqual(len(self.statements), 1)
+
+            # Uncommitted changes are neither cached nor served from cache
+            g.db_session.query(Relation).filter(Relation.id == 1).delete()
+            self.service.get_f1_score(2)
+            self.assertEqual(get_f1_score.call_count, 2)
+            self.assertEqual(
+                len(get_f1_score.call_args[0][0]["actual"]["relations"]), 0
+            )
+            g.db_session.commit()
+
+            self.service.get_f1_score(2)
+            self.service.get_f1_score(2)
+            self.assertEqual(get_f1_score.call_count, 3)
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from werkzeug.exceptions import BadRequest
+
+from app.models import DocumentEdit, DocumentRecommendation, Job
+from app.services.document_recommendation_service import (
+    DocumentRecommendationService,
+)
+from app.services.document_edit_service import DocumentEditService
+from app.token_bundle import TokenBundle
+
+from tests.test_routes import DocumentEditBaseTestCase
+
+Row = namedtuple("Row", ["id", "document_index", "sentence_index", "text", "pos_tag"])
+
+
+class TestDocumentEditPreAnnotation(DocumentEditBaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.context.pop()
+        super().tearDown()
+
+    def test_pre_annotate_project_enqueues_job(self):
+        self.job_service.enqueue.return_value = Job(id=3)
+
+        job = self.service.pre_annotate_project(1, 2, batch_size=10, concurrency=2)
+
+        self.assertEqual(job.id, 3)
+        job_type, payload, user_id = self.job_service.enqueue.call_args.args
+        self.assertEqual(job_type, DocumentEditService.PROJECT_PRE_ANNOTATION_JOB)
+        self.assertEqual(payload["project_id"], 2)
+        self.assertEqual((payload["batch_size"], payload["concurrency"]), (10, 2))
+        self.assertEqual(user_id, 1)
+
+    def test_pre_annotate_project_limits_concurrency(self):
+        with self.assertRaises(BadRequest):
+            self.service.pre_annotate_project(1, 2, concurrency=1000)
+        with self.assertRaises(BadRequest):
+            self.service.pre_annotate_project(1, 2, batch_size=0)
+        self.job_service.enqueue.assert_not_called()
+
+    def test_pre_annotate_documents(self):
+        documents = [
+            SimpleNamespace(id=document_id, content="Content", schema_id=4)
+            for document_id in (10, 11, 12)
+        ]
+        self.document_edit_repository.get_documents_without_document_edit.return_value = (
+            documents
+        )
+        self.schema_service.get_models_by_schema.return_value = [
+            {
+                "id": 5,
+                "name": "OpenAI Large Language Model",
+                "type": "llm",
+                "step": {"id": 1, "type": "MENTIONS"},
+            }
+        ]
+        self.document_recommendation_service.get_mention_recommendations_by_documents.side_effect = [
+            ({10: [{"mention_schema_id": 1, "token_ids": [1]}]}, {11: "Timeout"}),
+            ({12: []}, {}),
+        ]
+        self.document_edit_repository.create_document_edit.side_effect = (
+            lambda document_id, *args: DocumentEdit(id=document_id + 100)
+        )
+        self.document_recommendation_service.create_document_recommendation.return_value = DocumentRecommendation(
+            id=7
+        )
+        progress = []
+
+        result = self.service.pre_annotate_documents(
+            1, 2, None, None, None, None, None, None, 2, 4, progress.append
+        )
+
+        self.assertEqual(result["documents"], 3)
+        self.assertEqual(result["annotated"], 2)
+        self.assertEqual(result["failed"], [{"document_id": 11, "error": "Timeout"}])
+        self.assertIsNotNone(result["documents_per_minute"])
+        self.assertEqual(progress, [66, 100])
+        self.assertEqual(self.job_service.checkpoint.call_count, 2)
+        # Batches of two documents, model parameters resolved once
+        batches = (
+            self.document_recommendation_service.get_mention_recommendations_by_documents.call_args_list
+        )
+        self.assertEqual([len(call.args[0]) for call in batches], [2, 1])
+        self.assertEqual(
+            batches[0].args[2],
+            {"model_type": "llm", "name": "OpenAI Large Language Model"},
+        )
+        self.assertEqual(
+            [
+                call.args[0]
+                for call in self.mention_service.create_recommended_mention.call_args_list
+            ],
+            [110, 112],
+        )
+
+    def test_pre_annotate_documents_without_documents(self):
+        self.document_edit_repository.get_documents_without_document_edit.return_value = (
+            []
+        )
+
+        result = self.service.pre_annotate_documents(
+            1, 2, None, None, None, None, None, None, 2, 4, MagicMock()
+        )
+
+        self.assertEqual(result["documents"], 0)
+        self.document_recommendation_service.get_mention_recommendations_by_documents.assert_not_called()
+
+
+class TestMentionRecommendationsByDocuments(DocumentEditBaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.context = self.app.app_context()
+        self.context.push()
+        self.recommendation_service = DocumentRecommendationService(
+            MagicMock(),
+            self.mention_service,
+            self.token_service,
+            self.schema_service,
+            self.relation_service,
+            self.entity_service,
+        )
+        self.schema_service.get_schema_mentions_by_schema.return_value = [
+            SimpleNamespace(id=1, tag="Task", description="")
+        ]
+        self.token_service.get_token_bundles.side_effect = lambda ids: {
+            document_id: TokenBundle([Row(document_id * 10, 0, 0, "Clerk", "NN")])
+            for document_id in ids
+        }
+
+    def tearDown(self):
+        self.context.pop()
+        super().tearDown()
+
+    def test_concurrency_is_bounded_and_failures_are_isolated(self):
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+
+        def pipeline(mention_recommendation_input, params):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.05)
+            with lock:
+                running["now"] -= 1
+            if mention_recommendation_input["document_id"] == "3":
+                raise BadRequest("Failed to fetch recommendations")
+            return [
+                {
+                    "startTokenDocumentIndex": 0,
+                    "endTokenDocumentIndex": 0,
+                    "type": "Task",
+                }
+            ]
+
+        documents = [
+            SimpleNamespace(id=document_id, content="Content")
+            for document_id in range(1, 7)
+        ]
+        with patch.object(
+            self.recommendation_service,
+            "get_mention_recommendation_from_pipeline_service",
+            side_effect=pipeline,
+        ):
+            recommendations, errors = (
+                self.recommendation_service.get_mention_recommendations_by_documents(
+                    documents, 1, {}, concurrency=2
+                )
+            )
+
+        self.assertEqual(running["max"], 2)
+        self.assertEqual(errors, {3: "Failed to fetch recommendations"})
+        self.assertEqual(sorted(recommendations), [1, 2, 4, 5, 6])
+        self.assertEqual(
+            recommendations[4], [{"mention_schema_id": 1, "token_ids": [40]}]
+        )
+        self.token_service.get_token_bundles.assert_called_once()
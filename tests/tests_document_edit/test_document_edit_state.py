@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from werkzeug.exceptions import BadRequest, Conflict
+
+from app.models import DocumentEditState, Job
+from app.services.document_edit_service import DocumentEditService
+
+from tests.test_routes import DocumentEditBaseTestCase
+
+STATES = {
+    "MENTIONS": DocumentEditState(id=2, type="MENTIONS"),
+    "ENTITIES": DocumentEditState(id=3, type="ENTITIES"),
+    "RELATIONS": DocumentEditState(id=4, type="RELATIONS"),
+    "MENTION_SUGGESTION": DocumentEditState(id=5, type="MENTION_SUGGESTION"),
+    "RELATION_SUGGESTION": DocumentEditState(id=6, type="RELATION_SUGGESTION"),
+    "GENERATING": DocumentEditState(id=7, type="GENERATING"),
+}
+
+
+class TestDocumentEditState(DocumentEditBaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.document_edit_repository.get_state_by_name.side_effect = STATES.get
+        self.document_edit_repository.transition_state.return_value = True
+        self.job_service.enqueue.return_value = Job(id=9)
+
+    def mock_document_edit(self, state_name):
+        self.document_edit_repository.get_document_edit_by_id.return_value = (
+            SimpleNamespace(
+                id=1,
+                schema_id=2,
+                document_id=3,
+                user_id=4,
+                state_id=STATES[state_name].id,
+                state_name=state_name,
+                mention_model_id=None,
+                entity_model_id=None,
+                relation_model_id=None,
+            )
+        )
+
+    def test_entity_step_is_generated_in_background(self):
+        self.mock_document_edit("MENTIONS")
+
+        response = self.service.set_edit_state(1, "ENTITIES")
+
+        self.assertEqual(response["state"], {"id": 7, "state": "GENERATING"})
+        self.assertEqual(response["job_id"], 9)
+        self.job_service.enqueue.assert_called_once_with(
+            DocumentEditService.STEP_RECOMMENDATION_JOB,
+            {"document_edit_id": 1, "previous_state": "MENTIONS", "state": "ENTITIES"},
+            4,
+        )
+        self.document_edit_repository.transition_state.assert_called_once_with(1, 2, 7)
+        self.document_recommendation_service.get_entity_recommendation.assert_not_called()
+        self.entity_service.create_entity_for_mentions.assert_not_called()
+
+    def test_step_without_recommendations_is_synchronous(self):
+        self.mock_document_edit("RELATIONS")
+        self.document_edit_repository.get_state_by_name.side_effect = None
+        self.document_edit_repository.get_state_by_name.return_value = (
+            DocumentEditState(id=8, type="FINISHED")
+        )
+
+        response = self.service.set_edit_state(1, "FINISHED")
+
+        self.assertEqual(response["state"], {"id": 8, "state": "FINISHED"})
+        self.assertIsNone(response["job_id"])
+        self.job_service.enqueue.assert_not_called()
+
+    def test_no_step_while_generating(self):
+        self.mock_document_edit("GENERATING")
+
+        with self.assertRaises(BadRequest):
+            self.service.set_edit_state(1, "RELATION_SUGGESTION")
+        with self.assertRaises(BadRequest):
+            self.service.set_edit_state(1, "GENERATING")
+
+    def test_no_step_while_mentions_are_recommended(self):
+        self.mock_document_edit("MENTION_SUGGESTION")
+        self.job_service.has_active_jobs.return_value = True
+
+        with self.assertRaises(BadRequest):
+            self.service.set_edit_state(1, "MENTIONS")
+        self.job_service.has_active_jobs.assert_called_once_with(
+            "mention_recommendation:1"
+        )
+        self.document_edit_repository.transition_state.assert_not_called()
+
+    def test_mention_suggestion_left_once_reviewed(self):
+        self.mock_document_edit("MENTION_SUGGESTION")
+        self.job_service.has_active_jobs.return_value = False
+        self.mention_service.get_recommendations_by_document_edit.return_value = []
+
+        response = self.service.set_edit_state(1, "MENTIONS")
+
+        self.assertEqual(response["state"], {"id": 2, "state": "MENTIONS"})
+        self.document_edit_repository.transition_state.assert_called_once_with(1, 5, 2)
+
+    def test_concurrent_step_conflicts(self):
+        self.mock_document_edit("ENTITIES")
+        self.document_edit_repository.transition_state.return_value = False
+
+        with self.assertRaises(Conflict):
+            self.service.set_edit_state(1, "RELATION_SUGGESTION")
+
+    @patch.object(DocumentEditService, "save_entity_recommendation")
+    def test_generate_step_recommendations(self, save_entity_mock):
+        result = self.service.generate_step_recommendations(1, "MENTIONS", "ENTITIES")
+
+        self.assertEqual(result, {"state_id": 3})
+        save_entity_mock.assert_called_once_with(1)
+        self.entity_service.create_entity_for_mentions.assert_called_once_with(1)
+        self.document_edit_repository.transition_state.assert_called_once_with(1, 7, 3)
+
+    def test_revert_step(self):
+        self.service.revert_step(1, "ENTITIES", "RELATION_SUGGESTION")
+
+        self.document_edit_repository.transition_state.assert_called_once_with(1, 7, 3)
@@ -0,0 +1,242 @@
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine, event
+from werkzeug.exceptions import BadRequest
+
+from app.cache import LruCache
+from app.clients.service_client import pipeline_client
+from app.db import db, SessionFactory
+from app.models import (
+    Document,
+    DocumentEdit,
+    Entity,
+    Mention,
+    Relation,
+    SchemaMention,
+    SchemaRelation,
+    Token,
+    TokenMention,
+)
+from app.repositories.document_edit_repository import DocumentEditRepository
+from app.repositories.mention_repository import MentionRepository
+from app.repositories.relation_repository import RelationRepository
+from app.repositories.token_repository import TokenRepository
+from app.services.document_edit_service import DocumentEditService
+from app.services.mention_services import MentionService
+from app.services.relation_services import RelationService
+from app.services.token_service import TokenService
+from app.services.train_service import TrainService
+from tests.fake_service import FakeService
+from tests.test_routes import BaseTestCase
+
+
+class TestTrainingExport(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.service = DocumentEditService(
+            DocumentEditRepository(),
+            MagicMock(),
+            TokenService(TokenRepository(), LruCache("test_tokens", maxsize=10)),
+            MentionService(MentionRepository(), *(MagicMock() for _ in range(5))),
+            RelationService(RelationRepository(), *(MagicMock() for _ in range(4))),
+            *(MagicMock() for _ in range(4)),
+        )
+        self.create_document_edits()
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def create_document_edits(self):
+        session = g.db_session
+        session.add_all(
+            [
+                SchemaMention(id=1, schema_id=1, tag="Actor"),
+                SchemaMention(id=2, schema_id=1, tag="Activity"),
+                SchemaRelation(id=1, schema_id=1, tag="Actor Performer"),
+            ]
+        )
+        for document_id in (1, 2, 3):
+            session.add(
+                Document(
+                    id=document_id,
+                    name=f"doc{document_id}",
+                    content="The clerk sends it",
+                    creator_id=1,
+                    state_id=1,
+                    project_id=1,
+                )
+            )
+            session.add(
+                DocumentEdit(
+                    id=document_id * 10,
+                    document_id=document_id,
+                    user_id=1,
+                    schema_id=1,
+                    state_id=1,
+                )
+            )
+            for index, text in enumerate(["The", "clerk", "sends", "it"]):
+                session.add(
+                    Token(
+                        id=document_id * 100 + index,
+                        text=text,
+                        document_index=index,
+                        sentence_index=0,
+                        pos_tag="NN",
+                        document_id=document_id,
+                    )
+                )
+        session.add(
+            DocumentEdit(id=40, document_id=1, user_id=1, schema_id=2, state_id=1)
+        )
+        session.add(Entity(id=1, document_edit_id=10))
+        session.add_all(
+            [
+                Mention(id=1, schema_mention_id=1, document_edit_id=10, entity_id=1),
+                Mention(id=2, schema_mention_id=2, document_edit_id=10),
+                Mention(id=3, schema_mention_id=1, document_edit_id=10, entity_id=1),
+                # Recommendations are not exported
+                Mention(
+                    id=4,
+                    schema_mention_id=1,
+                    document_edit_id=10,
+                    document_recommendation_id=1,
+                ),
+            ]
+        )
+        for mention_id, token_id in ((1, 101), (1, 100), (2, 102), (3, 103), (4, 100)):
+            session.add(TokenMention(mention_id=mention_id, token_id=token_id))
+        session.add(
+            Relation(
+                id=1,
+                schema_relation_id=1,
+                mention_head_id=1,
+                mention_tail_id=2,
+                document_edit_id=10,
+            )
+        )
+        session.flush()
+
+    def test_document_edits_reference_mentions(self):
+        documents = list(
+            self.service.export_document_edits_for_schema_training([20, 10], 1)
+        )
+
+        self.assertEqual([document["id"] for document in documents], [10, 20])
+        document = documents[0]
+        self.assertEqual(document["content"], "The clerk sends it")
+        self.assertEqual(document["tokens"]["id"], [100, 101, 102, 103])
+        self.assertEqual(document["tokens"]["text"], ["The", "clerk", "sends", "it"])
+        self.assertEqual(
+            document["mentions"],
+            [
+                {"id": 1, "tag": "Actor", "entity_id": 1, "token_ids": [100, 101]},
+                {"id": 2, "tag": "Activity", "entity_id": None, "token_ids": [102]},
+                {"id": 3, "tag": "Actor", "entity_id": 1, "token_ids": [103]},
+            ],
+        )
+        self.assertEqual(
+            document["entitys"], [{"id": 1, "tag": "Actor", "mention_ids": [1, 3]}]
+        )
+        self.assertEqual(
+            document["relations"],
+            [
+                {
+                    "id": 1,
+                    "tag": "Actor Performer",
+                    "head_mention_id": 1,
+                    "tail_mention_id": 2,
+                }
+            ],
+        )
+        self.assertEqual(
+            (documents[1]["mentions"], documents[1]["relations"]), ([], [])
+        )
+
+    def test_document_edits_loaded_in_batches(self):
+        self.statements.clear()
+        documents = self.service.export_document_edits_for_schema_training(
+            [10, 20, 30], 1, batch_size=2
+        )
+        self.assertEqual(len(self.statements), 1)
+
+        next(documents)
+        first_batch = len(self.statements)
+        next(documents)
+        self.assertEqual(len(self.statements), first_batch)
+        next(documents)
+
+        # The count, and per batch document edits, tokens, mentions and relations
+        self.assertEqual(first_batch, 5)
+        self.assertEqual(len(self.statements), 9)
+
+    def test_document_edit_of_other_schema(self):
+        with self.assertRaises(BadRequest):
+            self.service.export_document_edits_for_schema_training([10, 40], 1)
+
+    def test_training_data_streamed_to_pipeline(self):
+        pipeline = FakeService().start()
+        self.addCleanup(pipeline.stop)
+        self.addCleanup(pipeline_client.close)
+        self.app.config.update(
+            PIPELINE_URL=pipeline.url,
+            TRAIN_STREAM_EXPORT=True,
+            TRAIN_EXPORT_BATCH_SIZE=2,
+        )
+        pipeline.respond("POST", "/train/mention", (200, {}))
+        schema_service = MagicMock()
+        schema_service.get_model_by_name.return_value = None
+        schema_service.get_schema_by_id.return_value = {"id": 1}
+        schema_service.add_model_to_schema.return_value = []
+
+        TrainService(schema_service, self.service, MagicMock()).train_model_for_schema(
+            1, "model", "llm", "MENTIONS", [10, 20, 30], [{"key": "k", "value": "v"}]
+        )
+
+        request = pipeline.requests[0]
+        self.assertTrue(request["chunked"])
+        self.assertEqual(request["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(request["params"]["k"], ["v"])
+        self.assertEqual(request["json"][0], {"schema": {"id": 1}})
+        self.assertEqual(
+            [document["id"] for document in request["json"][1:]], [10, 20, 30]
+        )
+        schema_service.add_model_to_schema.assert_called_once_with(
+            1, "model", "llm", ["MENTIONS"]
+        )
+
+    def test_training_data_sent_as_json_by_default(self):
+        pipeline = FakeService().start()
+        self.addCleanup(pipeline.stop)
+        self.addCleanup(pipeline_client.close)
+        self.app.config.update(PIPELINE_URL=pipeline.url)
+        pipeline.respond("POST", "/train/mention", (200, {}))
+        schema_service = MagicMock()
+        schema_service.get_model_by_name.return_value = None
+        schema_service.get_schema_by_id.return_value = {"id": 1}
+        schema_service.add_model_to_schema.return_value = []
+
+        TrainService(schema_service, self.service, MagicMock()).train_model_for_schema(
+            1, "model", "llm", "MENTIONS", [10, 20], []
+        )
+
+        request = pipeline.requests[0]
+        self.assertFalse(request["chunked"])
+        self.assertEqual(request["json"]["schema"], {"id": 1})
+        self.assertEqual(len(request["json"]["documents"]), 2)
@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.routes.document_routes import DocumentRoutes
+
+from app.services.document_service import DocumentService
+from tests.test_routes import BaseTestCase
+
+
+def document_row(document_id, project_id):
+    return SimpleNamespace(
+        id=document_id,
+        content="Content",
+        name=f"Document {document_id}",
+        project_id=project_id,
+        project_name="Project",
+        schema_id=1,
+        schema_name="Schema",
+        team_id=1,
+        team_name="Team",
+        document_edit_id=None,
+        document_edit_state=None,
+        document_state_id=1,
+        document_state_type="NEW",
+        creator_id=1,
+        username="creator",
+        email="creator@example.com",
+    )
+
+
+def document_edit_row(document_id, edit_id, user_id):
+    return SimpleNamespace(
+        document_id=document_id,
+        edit_id=edit_id,
+        user_id=user_id,
+        user_email=f"user{user_id}@example.com",
+        user_username=f"user{user_id}",
+        state_id=1,
+        state_type="MENTIONS",
+    )
+
+
+class TestDocumentList(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = DocumentService(
+            document_repository=self.document_repository,
+            token_service=self.token_service,
+            document_edit_service=self.document_edit_service,
+        )
+
+    def test_document_edits_fetched_in_one_query(self):
+        self.document_repository.get_documents_by_user.return_value = [
+            document_row(1, 1),
+            document_row(2, 1),
+            document_row(3, 2),
+        ]
+        self.document_repository.get_all_document_edits_with_user_by_documents.return_value = [
+            document_edit_row(1, 10, 1),
+            document_edit_row(3, 11, 1),
+            document_edit_row(1, 12, 2),
+        ]
+
+        documents = self.service.get_documents_by_user(1)["documents"]
+
+        self.document_repository.get_all_document_edits_with_user_by_documents.assert_called_once_with(
+            [1, 2, 3]
+        )
+        self.document_repository.get_all_document_edits_with_user_by_document.assert_not_called()
+        self.assertEqual(
+            [[edit["id"] for edit in doc["document_edits"]] for doc in documents],
+            [[10, 12], [], [11]],
+        )
+        self.assertEqual(documents[0]["document_edits"][1]["user"]["id"], 2)
+
+    def test_documents_by_project_filtered_in_query(self):
+        self.document_repository.get_documents_by_user.return_value = [
+            document_row(3, 2)
+        ]
+        self.document_repository.get_all_document_edits_with_user_by_documents.return_value = (
+            []
+        )
+
+        documents = self.service.get_documents_by_project(1, 2)["documents"]
+
+        self.document_repository.get_documents_by_user.assert_called_once_with(
+            1, 2, after_id=None, limit=None, with_content=True
+        )
+        self.assertEqual([doc["id"] for doc in documents], [3])
+
+    def test_page_sets_next_cursor_if_more_documents(self):
+        self.document_repository.get_documents_by_user.return_value = [
+            document_row(4, 1),
+            document_row(7, 1),
+            document_row(9, 1),
+        ]
+
+        response = self.service.get_documents_by_user(
+            1, cursor=3, limit=2, fields={"id", "name"}
+        )
+
+        self.document_repository.get_documents_by_user.assert_called_once_with(
+            1, None, after_id=3, limit=3, with_content=False
+        )
+        self.document_repository.get_all_document_edits_with_user_by_documents.assert_not_called()
+        self.assertEqual([doc["id"] for doc in response["documents"]], [4, 7])
+        self.assertEqual(response["next_cursor"], 7)
+
+    def test_last_page_has_no_next_cursor(self):
+        self.document_repository.get_documents_by_user.return_value = [
+            document_row(9, 1)
+        ]
+        self.document_repository.get_all_document_edits_with_user_by_documents.return_value = (
+            []
+        )
+
+        response = self.service.get_documents_by_user(1, cursor=7, limit=2)
+
+        self.assertEqual([doc["id"] for doc in response["documents"]], [9])
+        self.assertIsNone(response["next_cursor"])
+
+
+class TestDocumentListRoutes(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user_service.get_logged_in_user_id.return_value = 1
+        for patcher in (
+            patch.object(DocumentRoutes, "service", self.document_service),
+            patch.object(DocumentRoutes, "user_service", self.user_service),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fields_projection(self):
+        self.document_service.get_documents_by_user.return_value = {
+            "documents": [{"id": 1, "name": "Document 1", "content": "Content"}],
+            "next_cursor": 1,
+        }
+
+        response = self.client.get("/api/documents?cursor=3&limit=1&fields=name")
+
+        self.assertEqual(response.status_code, 200)
+        self.document_service.get_documents_by_user.assert_called_once_with(
+            1, 3, 1, {"id", "name"}
+        )
+        self.assertEqual(
+            response.json,
+            {"documents": [{"id": 1, "name": "Document 1"}], "next_cursor": 1},
+        )
+
+    def test_unknown_field(self):
+        response = self.client.get("/api/documents?fields=name,secret")
+
+        self.assertEqual(response.status_code, 400)
+        self.document_service.get_documents_by_user.assert_not_called()
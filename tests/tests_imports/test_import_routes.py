@@ -0,0 +1,44 @@
+import json
+from unittest.mock import patch
+
+from app.models import Job
+from app.routes.import_routes import StreamingImports
+from tests.test_routes import BaseTestCase
+
+
+class TestStreamingImportRoute(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user_service.get_logged_in_user_id.return_value = 4
+        for patcher in (
+            patch.object(StreamingImports, "service", self.import_service),
+            patch.object(StreamingImports, "user_service", self.user_service),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_body_reaches_service_unparsed(self):
+        body = json.dumps({"documents": [{"name": "doc", "text": "Text"}]}).encode()
+        uploaded = []
+
+        def import_pet_stream(stream, project_id, user_id, chunk_size):
+            uploaded.append(stream.read())
+            return Job(id=7, status="QUEUED", progress=0)
+
+        self.import_service.import_pet_stream.side_effect = import_pet_stream
+
+        response = self.client.post(
+            "/api/imports/documents/stream?project_id=3&source=pet&chunk_size=5",
+            data=body,
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["id"], 7)
+        self.assertEqual(uploaded, [body])
+        self.import_service.import_pet_stream.assert_called_once()
+        self.assertEqual(
+            self.import_service.import_pet_stream.call_args.args[1:], (3, 4, 5)
+        )
+        self.user_service.check_user_project_accessible.assert_called_once_with(4, 3)
@@ -0,0 +1,75 @@
+import gzip
+import io
+import json
+import os
+import unittest
+
+from app.json_stream import JsonArrayReader, gzip_ndjson
+
+PET_DOCUMENTS = os.path.join(
+    os.path.dirname(__file__), "..", "http", "imports", "pet-documents.json"
+)
+
+
+class TestJsonArrayReader(unittest.TestCase):
+
+    def read(self, data, key=None, chunk_size=3):
+        stream = io.BytesIO(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        return list(JsonArrayReader(stream, chunk_size).items(key))
+
+    def test_items_of_array(self):
+        items = [{"text": "a [tricky], {string}"}, 12345, "äöü ✓", None, [1, [2]]]
+
+        self.assertEqual(self.read(items), items)
+        self.assertEqual(self.read([]), [])
+
+    def test_items_of_key(self):
+        data = {"name": "PET", "count": 123456, "documents": [{"id": 1}, {"id": 2}]}
+
+        self.assertEqual(self.read(data, "documents"), [{"id": 1}, {"id": 2}])
+        with self.assertRaises(ValueError):
+            self.read({"other": []}, "documents")
+
+    def test_invalid_json(self):
+        for data, key in (
+            (b'{"documents": [{"id": 1}', "documents"),
+            (b'{"documents": [1 2]}', "documents"),
+            (b"[1] [2]", None),
+        ):
+            with self.assertRaises(ValueError):
+                list(JsonArrayReader(io.BytesIO(data), 4).items(key))
+
+    def test_pet_documents(self):
+        with open(PET_DOCUMENTS, "rb") as file:
+            expected = json.load(file)["documents"]
+            file.seek(0)
+            documents = list(JsonArrayReader(file, 1024).items("documents"))
+
+        self.assertEqual(documents, expected)
+
+
+class TestGzipNdjson(unittest.TestCase):
+    def test_round_trip(self):
+        records = [{"id": i, "text": "ä" + os.urandom(8).hex()} for i in range(2000)]
+
+        chunks = list(gzip_ndjson(iter(records), chunk_size=512))
+
+        self.assertGreater(len(chunks), 1)
+        lines = gzip.decompress(b"".join(chunks)).decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], records)
+
+    def test_records_consumed_lazily(self):
+        consumed = []
+
+        def records():
+            for i in range(10000):
+                consumed.append(i)
+                yield {"id": i, "payload": os.urandom(16).hex()}
+
+        chunks = gzip_ndjson(records(), chunk_size=1024)
+        next(chunks)
+
+        self.assertLess(len(consumed), 10000)
+
+    def test_no_records(self):
+        self.assertEqual(gzip.decompress(b"".join(gzip_ndjson([]))), b"")
@@ -0,0 +1,171 @@
+import io
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from werkzeug.exceptions import BadRequest
+
+from app.compiled_schema import CompiledSchema
+from app.models import Job
+from app.services.import_service import ImportService
+from tests.test_routes import BaseTestCase
+
+PET_DOCUMENTS = os.path.join(
+    os.path.dirname(__file__), "..", "http", "imports", "pet-documents.json"
+)
+
+
+class TestPetImport(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.context = self.app.app_context()
+        self.context.push()
+        self.relation_service = MagicMock()
+        self.service = ImportService(
+            self.document_service,
+            self.document_edit_service,
+            self.token_service,
+            self.mention_service,
+            self.entity_service,
+            self.relation_service,
+            self.schema_service,
+            self.job_service,
+        )
+        with open(PET_DOCUMENTS) as file:
+            self.documents = json.load(file)["documents"][:5]
+        self.document_service.save_document.return_value = SimpleNamespace(id=1)
+        self.token_service.save_tokens.side_effect = lambda tokens, document_id: list(
+            range(len(tokens))
+        )
+        self.document_edit_service.create_document_edit.return_value = {"id": 2}
+        self.entity_service.create_entities_in_edit.side_effect = (
+            lambda document_edit_id, count: list(range(1000, 1000 + count))
+        )
+        self.mention_service.save_mentions.side_effect = (
+            lambda document_edit_id, mentions: list(range(len(mentions)))
+        )
+        self.schema_service.get_compiled_schema_by_project_id.return_value = (
+            CompiledSchema(self.pet_schema())
+        )
+
+    def tearDown(self):
+        self.context.pop()
+        super().tearDown()
+
+    def pet_schema(self):
+        mention_tags = sorted(
+            {
+                mention["type"]
+                for document in self.documents
+                for mention in document["mentions"]
+            }
+        )
+        constraints = {
+            (
+                relation["type"],
+                document["mentions"][relation["headMentionIndex"]]["type"],
+                document["mentions"][relation["tailMentionIndex"]]["type"],
+            )
+            for document in self.documents
+            for relation in document["relations"]
+        }
+        mention_ids = {tag: index for index, tag in enumerate(mention_tags)}
+        relation_ids = {
+            tag: index for index, tag in enumerate(sorted({c[0] for c in constraints}))
+        }
+        return {
+            "schema_mentions": [
+                {"id": index, "tag": tag} for tag, index in mention_ids.items()
+            ],
+            "schema_relations": [
+                {"id": index, "tag": tag} for tag, index in relation_ids.items()
+            ],
+            "schema_constraints": [
+                {
+                    "schema_relation": {"id": relation_ids[relation]},
+                    "schema_mention_head": {"id": mention_ids[head]},
+                    "schema_mention_tail": {"id": mention_ids[tail]},
+                    "is_directed": True,
+                }
+                for relation, head, tail in constraints
+            ],
+        }
+
+    def write_documents(self, documents):
+        file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        with file:
+            json.dump({"documents": documents}, file)
+        return file.name
+
+    def test_import_pet_file(self):
+        path = self.write_documents(self.documents)
+        progress = []
+
+        result = self.service.import_pet_file(path, 3, 4, 2, progress.append)
+
+        self.assertEqual(result["count"], 5)
+        self.assertFalse(os.path.exists(path))
+        # Two full chunks of two documents, the last one is committed by the job
+        self.assertEqual(self.job_service.checkpoint.call_count, 2)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(self.mention_service.save_mentions.call_count, 5)
+        self.assertEqual(self.relation_service.save_relations_in_edit.call_count, 5)
+        # The schema is compiled once per import
+        self.schema_service.get_compiled_schema_by_project_id.assert_called_once_with(3)
+
+        # Mentions are saved with the entity they belong to
+        mentions = self.mention_service.save_mentions.call_args_list[0].args[1]
+        self.assertEqual([m["entity_id"] for m in mentions[:6]], [1000] * 5 + [1001])
+        self.assertEqual(mentions[0]["token_ids"], [10])
+        relations = self.relation_service.save_relations_in_edit.call_args_list[0].args[
+            1
+        ]
+        self.assertEqual(len(relations), len(self.documents[0]["relations"]))
+        self.assertEqual(
+            (relations[0]["mention_head_id"], relations[0]["mention_tail_id"]),
+            (5, 6),
+        )
+
+    def test_import_pet_file_reports_committed_documents(self):
+        documents = self.documents[:3]
+        documents[2]["mentions"][0]["type"] = "Unknown"
+        path = self.write_documents(documents)
+
+        with self.assertRaises(ImportError) as error:
+            self.service.import_pet_file(path, 3, 4, 2, MagicMock())
+
+        self.assertIn("Document 3 could not be imported", str(error.exception))
+        self.assertIn("2 documents were imported before", str(error.exception))
+        self.assertFalse(os.path.exists(path))
+
+    def test_import_pet_file_rejects_repeated_mention_token(self):
+        documents = self.documents[:1]
+        indices = documents[0]["mentions"][0]["tokenDocumentIndices"]
+        indices.append(indices[0])
+        path = self.write_documents(documents)
+
+        with self.assertRaises(ImportError) as error:
+            self.service.import_pet_file(path, 3, 4, 2, MagicMock())
+
+        self.assertIn("Document 1 could not be imported", str(error.exception))
+        self.assertIn("refers to a token more than once", str(error.exception))
+        self.mention_service.save_mentions.assert_not_called()
+
+    def test_import_pet_stream_spools_upload(self):
+        self.job_service.enqueue.return_value = Job(id=7)
+
+        job = self.service.import_pet_stream(io.BytesIO(b'{"documents": []}'), 3, 4)
+
+        self.assertEqual(job.id, 7)
+        job_type, payload, user_id = self.job_service.enqueue.call_args.args
+        self.assertEqual(job_type, ImportService.PET_IMPORT_JOB)
+        self.assertEqual(self.job_service.enqueue.call_args.kwargs["max_attempts"], 1)
+        with open(payload["path"], "rb") as file:
+            self.assertEqual(file.read(), b'{"documents": []}')
+        os.remove(payload["path"])
+
+        with self.assertRaises(BadRequest):
+            self.service.import_pet_stream(io.BytesIO(b""), 3, 4, chunk_size=0)
@@ -0,0 +1,219 @@
+import os
+import tempfile
+import threading
+
+from flask import g
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session
+from werkzeug.exceptions import BadGateway, BadRequest, Conflict, Forbidden, NotFound
+
+from app.db import db, SessionFactory
+from app.models import Job, User
+from app.repositories.job_repository import JobRepository
+from app.services.job_service import JobService
+from tests.test_routes import BaseTestCase
+
+
+class TestJobService(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Workers use their own connections, so the database must be shared
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'jobs.db')}",
+            connect_args={"check_same_thread": False},
+        )
+        db.metadata.create_all(self.engine)
+        self.session_factory = scoped_session(lambda: SessionFactory(bind=self.engine))
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = self.session_factory()
+        g.db_session.add(
+            User(id=1, username="owner", email="owner@x", password="x"),
+        )
+        g.db_session.commit()
+        self.service = JobService(
+            JobRepository(), self.session_factory, workers=2, retry_backoff=0
+        )
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.session_factory.remove()
+        self.context.pop()
+        self.engine.dispose()
+        self.directory.cleanup()
+        super().tearDown()
+
+    def enqueue_and_wait(self, job_type, payload, max_attempts=3):
+        g.db_session = self.session_factory()
+        job = self.service.enqueue(job_type, payload, 1, max_attempts)
+        g.db_session.commit()
+        self.service.shutdown()
+        g.db_session = self.session_factory()
+        return self.service.get_job(job.id, 1)
+
+    def test_job_runs_after_commit(self):
+        def handler(payload, report_progress):
+            report_progress(50)
+            return {"sum": payload["a"] + payload["b"]}
+
+        self.service.register("add", handler)
+
+        job = self.enqueue_and_wait("add", {"a": 1, "b": 2})
+
+        self.assertEqual(job["status"], JobRepository.SUCCEEDED)
+        self.assertEqual(job["result"], {"sum": 3})
+        self.assertEqual(job["progress"], 100)
+        self.assertEqual(job["attempts"], 1)
+        self.assertIsNotNone(job["finished_at"])
+
+    def test_failed_attempt_is_rolled_back_and_retried(self):
+        calls = []
+
+        def handler(payload, report_progress):
+            calls.append(payload)
+            g.db_session.add(User(username="partial", email="partial@x", password="x"))
+            g.db_session.flush()
+            if len(calls) == 1:
+                raise BadGateway("Pipeline unavailable")
+            return {"created": True}
+
+        self.service.register("flaky", handler)
+
+        job = self.enqueue_and_wait("flaky", {})
+
+        self.assertEqual(job["status"], JobRepository.SUCCEEDED)
+        self.assertEqual(job["attempts"], 2)
+        self.assertIsNone(job["error"])
+        # Only the successful attempt left its writes behind
+        self.assertEqual(
+            g.db_session.query(User).filter(User.username == "partial").count(), 1
+        )
+
+    def test_job_fails_after_max_attempts(self):
+        def handler(payload, report_progress):
+            raise RuntimeError("boom")
+
+        self.service.register("broken", handler)
+
+        job = self.enqueue_and_wait("broken", {}, max_attempts=2)
+
+        self.assertEqual(job["status"], JobRepository.FAILED)
+        self.assertEqual(job["attempts"], 2)
+        self.assertEqual(job["error"], "boom")
+
+    def test_failure_handler_runs_once_job_failed(self):
+        failed = []
+
+        def handler(payload, report_progress):
+            raise RuntimeError("boom")
+
+        self.service.register(
+            "broken", handler, on_failure=lambda payload: failed.append(payload)
+        )
+
+        job = self.enqueue_and_wait("broken", {"id": 1}, max_attempts=2)
+
+        self.assertEqual(job["status"], JobRepository.FAILED)
+        self.assertEqual(failed, [{"id": 1}])
+
+    def test_client_error_is_not_retried(self):
+        def handler(payload, report_progress):
+            raise BadRequest("Invalid model")
+
+        self.service.register("invalid", handler)
+
+        job = self.enqueue_and_wait("invalid", {})
+
+        self.assertEqual(job["status"], JobRepository.FAILED)
+        self.assertEqual(job["attempts"], 1)
+        self.assertEqual(job["error"], "Invalid model")
+
+    def test_job_discarded_on_rollback(self):
+        calls = []
+        self.service.register("add", lambda payload, report_progress: calls.append(1))
+
+        g.db_session = self.session_factory()
+        self.service.enqueue("add", {}, 1)
+        g.db_session.rollback()
+        self.service.shutdown()
+
+        self.assertEqual(calls, [])
+        self.assertEqual(self.session_factory().query(Job).count(), 0)
+
+    def test_get_job_access(self):
+        g.db_session = self.session_factory()
+        job = JobRepository().create_job("add", {}, 1, 3)
+        g.db_session.commit()
+
+        with self.assertRaises(Forbidden):
+            self.service.get_job(job.id, 2)
+        with self.assertRaises(NotFound):
+            self.service.get_job(job.id + 1, 1)
+        # Queued job is returned once the wait time elapsed
+        self.assertEqual(
+            self.service.get_job(job.id, 1, wait=0.1)["status"], JobRepository.QUEUED
+        )
+
+    def test_cancel_queued_job(self):
+        calls = []
+        failed = []
+        self.service.register(
+            "add",
+            lambda payload, report_progress: calls.append(1),
+            on_failure=lambda payload: failed.append(payload),
+        )
+        g.db_session = self.session_factory()
+        job = JobRepository().create_job("add", {"id": 1}, 1, 3)
+        g.db_session.commit()
+
+        self.assertEqual(
+            self.service.cancel_job(job.id, 1)["status"], JobRepository.CANCELLED
+        )
+        g.db_session.commit()
+        with self.assertRaises(Conflict):
+            self.service.cancel_job(job.id, 1)
+        self.assertEqual(failed, [{"id": 1}])
+
+    def test_running_job_stops_once_cancelled(self):
+        started = threading.Event()
+        cancelled = threading.Event()
+        failed = []
+
+        def handler(payload, report_progress):
+            started.set()
+            cancelled.wait(5)
+            report_progress(50)
+            return {"done": True}
+
+        self.service.register(
+            "slow", handler, on_failure=lambda payload: failed.append(payload)
+        )
+        g.db_session = self.session_factory()
+        job = self.service.enqueue("slow", {"id": 1}, 1)
+        g.db_session.commit()
+        started.wait(5)
+
+        g.db_session = self.session_factory()
+        self.service.cancel_job(job.id, 1)
+        g.db_session.commit()
+        cancelled.set()
+        self.service.shutdown()
+
+        g.db_session = self.session_factory()
+        job = self.service.get_job(job.id, 1)
+        self.assertEqual(job["status"], JobRepository.CANCELLED)
+        self.assertIsNone(job["result"])
+        self.assertEqual(job["progress"], 0)
+        self.assertEqual(failed, [{"id": 1}])
+
+    def test_concurrency_limit(self):
+        self.service.register("add", lambda payload, report_progress: None)
+        g.db_session = self.session_factory()
+        self.service.enqueue("add", {}, 1, concurrency_key="a", concurrency_limit=1)
+
+        with self.assertRaises(Conflict):
+            self.service.enqueue("add", {}, 1, concurrency_key="a", concurrency_limit=1)
+        self.service.enqueue("add", {}, 1, concurrency_key="b", concurrency_limit=1)
+        g.db_session.rollback()
@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine, event
+
+from app.db import db, SessionFactory
+from app.models import Mention, SchemaMention, TokenMention
+from app.repositories.mention_repository import MentionRepository
+from app.repositories.token_mention_repository import TokenMentionRepository
+from app.services.mention_services import MentionService
+from app.services.token_mention_service import TokenMentionService
+from tests.test_routes import BaseTestCase
+
+
+class TestMentionBulkInsert(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        g.db_session.add(SchemaMention(id=1, schema_id=1, tag="Actor"))
+        g.db_session.flush()
+        self.service = MentionService(
+            MentionRepository(),
+            TokenMentionService(TokenMentionRepository()),
+            MagicMock(),
+            MagicMock(),
+            self.token_service,
+            self.schema_service,
+        )
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_statements_per_recommendation_batch(self):
+        # 300 recommended mentions with 5 tokens each
+        recommendations = [
+            {"mention_schema_id": 1, "token_ids": list(range(i * 5, i * 5 + 5))}
+            for i in range(300)
+        ]
+        self.statements.clear()
+
+        self.service.create_recommended_mention(2, 3, recommendations)
+
+        # Previously one INSERT per mention and per token mention (1,800)
+        mention_inserts = [
+            statement
+            for statement in self.statements
+            if statement.startswith('INSERT INTO "Mention"')
+        ]
+        self.assertEqual(len(self.statements), len(mention_inserts) + 1)
+        self.assertTrue(self.statements[-1].startswith('INSERT INTO "TokenMention"'))
+        # PostgreSQL inserts all mentions in one statement. SQLite can not match
+        # multi-row RETURNING to rows, so it sends mentions one by one.
+        if self.engine.dialect.name == "postgresql":
+            self.assertEqual(len(mention_inserts), 1)
+        mentions = g.db_session.query(Mention).order_by(Mention.id).all()
+        self.assertEqual(len(mentions), 300)
+        self.assertTrue(
+            all(
+                mention.document_edit_id == 2
+                and mention.document_recommendation_id == 3
+                and mention.isShownRecommendation
+                for mention in mentions
+            )
+        )
+        token_mentions = (
+            g.db_session.query(TokenMention.mention_id, TokenMention.token_id)
+            .order_by(TokenMention.token_id)
+            .all()
+        )
+        self.assertEqual(len(token_mentions), 1500)
+        # Tokens are linked to the mention they were recommended for
+        self.assertEqual(
+            [row.mention_id for row in token_mentions[:10]],
+            [mentions[0].id] * 5 + [mentions[1].id] * 5,
+        )
+
+    def test_accept_mention_copies_tokens(self):
+        recommendation_id = self.service.save_mentions(
+            2,
+            [{"schema_mention_id": 1, "token_ids": [7, 8, 9]}],
+            document_recommendation_id=3,
+            is_shown_recommendation=True,
+        )[0]
+
+        accepted = self.service.accept_mention(recommendation_id)
+
+        self.assertNotEqual(accepted["id"], recommendation_id)
+        self.assertIsNone(accepted["document_recommendation_id"])
+        self.assertEqual(
+            sorted(
+                token_mention.token_id
+                for token_mention in g.db_session.query(TokenMention).filter(
+                    TokenMention.mention_id == accepted["id"]
+                )
+            ),
+            [7, 8, 9],
+        )
+        self.assertFalse(
+            g.db_session.get(Mention, recommendation_id).isShownRecommendation
+        )
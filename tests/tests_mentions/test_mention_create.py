@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch
-from app.models import Mention, Schema, SchemaMention
+from app.models import Schema, SchemaMention
 
 from app.services.mention_services import MentionService
 from tests.test_routes import MentionBaseTestCase
@@ -28,7 +28,7 @@ class TestMentionCreateResource(MentionBaseTestCase):
         self.schema_service.get_schema_mention_by_id.return_value = SchemaMention(
             id=6, schema_id=9
         )
-        self.mention_repository.create_mention.return_value = Mention(id=4)
+        self.mention_repository.create_mentions.return_value = [4]
         get_dto_by_id_mock.return_value = {"id": 8}
 
         # Call the function
@@ -38,7 +38,9 @@ class TestMentionCreateResource(MentionBaseTestCase):
 
         # Assertions
         self.assertEqual(response, {"id": 8})
-        self.token_mention_service.create_token_mention.assert_called()
+        self.token_mention_service.create_token_mentions.assert_called_once_with(
+            [(1, 4), (5, 4), (9, 4)], mock_doc_edit_id
+        )
 
 
 if __name__ == "__main__":
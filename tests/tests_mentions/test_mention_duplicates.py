@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine, event
+from werkzeug.exceptions import Conflict
+
+from app.db import db, SessionFactory
+from app.models import SchemaMention, TokenMention
+from app.repositories.mention_repository import MentionRepository
+from app.repositories.token_mention_repository import TokenMentionRepository
+from app.services.mention_services import MentionService
+from app.services.token_mention_service import TokenMentionService
+from tests.test_routes import BaseTestCase
+
+
+class TestMentionDuplicateTokens(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        g.db_session.add(SchemaMention(id=1, schema_id=1, tag="Actor"))
+        g.db_session.flush()
+        self.service = MentionService(
+            MentionRepository(),
+            TokenMentionService(TokenMentionRepository()),
+            MagicMock(),
+            MagicMock(),
+            self.token_service,
+            self.schema_service,
+        )
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def save_mention(
+        self, document_edit_id, token_ids, document_recommendation_id=None
+    ):
+        return self.service.save_mentions(
+            document_edit_id,
+            [{"schema_mention_id": 1, "token_ids": token_ids}],
+            document_recommendation_id=document_recommendation_id,
+            is_shown_recommendation=document_recommendation_id is not None,
+        )[0]
+
+    def test_duplicates_are_found_with_one_query(self):
+        mention_id = self.save_mention(2, [1, 2, 3])
+        self.save_mention(3, [4])
+        self.statements.clear()
+
+        duplicates = self.service.check_token_in_mention(2, [3, 4, 5])
+
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(
+            [(row.token_id, row.mention_id) for row in duplicates], [(3, mention_id)]
+        )
+
+    def test_unreviewed_recommendations_are_duplicates(self):
+        recommendation_id = self.save_mention(2, [1, 2], document_recommendation_id=5)
+        self.save_mention(2, [3], document_recommendation_id=5)
+        self.service.reject_mention(recommendation_id + 1)
+
+        duplicates = self.service.check_token_in_mention(2, [1, 3])
+
+        self.assertEqual([row.mention_id for row in duplicates], [recommendation_id])
+
+    def test_database_rejects_duplicate_tokens(self):
+        self.save_mention(2, [1, 2])
+
+        # e.g. a concurrent request which passed the duplicate check
+        with self.assertRaises(Conflict):
+            self.save_mention(2, [2, 3])
+
+    def test_recommendations_do_not_claim_tokens(self):
+        self.save_mention(2, [1, 2], document_recommendation_id=5)
+        self.save_mention(2, [1, 2], document_recommendation_id=6)
+        self.save_mention(2, [1, 2])
+        # Same tokens in another document edit
+        self.save_mention(3, [1, 2])
+
+        document_edit_ids = [
+            row.document_edit_id
+            for row in g.db_session.query(TokenMention.document_edit_id).order_by(
+                TokenMention.id
+            )
+        ]
+        self.assertEqual(document_edit_ids, [None] * 4 + [2, 2, 3, 3])
@@ -0,0 +1,135 @@
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine, event
+from werkzeug.exceptions import BadRequest, Conflict
+
+from app.db import db, SessionFactory
+from app.models import Mention, SchemaMention, TokenMention
+from app.repositories.mention_repository import MentionRepository
+from app.repositories.token_mention_repository import TokenMentionRepository
+from app.services.mention_services import MentionService
+from app.services.token_mention_service import TokenMentionService
+from tests.test_routes import BaseTestCase
+
+
+class TestMentionReview(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        g.db_session.add(SchemaMention(id=1, schema_id=1, tag="Actor"))
+        g.db_session.add(SchemaMention(id=2, schema_id=1, tag="Activity"))
+        g.db_session.flush()
+        self.service = MentionService(
+            MentionRepository(),
+            TokenMentionService(TokenMentionRepository()),
+            MagicMock(),
+            MagicMock(),
+            self.token_service,
+            self.schema_service,
+        )
+        # 400 recommendations with two tokens each, alternating tags
+        self.recommendation_ids = self.service.save_mentions(
+            2,
+            [
+                {"schema_mention_id": 1 + i % 2, "token_ids": [i * 2, i * 2 + 1]}
+                for i in range(400)
+            ],
+            document_recommendation_id=3,
+            is_shown_recommendation=True,
+        )
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def accepted_mentions(self):
+        return (
+            g.db_session.query(Mention)
+            .filter(Mention.document_recommendation_id.is_(None))
+            .order_by(Mention.id)
+            .all()
+        )
+
+    def test_accept_all_remaining(self):
+        self.statements.clear()
+
+        result = self.service.review_mentions(2, MentionService.ACCEPT)
+
+        self.assertEqual(result["count"], 400)
+        self.assertEqual(result["recommendation_ids"], self.recommendation_ids)
+        # Select, copy mentions and their tokens, mark recommendations processed
+        # after selecting their document edits to increment its revision.
+        # SQLite inserts mentions one by one, PostgreSQL at once.
+        mention_inserts = [
+            statement
+            for statement in self.statements
+            if statement.startswith('INSERT INTO "Mention"')
+        ]
+        self.assertEqual(len(self.statements), len(mention_inserts) + 5)
+        accepted = self.accepted_mentions()
+        self.assertEqual([mention.id for mention in accepted], result["ids"])
+        self.assertEqual(
+            sorted(
+                row.token_id
+                for row in g.db_session.query(TokenMention.token_id).filter(
+                    TokenMention.mention_id == accepted[1].id
+                )
+            ),
+            [2, 3],
+        )
+        self.assertEqual(self.service.review_mentions(2, "accept")["count"], 0)
+
+    def test_accept_by_tag_and_reject_by_ids(self):
+        result = self.service.review_mentions(2, "accept", tag="Activity")
+
+        self.assertEqual(result["recommendation_ids"], self.recommendation_ids[1::2])
+        self.assertTrue(
+            all(mention.schema_mention_id == 2 for mention in self.accepted_mentions())
+        )
+
+        result = self.service.review_mentions(
+            2, "reject", mention_ids=self.recommendation_ids[:4:2]
+        )
+
+        self.assertEqual(result["count"], 2)
+        self.assertEqual(result["ids"], [])
+        self.assertEqual(len(self.accepted_mentions()), 200)
+        self.assertFalse(
+            g.db_session.get(Mention, self.recommendation_ids[0]).isShownRecommendation
+        )
+
+    def test_invalid_review(self):
+        with self.assertRaises(BadRequest):
+            self.service.review_mentions(2, "ignore")
+        self.service.review_mentions(
+            2, "reject", mention_ids=self.recommendation_ids[:1]
+        )
+        # Processed recommendations and recommendations of other edits
+        for mention_ids, document_edit_id in (
+            (self.recommendation_ids[:2], 2),
+            (self.recommendation_ids[1:2], 5),
+        ):
+            with self.assertRaises(BadRequest):
+                self.service.review_mentions(
+                    document_edit_id, "accept", mention_ids=mention_ids
+                )
+
+    def test_accept_conflicting_recommendation(self):
+        self.service.save_mentions(2, [{"schema_mention_id": 1, "token_ids": [5]}])
+
+        with self.assertRaises(Conflict):
+            self.service.review_mentions(2, "accept")
@@ -0,0 +1,187 @@
+import json
+import os
+import unittest
+
+from sqlalchemy import create_engine, select, text
+
+from app.db import db
+from app.models import (
+    Document,
+    DocumentEdit,
+    Mention,
+    Relation,
+    SchemaMention,
+    Token,
+    TokenMention,
+    UserTeam,
+)
+
+# Column lookups issued by the repositories on every annotation request
+HOT_LOOKUPS = [
+    (Token, "document_id"),
+    (TokenMention, "mention_id"),
+    (TokenMention, "token_id"),
+    (Mention, "document_edit_id"),
+    (Relation, "document_edit_id"),
+    (DocumentEdit, "document_id"),
+    (DocumentEdit, "user_id"),
+    (UserTeam, "user_id"),
+    (SchemaMention, "schema_id"),
+    (Document, "project_id"),
+]
+
+
+class TestModelIndexes(unittest.TestCase):
+
+    def test_hot_lookups_lead_an_index(self):
+        for model, column in HOT_LOOKUPS:
+            leading_columns = [
+                index.columns.values()[0].name for index in model.__table__.indexes
+            ]
+            self.assertIn(
+                column,
+                leading_columns,
+                f"{model.__tablename__}.{column} is not the leading column of an index",
+            )
+
+    def test_partial_indexes_on_active_rows(self):
+        for model in [Document, DocumentEdit]:
+            partial_indexes = [
+                index
+                for index in model.__table__.indexes
+                if index.dialect_options["postgresql"]["where"] is not None
+            ]
+            self.assertEqual(1, len(partial_indexes))
+
+
+@unittest.skipUnless(
+    os.getenv("TEST_DATABASE_URL"),
+    "TEST_DATABASE_URL not set, query plans need an empty PostgreSQL database",
+)
+class TestQueryPlans(unittest.TestCase):
+    """
+    Seeds a throwaway PostgreSQL database and checks that hot lookups are
+    answered by an index. Sequential scans are disabled for the planner, so a
+    Seq Scan in the plan means that no usable index exists.
+    Everything runs in one transaction that is rolled back afterward.
+    """
+
+    def setUp(self):
+        self.engine = create_engine(os.getenv("TEST_DATABASE_URL"))
+        self.connection = self.engine.connect()
+        self.transaction = self.connection.begin()
+        db.metadata.create_all(self.connection)
+        self.__seed()
+        self.connection.execute(text("ANALYZE"))
+        self.connection.execute(text("SET LOCAL enable_seqscan = off"))
+
+    def tearDown(self):
+        self.transaction.rollback()
+        self.connection.close()
+        self.engine.dispose()
+
+    def __seed(self):
+        for statement in [
+            """insert into "User" (id, username, email, password)
+                select i, 'user' || i, 'user' || i || '@mail', 'pw'
+                from generate_series(1, 50) i""",
+            """insert into "Team" (id, name, creator_id) values (1, 'team', 1)""",
+            """insert into "UserTeam" (user_id, team_id)
+                select i, 1 from generate_series(1, 50) i""",
+            """insert into "ModellingLanguage" (id, type) values (1, 'BPMN')""",
+            """insert into "Schema" (id, name, "modellingLanguage_id", team_id, "isFixed")
+                values (1, 'schema', 1, 1, false)""",
+            """insert into "SchemaMention" (id, schema_id, tag, "entityPossible")
+                select i, 1, 'tag' || i, true from generate_series(1, 20) i""",
+            """insert into "SchemaRelation" (id, schema_id, tag)
+                values (1, 1, 'relation')""",
+            """insert into "Project" (id, name, creator_id, team_id, schema_id)
+                values (1, 'project', 1, 1, 1)""",
+            """insert into "DocumentState" (id, type) values (1, 'NEW')""",
+            """insert into "DocumentEditState" (id, type) values (1, 'MENTIONS')""",
+            """insert into "Document" (id, name, content, creator_id, state_id, project_id)
+                select i, 'doc' || i, 'content', 1, 1, 1 from generate_series(1, 200) i""",
+            """insert into "DocumentEdit" (id, state_id, document_id, user_id, schema_id)
+                select i, 1, i, 1 + i % 50, 1 from generate_series(1, 200) i""",
+            """insert into "Token" (id, text, document_index, sentence_index, document_id)
+                select i, 'token', i % 500, 0, 1 + i / 500 from generate_series(1, 100000) i""",
+            """insert into "Mention" (id, schema_mention_id, document_edit_id, "isShownRecommendation")
+                select i, 1 + i % 20, 1 + i / 100, false from generate_series(1, 20000) i""",
+            """insert into "TokenMention" (token_id, mention_id)
+                select i, 1 + i / 5 from generate_series(1, 99999) i""",
+            """insert into "Relation" (schema_relation_id, mention_head_id, mention_tail_id,
+                    document_edit_id, "isDirected", "isShownRecommendation")
+                select 1, i, i + 1, 1 + i / 100, true, false from generate_series(1, 19999) i""",
+        ]:
+            self.connection.execute(text(statement))
+
+    def __assert_no_seq_scan(self, statement, table_name):
+        compiled = statement.compile(
+            dialect=self.connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = self.connection.execute(
+            text("EXPLAIN (FORMAT JSON) " + str(compiled))
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        self.assertNotIn(table_name, self.__seq_scanned_tables(plan[0]["Plan"]))
+
+    def __seq_scanned_tables(self, node):
+        tables = []
+        if node["Node Type"] == "Seq Scan":
+            tables.append(node["Relation Name"])
+        for child in node.get("Plans", []):
+            tables.extend(self.__seq_scanned_tables(child))
+        return tables
+
+    def test_token_by_document(self):
+        self.__assert_no_seq_scan(select(Token).where(Token.document_id == 42), "Token")
+
+    def test_token_mention_by_mention_and_token(self):
+        self.__assert_no_seq_scan(
+            select(TokenMention).where(TokenMention.mention_id == 42), "TokenMention"
+        )
+        self.__assert_no_seq_scan(
+            select(TokenMention).where(TokenMention.token_id == 42), "TokenMention"
+        )
+
+    def test_mentions_by_document_edit(self):
+        self.__assert_no_seq_scan(
+            select(Mention).where(
+                Mention.document_edit_id == 42,
+                Mention.document_recommendation_id.is_(None),
+            ),
+            "Mention",
+        )
+
+    def test_relations_by_document_edit(self):
+        self.__assert_no_seq_scan(
+            select(Relation).where(Relation.document_edit_id == 42), "Relation"
+        )
+
+    def test_active_document_edit_by_document_and_user(self):
+        self.__assert_no_seq_scan(
+            select(DocumentEdit).where(
+                DocumentEdit.document_id == 42,
+                DocumentEdit.user_id == 1,
+                DocumentEdit.active == True,
+            ),
+            "DocumentEdit",
+        )
+        self.__assert_no_seq_scan(
+            select(DocumentEdit).where(DocumentEdit.user_id == 1), "DocumentEdit"
+        )
+
+    def test_user_team_by_user(self):
+        self.__assert_no_seq_scan(
+            select(UserTeam).where(UserTeam.user_id == 7), "UserTeam"
+        )
+
+    def test_schema_mentions_by_schema(self):
+        self.__assert_no_seq_scan(
+            select(SchemaMention).where(SchemaMention.schema_id == 1), "SchemaMention"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.profiler import SqlProfiler
+from tests.test_routes import BaseTestCase
+
+
+class TestSqlProfiler(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        self.app.config["SQL_PROFILING_SLOWEST"] = 2
+        self.profiler = SqlProfiler()
+        self.profiler.init_app(self.app, bind=self.engine)
+
+        @self.app.route("/profiled/<int:repeat>")
+        def profiled(repeat):
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                for i in range(repeat):
+                    connection.execute(text("SELECT :id"), {"id": i})
+            return "ok"
+
+    def tearDown(self):
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_statements_reported_in_headers(self):
+        response = self.client.get("/profiled/3")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-SQL-Statements"], "4")
+        self.assertEqual(response.headers["X-SQL-Duplicates"], "2")
+        self.assertIn("X-SQL-Time-Ms", response.headers)
+
+    def test_profiles_kept_newest_first(self):
+        self.client.get("/profiled/0")
+        self.client.get("/profiled/3")
+
+        profiles = self.profiler.get_profiles()
+
+        self.assertEqual([profile["statements"] for profile in profiles], [4, 1])
+        self.assertEqual(profiles[0]["path"], "/profiled/3")
+        self.assertEqual(len(profiles[0]["slowest"]), 2)
+        self.assertEqual(
+            profiles[0]["duplicates"], [{"statement": "SELECT ?", "count": 3}]
+        )
+        self.assertEqual(profiles[1]["duplicates"], [])
+
+    def test_failed_statement_discards_start_time(self):
+        with self.engine.connect() as connection:
+            with self.assertRaises(OperationalError):
+                connection.execute(text("SELECT * FROM missing"))
+            connection.execute(text("SELECT 1"))
+
+            self.assertEqual(connection.info["sql_profiler_start"], [])
+
+    def test_debug_endpoints_without_profiling(self):
+        self.assertEqual(self.client.get("/api/_debug/caches").status_code, 200)
+        self.assertEqual(self.client.get("/api/_debug/profile").status_code, 404)
+
+    def test_statements_outside_request_ignored(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        self.assertEqual(self.profiler.get_profiles(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
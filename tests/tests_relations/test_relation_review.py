@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine
+
+from app.db import db, SessionFactory
+from app.models import Relation, SchemaRelation
+from app.repositories.relation_repository import RelationRepository
+from app.services.relation_services import RelationService
+from tests.test_routes import BaseTestCase
+
+
+class TestRelationReview(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        g.db_session.add(SchemaRelation(id=1, schema_id=1, tag="uses"))
+        g.db_session.add(SchemaRelation(id=2, schema_id=1, tag="flow"))
+        g.db_session.flush()
+        self.service = RelationService(
+            RelationRepository(), MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        )
+        self.recommendation_ids = self.service.save_relations_in_edit(
+            2,
+            [
+                {
+                    "schema_relation_id": 1 + i % 2,
+                    "is_directed": i % 3 == 0,
+                    "mention_head_id": i,
+                    "mention_tail_id": i + 1,
+                }
+                for i in range(6)
+            ],
+            document_recommendation_id=3,
+            is_shown_recommendation=True,
+        )
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_accept_by_tag(self):
+        result = self.service.review_relations(2, "accept", tag="flow")
+
+        self.assertEqual(result["recommendation_ids"], self.recommendation_ids[1::2])
+        accepted = [
+            g.db_session.get(Relation, relation_id) for relation_id in result["ids"]
+        ]
+        self.assertEqual(
+            [(relation.mention_head_id, relation.isDirected) for relation in accepted],
+            [(1, False), (3, True), (5, False)],
+        )
+        self.assertTrue(
+            all(relation.document_recommendation_id is None for relation in accepted)
+        )
+
+    def test_reject_all_remaining(self):
+        self.service.review_relations(2, "accept", self.recommendation_ids[:1])
+
+        result = self.service.review_relations(2, "reject")
+
+        self.assertEqual(result["recommendation_ids"], self.recommendation_ids[1:])
+        self.assertEqual(
+            g.db_session.query(Relation)
+            .filter(Relation.isShownRecommendation.is_(True))
+            .count(),
+            0,
+        )
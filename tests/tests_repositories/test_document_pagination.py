@@ -0,0 +1,86 @@
+import unittest
+
+from flask import g
+from sqlalchemy import create_engine
+
+from app.db import db, SessionFactory
+from app.models import (
+    Document,
+    DocumentEdit,
+    DocumentEditState,
+    DocumentState,
+    Project,
+    Schema,
+    Team,
+    User,
+    UserTeam,
+)
+from app.repositories.document_repository import DocumentRepository
+from tests.test_routes import BaseTestCase
+
+
+class TestDocumentPagination(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.repository = DocumentRepository()
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        g.db_session.add_all(
+            [
+                User(id=1, username="user", email="user@x", password="x"),
+                Team(id=1, name="team", creator_id=1),
+                UserTeam(user_id=1, team_id=1),
+                Schema(id=1, name="schema", modellingLanguage_id=1, team_id=1),
+                Project(id=1, name="project", creator_id=1, team_id=1, schema_id=1),
+                DocumentState(id=1, type="NEW"),
+                DocumentEditState(id=1, type="MENTIONS"),
+            ]
+        )
+        for document_id in (1, 2, 3):
+            g.db_session.add(
+                Document(
+                    id=document_id,
+                    name=f"doc{document_id}",
+                    content="",
+                    creator_id=1,
+                    state_id=1,
+                    project_id=1,
+                )
+            )
+        # Document 2 was annotated again after its first edit was deleted
+        g.db_session.add_all(
+            [
+                DocumentEdit(id=20, document_id=2, user_id=1, schema_id=1, state_id=1),
+                DocumentEdit(id=21, document_id=2, user_id=1, schema_id=1, state_id=1),
+            ]
+        )
+        g.db_session.flush()
+        g.db_session.get(DocumentEdit, 20).active = False
+        g.db_session.flush()
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_one_row_per_document(self):
+        documents = self.repository.get_documents_by_user(1)
+
+        self.assertEqual([document.id for document in documents], [1, 2, 3])
+        self.assertEqual(documents[1].document_edit_id, 21)
+
+    def test_pages_are_not_cut_short(self):
+        first_page = self.repository.get_documents_by_user(1, limit=3)
+        second_page = self.repository.get_documents_by_user(1, after_id=1, limit=3)
+
+        self.assertEqual([document.id for document in first_page], [1, 2, 3])
+        self.assertEqual([document.id for document in second_page], [2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
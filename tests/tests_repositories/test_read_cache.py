@@ -0,0 +1,100 @@
+import unittest
+
+from flask import g
+from sqlalchemy import create_engine, event
+
+from app.db import db, SessionFactory
+from app.repositories.token_repository import TokenRepository
+from tests.test_routes import BaseTestCase
+
+
+class TestRequestReadCache(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.repository = TokenRepository()
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.repository.create_token("Doc", 0, "NN", 0, 1)
+        self.statements.clear()
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_repeated_read_hits_cache(self):
+        first = self.repository.get_tokens_by_document(1)
+        second = self.repository.get_tokens_by_document(1)
+
+        self.assertIs(first, second)
+        self.assertEqual(1, len(self.statements))
+        self.assertEqual(
+            {"hits": 1, "misses": 1}, g.db_session.info["read_cache_stats"]
+        )
+
+    def test_different_parameters_are_cached_separately(self):
+        self.repository.get_tokens_by_document(1)
+        self.repository.get_tokens_by_document(2)
+
+        self.assertEqual(2, len(self.statements))
+
+    def test_keyword_arguments_are_part_of_key(self):
+        first = self.repository.get_tokens_by_document(document_id=1)
+        second = self.repository.get_tokens_by_document(document_id=1)
+        other = self.repository.get_tokens_by_document(document_id=2)
+
+        self.assertIs(first, second)
+        self.assertEqual((len(first), len(other)), (1, 0))
+        self.assertEqual(2, len(self.statements))
+
+    def test_store_object_invalidates_cache(self):
+        self.repository.get_tokens_by_document(1)
+        self.repository.create_token("Text", 1, "NN", 0, 1)
+
+        tokens = self.repository.get_tokens_by_document(1)
+
+        self.assertEqual(2, len(tokens))
+
+    def test_bulk_insert_invalidates_cache(self):
+        self.repository.get_tokens_by_document(1)
+        self.repository.create_tokens(
+            [
+                {
+                    "text": "Text",
+                    "document_index": 1,
+                    "pos_tag": "NN",
+                    "sentence_index": 0,
+                }
+            ],
+            1,
+        )
+
+        tokens = self.repository.get_tokens_by_document(1)
+
+        self.assertEqual(2, len(tokens))
+
+    def test_pending_changes_are_flushed_before_cache_lookup(self):
+        tokens = self.repository.get_tokens_by_document(1)
+        tokens[0].text = "Changed"
+
+        self.repository.get_tokens_by_document(1)
+
+        self.assertEqual(
+            {"hits": 0, "misses": 2}, g.db_session.info["read_cache_stats"]
+        )
+        self.assertTrue(self.statements[1].startswith("UPDATE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
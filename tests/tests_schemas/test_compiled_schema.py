@@ -0,0 +1,84 @@
+import itertools
+import unittest
+
+from werkzeug.exceptions import BadRequest
+
+from app.compiled_schema import CompiledSchema
+from app.services.schema_service import SchemaService
+
+
+def constraint(constraint_id, relation_id, head_id, tail_id, is_directed):
+    return {
+        "id": constraint_id,
+        "is_directed": is_directed,
+        "schema_relation": {"id": relation_id},
+        "schema_mention_head": {"id": head_id},
+        "schema_mention_tail": {"id": tail_id},
+    }
+
+
+class TestCompiledSchema(unittest.TestCase):
+    def setUp(self):
+        self.schema = {
+            "schema_mentions": [
+                {"id": 1, "tag": "Actor"},
+                {"id": 2, "tag": "Activity"},
+                {"id": 3, "tag": "Data"},
+            ],
+            "schema_relations": [{"id": 10, "tag": "uses"}, {"id": 11, "tag": "flow"}],
+            "schema_constraints": [
+                constraint(100, 10, 1, 2, True),
+                constraint(101, 11, 2, 3, False),
+                constraint(102, 11, 3, 2, True),
+                constraint(103, 11, 2, 2, False),
+            ],
+        }
+        self.compiled = CompiledSchema(self.schema)
+
+    def test_tag_lookup(self):
+        self.assertEqual(self.compiled.schema_mention_ids_by_tag["Data"], 3)
+        self.assertEqual(self.compiled.schema_relation_ids_by_tag["flow"], 11)
+        self.assertEqual(
+            self.compiled.constraint_by_tags("uses", "Actor", "Activity")["id"], 100
+        )
+        self.assertIsNone(self.compiled.constraint_by_tags("uses", "Unknown", "Data"))
+
+    def test_directed_and_undirected_constraints(self):
+        self.assertIsNone(self.compiled.constraint(10, 2, 1))
+        self.assertEqual(self.compiled.constraint(11, 2, 3)["id"], 101)
+        # The undirected constraint comes first in the schema
+        self.assertEqual(self.compiled.constraint(11, 3, 2)["id"], 101)
+        self.assertEqual(self.compiled.constraint(11, 2, 2)["id"], 103)
+
+    def test_matches_linear_scan(self):
+        def linear_scan(relation_id, head_id, tail_id):
+            return next(
+                (
+                    c
+                    for c in self.schema["schema_constraints"]
+                    if c["schema_relation"]["id"] == relation_id
+                    and (
+                        (
+                            c["schema_mention_head"]["id"] == head_id
+                            and c["schema_mention_tail"]["id"] == tail_id
+                        )
+                        or (
+                            c["schema_mention_tail"]["id"] == head_id
+                            and c["schema_mention_head"]["id"] == tail_id
+                            and c["is_directed"] == False
+                        )
+                    )
+                ),
+                None,
+            )
+
+        for key in itertools.product([10, 11, 12], [1, 2, 3], [1, 2, 3]):
+            self.assertIs(self.compiled.constraint(*key), linear_scan(*key))
+
+    def test_verify_constraint(self):
+        service = SchemaService(None, None)
+
+        self.assertEqual(service.verify_constraint(self.compiled, 11, 3, 2)["id"], 101)
+        self.assertEqual(service.verify_constraint(self.schema, 10, 1, 2)["id"], 100)
+        with self.assertRaises(BadRequest):
+            service.verify_constraint(self.compiled, 10, 2, 1)
@@ -0,0 +1,68 @@
+import time
+
+from werkzeug.exceptions import BadRequest
+
+from app.cache import TtlCache
+from app.clients.service_client import ServiceClient
+from app.services.model_catalogue_service import ModelCatalogueService
+from tests.fake_service import FakeService
+from tests.test_routes import BaseTestCase
+
+
+class TestModelCatalogue(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pipeline = FakeService().start()
+        self.addCleanup(self.pipeline.stop)
+        self.app.config.update(PIPELINE_URL=self.pipeline.url, HTTP_RETRIES=0)
+        self.pipeline_client = ServiceClient("test_pipeline", "PIPELINE_URL")
+        self.addCleanup(self.pipeline_client.close)
+        for step in ModelCatalogueService.STEPS:
+            self.pipeline.respond("GET", "/steps/" + step, (200, [{"step": step}]))
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+
+    def service(self, ttl, stale_ttl):
+        return ModelCatalogueService(
+            self.pipeline_client,
+            TtlCache("test_model_catalogue", ttl=ttl, stale_ttl=stale_ttl),
+        )
+
+    def test_steps_fetched_concurrently_and_cached(self):
+        service = self.service(ttl=60, stale_ttl=60)
+        self.pipeline.delay = 0.3
+
+        start = time.perf_counter()
+        models = service.get_recommendation_models()
+        duration = time.perf_counter() - start
+        service.get_recommendation_models()
+
+        self.assertEqual(models["entity"], [{"step": "entity"}])
+        self.assertLess(duration, 0.8)
+        self.assertEqual(len(self.pipeline.requests), 3)
+
+    def test_stale_models_returned_while_refreshing(self):
+        service = self.service(ttl=0, stale_ttl=60)
+        service.get_recommendation_models()
+        self.pipeline.respond("GET", "/steps/mention", (200, [{"step": "new"}]))
+
+        stale = service.get_recommendation_models()
+        refreshed = stale
+        for _ in range(40):
+            if refreshed["mention"] != stale["mention"]:
+                break
+            time.sleep(0.05)
+            refreshed = service.get_recommendation_models()
+
+        self.assertEqual(stale["mention"], [{"step": "mention"}])
+        self.assertEqual(refreshed["mention"], [{"step": "new"}])
+
+    def test_failed_fetch(self):
+        self.pipeline.respond("GET", "/train/mention", (500, {}))
+        self.pipeline.respond("GET", "/train/entity", (200, []))
+        self.pipeline.respond("GET", "/train/relation", (200, []))
+
+        with self.assertRaises(BadRequest):
+            self.service(ttl=60, stale_ttl=60).get_train_models()
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+from app.cache import LruCache
+from app.services.schema_service import SchemaService
+from tests.test_routes import BaseTestCase
+
+
+def schema_row(version):
+    return SimpleNamespace(
+        id=1,
+        name="Schema",
+        isFixed=False,
+        modelling_language="BPMN",
+        team_id=1,
+        team_name="Team",
+        version=version,
+    )
+
+
+class TestSchemaCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schema_cache = LruCache("test_schemas", maxsize=4)
+        self.service = SchemaService(self.schema_repository, self.schema_cache)
+        self.schema_repository.is_schema_modified.return_value = False
+        self.schema_repository.get_schema_constraints_by_schemas.return_value = []
+        self.schema_repository.get_schema_relations_by_schemas.return_value = []
+        self.schema_repository.get_models_by_schemas.return_value = []
+        self.schema_repository.get_schema_mentions_by_schemas.return_value = [
+            SimpleNamespace(
+                id=1,
+                schema_id=1,
+                tag="Actor",
+                description="Actor",
+                color="#ffffff",
+                entityPossible=True,
+            )
+        ]
+
+    def test_components_cached_per_version(self):
+        self.schema_repository.get_schema_by_id.return_value = schema_row(1)
+
+        first = self.service.get_schema_by_id(1)
+        second = self.service.get_schema_by_id(1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            self.schema_repository.get_schema_mentions_by_schemas.call_count, 1
+        )
+
+        self.schema_repository.get_schema_by_id.return_value = schema_row(2)
+        self.service.get_schema_by_id(1)
+
+        self.assertEqual(
+            self.schema_repository.get_schema_mentions_by_schemas.call_count, 2
+        )
+
+    def test_cached_components_are_copies(self):
+        self.schema_repository.get_schema_by_id.return_value = schema_row(1)
+
+        self.service.get_schema_by_id(1)["schema_mentions"][0]["tag"] = "Changed"
+
+        self.assertEqual(
+            self.service.get_schema_by_id(1)["schema_mentions"][0]["tag"], "Actor"
+        )
+
+    def test_modification_invalidates_cache(self):
+        self.schema_repository.get_schema_by_id.return_value = schema_row(1)
+        self.service.get_schema_by_id(1)
+
+        self.service.delete_schema_components(1)
+
+        self.schema_repository.increment_schema_version.assert_called_once_with(1)
+        self.assertIsNone(self.schema_cache.get(1))
+
+    def test_schema_modified_in_session_not_cached(self):
+        self.schema_repository.is_schema_modified.return_value = True
+        self.schema_repository.get_schema_by_id.return_value = schema_row(2)
+
+        self.service.get_schema_by_id(1)
+        self.service.get_schema_by_id(1)
+
+        self.assertEqual(
+            self.schema_repository.get_schema_mentions_by_schemas.call_count, 2
+        )
+        self.assertEqual(self.schema_cache.stats()["size"], 0)
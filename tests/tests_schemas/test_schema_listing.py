@@ -0,0 +1,139 @@
+from flask import g
+from sqlalchemy import create_engine, event
+
+from app.cache import LruCache
+from app.db import db, SessionFactory
+from app.models import (
+    ModellingLanguage,
+    ModelStep,
+    RecommendationModel,
+    Schema,
+    SchemaConstraint,
+    SchemaMention,
+    SchemaRelation,
+    Team,
+    User,
+    UserTeam,
+)
+from app.repositories.schema_repository import SchemaRepository
+from app.services.schema_service import SchemaService
+from tests.test_routes import BaseTestCase
+
+
+class TestSchemaListing(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        db.metadata.create_all(self.engine)
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = SessionFactory(bind=self.engine)
+        self.service = SchemaService(
+            SchemaRepository(), LruCache("test_schemas", maxsize=1000)
+        )
+
+    def tearDown(self):
+        g.db_session.close()
+        self.context.pop()
+        self.engine.dispose()
+        super().tearDown()
+
+    def seed(self, user_id, schema_count):
+        session = g.db_session
+        session.add_all(
+            [
+                User(
+                    id=user_id,
+                    username=f"u{user_id}",
+                    email=f"{user_id}@x",
+                    password="x",
+                ),
+                Team(id=user_id, name=f"Team {user_id}"),
+                UserTeam(user_id=user_id, team_id=user_id),
+                ModellingLanguage(id=user_id, type=f"BPMN {user_id}"),
+                ModelStep(id=user_id, type=f"MENTIONS {user_id}"),
+            ]
+        )
+        for i in range(schema_count):
+            schema = Schema(
+                name=f"Schema {i}",
+                modellingLanguage_id=user_id,
+                team_id=user_id,
+            )
+            session.add(schema)
+            session.flush()
+            head = SchemaMention(schema_id=schema.id, tag="Actor")
+            tail = SchemaMention(schema_id=schema.id, tag="Activity")
+            relation = SchemaRelation(schema_id=schema.id, tag="Performs")
+            session.add_all(
+                [
+                    head,
+                    tail,
+                    relation,
+                    RecommendationModel(
+                        model_name="llm",
+                        model_type="llm",
+                        model_step_id=user_id,
+                        schema_id=schema.id,
+                    ),
+                ]
+            )
+            session.flush()
+            session.add(
+                SchemaConstraint(
+                    schema_relation_id=relation.id,
+                    schema_mention_id_head=head.id,
+                    schema_mention_id_tail=tail.id,
+                )
+            )
+        session.flush()
+
+    def count_listing_statements(self, user_id):
+        self.statements.clear()
+        schemas = self.service.get_schemas_by_user(user_id)["schemas"]
+        return len(schemas), len(self.statements)
+
+    def test_statement_count_independent_of_schema_count(self):
+        self.seed(1, 10)
+        self.seed(2, 100)
+
+        self.assertEqual(self.count_listing_statements(1), (10, 5))
+        self.assertEqual(self.count_listing_statements(2), (100, 5))
+
+    def test_listing_matches_single_schema_fetch(self):
+        self.seed(1, 3)
+
+        schemas = self.service.get_schemas_by_user(1)["schemas"]
+
+        self.assertEqual(len(schemas[0]["schema_constraints"]), 1)
+        self.assertEqual(len(schemas[0]["models"]), 1)
+        for schema in schemas:
+            self.assertEqual(
+                schema,
+                SchemaService(
+                    SchemaRepository(), LruCache("test_single_schemas", maxsize=10)
+                ).get_schema_by_id(schema["id"]),
+            )
+
+    def test_models_by_schema(self):
+        self.seed(1, 2)
+        schema_ids = [
+            schema["id"] for schema in self.service.get_schemas_by_user(1)["schemas"]
+        ]
+
+        models = SchemaRepository().get_models_by_schema(schema_ids[1])
+
+        self.assertEqual(
+            [
+                (model.schema_id, model.model_name, model.model_step_name)
+                for model in models
+            ],
+            [(schema_ids[1], "llm", "MENTIONS 1")],
+        )
@@ -0,0 +1,131 @@
+import os
+import tempfile
+from collections import namedtuple
+from unittest.mock import MagicMock
+
+from flask import g
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session
+from werkzeug.exceptions import Conflict
+
+from app.clients.service_client import pipeline_client
+from app.db import db, SessionFactory
+from app.models import User
+from app.repositories.job_repository import JobRepository
+from app.services.job_service import JobService
+from app.services.train_service import TrainService
+from tests.fake_service import FakeService
+from tests.test_routes import BaseTestCase
+
+Model = namedtuple(
+    "Model",
+    ["id", "model_name", "model_type", "model_step_id", "model_step_name", "schema_id"],
+)
+
+
+class TestTrainingJobs(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Workers use their own connections, so the database must be shared
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'jobs.db')}",
+            connect_args={"check_same_thread": False},
+        )
+        db.metadata.create_all(self.engine)
+        self.session_factory = scoped_session(lambda: SessionFactory(bind=self.engine))
+        self.pipeline = FakeService().start()
+        self.app.config.update(
+            PIPELINE_URL=self.pipeline.url,
+            TRAIN_STREAM_EXPORT=True,
+            TRAIN_POLL_INTERVAL=0,
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        g.db_session = self.session_factory()
+        g.db_session.add(User(id=1, username="owner", email="owner@x", password="x"))
+        g.db_session.commit()
+
+        self.job_service = JobService(
+            JobRepository(), self.session_factory, workers=2, retry_backoff=0
+        )
+        self.schema_service = MagicMock()
+        self.schema_service.get_model_by_name.return_value = None
+        self.schema_service.get_schema_by_id.return_value = {"id": 3}
+        self.schema_service.add_model_to_schema.return_value = [
+            Model(8, "model", "llm", 1, "MENTIONS", 3)
+        ]
+        self.document_edit_service = MagicMock()
+        export = self.document_edit_service.export_document_edits_for_schema_training
+        export.side_effect = lambda ids, schema_id: iter([{"id": id} for id in ids])
+        self.service = TrainService(
+            self.schema_service, self.document_edit_service, self.job_service
+        )
+
+    def tearDown(self):
+        self.job_service.shutdown()
+        pipeline_client.close()
+        self.pipeline.stop()
+        self.session_factory.remove()
+        self.context.pop()
+        self.engine.dispose()
+        self.directory.cleanup()
+        super().tearDown()
+
+    def submit_and_wait(self):
+        g.db_session = self.session_factory()
+        job = self.service.submit_training_job(
+            3, "model", "llm", "MENTIONS", [2, 1, 2], [], 1
+        )
+        g.db_session.commit()
+        self.job_service.shutdown()
+        g.db_session = self.session_factory()
+        return self.job_service.get_job(job.id, 1)
+
+    def test_asynchronous_training_is_polled(self):
+        self.pipeline.respond("POST", "/train/mention", (202, {"id": "t1"}))
+        self.pipeline.respond(
+            "GET",
+            "/train/jobs/t1",
+            (200, {"status": "RUNNING", "progress": 50}),
+            (200, {"status": "SUCCEEDED"}),
+        )
+
+        job = self.submit_and_wait()
+
+        self.assertEqual(job["status"], JobRepository.SUCCEEDED)
+        self.assertEqual(job["result"]["models"][0]["id"], 8)
+        self.assertEqual(
+            [request["path"] for request in self.pipeline.requests],
+            ["/train/mention", "/train/jobs/t1", "/train/jobs/t1"],
+        )
+        self.assertEqual(
+            [document["id"] for document in self.pipeline.requests[0]["json"][1:]],
+            [1, 2],
+        )
+        self.schema_service.add_model_to_schema.assert_called_once_with(
+            3, "model", "llm", ["MENTIONS"]
+        )
+
+    def test_failed_training_stores_no_model(self):
+        self.pipeline.respond("POST", "/train/mention", (202, {"id": "t1"}))
+        self.pipeline.respond(
+            "GET", "/train/jobs/t1", (200, {"status": "FAILED", "error": "No data"})
+        )
+
+        job = self.submit_and_wait()
+
+        self.assertEqual(job["status"], JobRepository.FAILED)
+        self.assertEqual(job["error"], "Failed to train model: No data")
+        self.schema_service.add_model_to_schema.assert_not_called()
+
+    def test_one_training_per_schema(self):
+        g.db_session = self.session_factory()
+        self.service.submit_training_job(3, "model", "llm", "MENTIONS", [1], [], 1)
+
+        with self.assertRaises(Conflict):
+            self.service.submit_training_job(3, "other", "llm", "MENTIONS", [1], [], 1)
+        self.assertEqual(len(self.service.get_training_jobs(3)["jobs"]), 1)
+        self.assertEqual(self.service.get_training_jobs(4), {"jobs": []})
+        g.db_session.rollback()